@@ -1,80 +1,46 @@
 import os
-import json
+import sys
 import subprocess
+from pathlib import Path
 from tqdm import tqdm
-from collections import defaultdict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.preprocessing.szz import run_szz
+from src.preprocessing.blame import CACHE_FILE
+from src.preprocessing.streaming import iter_records, project
+from src.preprocessing.records import SSTUB_SCHEMA, RecordTable
+from src.data_collection.mirror_store import MirrorStore, default_root
 
 BUGS_JSON = "./MSR Project/bugs.json"
-REPO_DIR = "C:/r"
+REPO_DIR = default_root()  # mirror store shared with projectCollection.py and augment.py (SSTUB_MIRRORS_DIR)
 OUTPUT_FILE = "introducing_commits.jsonl"
-
-#collect bugs from bugs.json 
-with open(BUGS_JSON, encoding="utf-8") as f:
-    bugs = json.load(f)
-
-#group bugs by project
-grouped = defaultdict(list)
-for bug in bugs:
-    grouped[bug["projectName"]].append(bug)
-
-with open(OUTPUT_FILE, "w", encoding="utf-8") as out_f:
-    for project, project_bugs in tqdm(grouped.items(), desc="Processing Projects"):
-        local_repo = os.path.join(REPO_DIR, project.replace(".", "_"))
-        if not os.path.exists(local_repo):
-            continue
-
-        os.chdir(local_repo)
-
-        #clean to prevent checkout errors (can break so just preventative )
-        subprocess.run(["git", "reset", "--hard"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        subprocess.run(["git", "clean", "-fd"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-        for bug in project_bugs:
-            fix_sha = bug["fixCommitSHA1"]
-            fix_parent = bug["fixCommitParentSHA1"]
-            file_path = bug["bugFilePath"]
-            line_num = bug["bugLineNum"]
-
-            try:
-                #if file doesnt exist in parent (ie, they removed the file prior then we have to ignore it, only using SZZ not a different version)
-                check_file = subprocess.run(
-                    ["git", "ls-tree", "-r", fix_parent, "--", file_path],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.DEVNULL,
-                )
-                if not check_file.stdout:
-                    continue
-
-                
-                try:
-                    file_contents = subprocess.check_output(
-                        ["git", "show", f"{fix_parent}:{file_path}"],
-                        stderr=subprocess.DEVNULL
-                    )
-                    total_lines = len(file_contents.decode("utf-8", errors="ignore").splitlines())
-                    if line_num > total_lines or line_num <= 0:
-                        continue
-                except subprocess.CalledProcessError:
-                    continue
-
-                # Checkout the parent of the fix commit
-                subprocess.run(["git", "checkout", "--detach", fix_parent], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-                #git blame the buggy line
-                blame_cmd = ["git", "blame", "-L", f"{line_num},{line_num}", file_path]
-                result = subprocess.check_output(blame_cmd, stderr=subprocess.DEVNULL).decode("utf-8").strip()
-                introducing_sha = result.split()[0]
-
-                #save results 
-                entry = {
-                    "projectName": project,
-                    "fixCommitSHA1": fix_sha,
-                    "fixCommitParentSHA1": fix_parent,
-                    "bugFilePath": file_path,
-                    "bugLineNum": line_num,
-                    "introducingCommitSHA": introducing_sha
-                }
-                out_f.write(json.dumps(entry) + "\n")
-
-            except Exception as e:
-                print(f"[ERROR] {project} - {fix_sha} @ {file_path}:{line_num} → {e}")
+BLAME_CACHE = os.path.join(REPO_DIR, CACHE_FILE)  # blamed lines per (project, fix parent, file), the same file augment.py uses
+WORKERS = os.cpu_count() or 1  # set to 1 to run every project in this process
+BUG_FIELDS = ("projectName", "fixCommitSHA1", "fixCommitParentSHA1", "bugFilePath", "bugLineNum")  # all SZZ needs of a bug
+
+
+def main():
+    #stream bugs from bugs.json into a compact table (interned names and paths, binary SHAs) with only the fields SZZ needs,
+    #then group them by project
+    bugs = RecordTable.from_records(project(iter_records(BUGS_JSON), BUG_FIELDS), SSTUB_SCHEMA)
+    grouped = bugs.group_by("projectName")
+    total = len(bugs)
+
+    #make sure every project has an up-to-date mirror, all of them are blamed in parallel so none is evicted here
+    store = MirrorStore(REPO_DIR)
+    for project_name in tqdm(grouped, desc="Refreshing Mirrors"):
+        try:
+            #GitHub owners cannot contain dots, so the first dot separates owner and repository
+            store.get(project_name.replace(".", "/", 1))
+        except subprocess.CalledProcessError as e:
+            print(f"[ERROR] Failed to mirror {project_name}: {e.stderr}")
+    print(f"[INFO] Mirrors: {store.summary()}")
+
+    #blame every buggy line against the fix parent directly, projects are spread over WORKERS processes
+    with tqdm(total=total, desc="Processing Bugs") as pbar:
+        written = run_szz(grouped, REPO_DIR, OUTPUT_FILE, workers=WORKERS, progress=pbar, blame_cache_path=BLAME_CACHE)
+    print(f"[INFO] Wrote {written} introducing commits to {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,40 @@
-import json
-import requests
-from GH_token import GITHUB_TOKEN
+import sys
+import asyncio
+from itertools import islice
+from pathlib import Path
+import GH_token
 from tqdm import tqdm
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.data_collection.github_client import AsyncGitHubClient
+from src.data_collection.token_pool import TokenPool
+from src.data_collection.response_cache import ResponseCache
+from src.data_collection.github_collector import enrich_introducing_commit
+from src.preprocessing.streaming import iter_jsonl, JsonlWriter
+
 INPUT_FILE = "./MSR Project/introducing_commits.jsonl"
 OUTPUT_FILE = "./MSR Project/introducing_commits_enriched.jsonl"
-
-headers = {
-    "Authorization": f"token {GITHUB_TOKEN}",
-    "Accept": "application/vnd.github+json"
-}
-
-def get_pr_info(owner, repo, commit_sha):
-    # check if apart of PR
-    url = f"https://api.github.com/repos/{owner}/{repo}/commits/{commit_sha}/pulls"
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200 or not response.json():
-        return None
-
-    pr = response.json()[0]
-    pr_number = pr["number"]
-
-    #collect reviewer meta data
-    review_url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}/reviews"
-    reviews = requests.get(review_url, headers=headers).json()
-    reviewer_count = len(set(r["user"]["login"] for r in reviews if "user" in r and r["user"]))
-
-    return {
-        "pr_number": pr_number,
-        "reviewer_count": reviewer_count,
-        "pr_created_at": pr["created_at"],
-        "pr_merged_at": pr["merged_at"]
-    }
-
-#collect cloned projects
-with open(INPUT_FILE, "r") as f_in, open(OUTPUT_FILE, "w", encoding="utf-8") as f_out:
-    lines = [json.loads(line) for line in f_in]
-
-    for entry in tqdm(lines, desc="Enriching Commits"):
-        try:
-            owner_repo = entry["projectName"].replace(".", "/")
-            owner, repo = owner_repo.split("/")
-            sha = entry["introducingCommitSHA"]
-
-            pr_info = get_pr_info(owner, repo, sha)
-            entry["introducingCommitHasPR"] = bool(pr_info)
-            if pr_info:
-                entry["introducingPR"] = pr_info
-
-        except Exception as e:
-            entry["introducingCommitHasPR"] = False
-            print(f"[ERROR] {entry['projectName']} - {e}")
-
-        f_out.write(json.dumps(entry) + "\n")
+RESPONSE_CACHE_PATH = "./MSR Project/github_cache.sqlite"  # re-runs revalidate with ETags instead of refetching
+CONCURRENCY = 16    # requests in flight at once
+WINDOW_SIZE = 1000  # entries enriched concurrently before being written out
+# GH_token may define a GITHUB_TOKENS list, requests always go out with the token that has the most quota left
+GITHUB_TOKENS = getattr(GH_token, "GITHUB_TOKENS", None) or [GH_token.GITHUB_TOKEN]
+
+
+async def main():
+    #count the introducing commits, they are streamed one window at a time below
+    with open(INPUT_FILE, "r", encoding="utf-8") as f_in:
+        total = sum(1 for line in f_in if line.strip())
+
+    cache = ResponseCache(RESPONSE_CACHE_PATH)
+    entries = iter_jsonl(INPUT_FILE)
+    async with AsyncGitHubClient(TokenPool(GITHUB_TOKENS), concurrency=CONCURRENCY, cache=cache) as client:
+        with JsonlWriter(OUTPUT_FILE) as writer, tqdm(total=total, desc="Enriching Commits") as pbar:
+            while window := list(islice(entries, WINDOW_SIZE)):
+                writer.write_all(await asyncio.gather(*(enrich_introducing_commit(client, entry) for entry in window)))
+                pbar.update(len(window))
+    print(f"[INFO] Response cache: {cache.summary()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,31 +1,25 @@
-import pandas as pd
-import json
+import sys
+from pathlib import Path
 
-with open("./MSR Project/introducing_commits_enriched.jsonl", "r", encoding="utf-8") as f:
-    enriched = pd.DataFrame([json.loads(line) for line in f])
-    
-with open("./MSR Project/sstubs.json", "r", encoding="utf-8") as f:
-    sstubs = pd.DataFrame(json.load(f))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.preprocessing.merge import merge_datasets
+from src.preprocessing.columnar import write_frames
 
-#rename for consistency
-sstubs = sstubs.rename(columns={
-    "bugLineNum": "sstub_bugLineNum",
-    "fixCommitSHA1": "fixCommitSHA1",
-    "bugFilePath": "bugFilePath",
-    "bugType": "bugType"
-})
+ENRICHED_FILE = "./MSR Project/introducing_commits_enriched.jsonl"
+SSTUBS_FILE = "./MSR Project/sstubs.json"
+MEMORY_BUDGET_BYTES = 2 * 1024 ** 3  #inputs bigger than this are joined partition by partition on disk
 
-# merge sstubs and bugs 
-merged = enriched.merge(sstubs[["fixCommitSHA1", "bugFilePath", "sstub_bugLineNum", "bugType"]], left_on=["fixCommitSHA1", "bugFilePath", "bugLineNum"], right_on=["fixCommitSHA1", "bugFilePath", "sstub_bugLineNum"], how="left")
 
-merged["sstub_introduced"] = merged["bugType"].notnull().astype(int)
+def to_csv(frames, path):
+    #append each joined chunk to the csv as it is produced, then pass it on
+    for i, frame in enumerate(frames):
+        frame.to_csv(path, index=False, mode="w" if i == 0 else "a", header=i == 0)
+        yield frame
 
-#collect reviewer ingo
-merged["reviewer_count"] = merged["introducingPR"].apply(
-    lambda pr: pr.get("reviewer_count", 0) if isinstance(pr, dict) else 0
-)
 
-final_df = merged[["fixCommitSHA1", "introducingCommitSHA", "projectName", "bugFilePath", "bugLineNum", "bugType", "reviewer_count", "introducingCommitHasPR", "sstub_introduced"]]
-
-final_df.to_csv("rq1_dataset.csv", index=False)
+# merge sstubs and bugs, flattening introducingPR into reviewer_count on the way in
+frames = merge_datasets(ENRICHED_FILE, SSTUBS_FILE, memory_budget=MEMORY_BUDGET_BYTES)
 
+#typed, per-project parquet copy that rq1_chi.py / rq1_log.py and the RQ3 notebooks read
+rows = write_frames(to_csv(frames, "rq1_dataset.csv"), "rq1_dataset.parquet", "introducing_commits")
+print(f"[INFO] Wrote {rows} rows to rq1_dataset.csv and rq1_dataset.parquet")
@@ -1,24 +1,28 @@
-import os
-import pandas as pd
+import sys
 import subprocess
+import pandas as pd
+from pathlib import Path
 from tqdm import tqdm
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.data_collection.mirror_store import MirrorStore, default_root
+
 CSV_PATH = "./MSR Project/TopJavaMavenProjects.csv"
-CLONE_DIR = "C:/r"
+CLONE_DIR = default_root()  # mirror store shared with dataEnrichmentSZZ.py and augment.py (SSTUB_MIRRORS_DIR)
+MIRROR_MAX_BYTES = None  # disk budget for the mirrors in bytes, least recently used ones are deleted past it
 
 projects = pd.read_csv(CSV_PATH)
 projects['repo'] = projects['repository_url'].str.replace("https://github.com/", "", regex=False)
 
 # test variable to make sure projects cloned are full 
 TOP_N = len(projects)
-os.makedirs(CLONE_DIR, exist_ok=True)
 
-# actaulyl clone the project
-for _, row in tqdm(projects.head(TOP_N).iterrows(), total=TOP_N, desc="Cloning Repos"):
+# bare blobless mirrors, shared with dataEnrichmentSZZ.py and augment.py; re-runs only fetch new commits
+store = MirrorStore(CLONE_DIR, max_bytes=MIRROR_MAX_BYTES)
+for _, row in tqdm(projects.head(TOP_N).iterrows(), total=TOP_N, desc="Mirroring Repos"):
     repo = row['repo']
-    owner, name = repo.split("/")
-    clone_path = os.path.join(CLONE_DIR, f"{owner}_{name}")
-
-    repo_url = f"https://github.com/{repo}.git"
-    print(f"Cloning {repo_url} into {clone_path}")
-    subprocess.run(["git", "clone", repo_url, clone_path])
+    try:
+        store.get(repo)
+    except subprocess.CalledProcessError as e:
+        print(f"[ERROR] Failed to mirror {repo}: {e.stderr}")
+print(f"[INFO] Mirrors: {store.summary()}")
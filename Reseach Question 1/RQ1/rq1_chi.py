@@ -1,54 +1,63 @@
+import sys
 import pandas as pd
-import numpy as np
+from pathlib import Path
 from scipy.stats import chi2_contingency
 import seaborn as sns
 import matplotlib.pyplot as plt
 from matplotlib.colors import LogNorm
 
-df = pd.read_csv("./MSR Project/rq1_dataset.csv")
-
-
-# Remove the bugs that dont have an associated PR with it
-df = df[df["introducingCommitHasPR"] == True]
-
-# take only bugs that are sstubs
-sstub_only = df[df["sstub_introduced"] == 1]
-
-#need to remove any sstubs that are considered tests (removing all that are under a test directory) 
-sstub_only = sstub_only[~sstub_only["bugFilePath"].str.contains("/test/", case=False, na=False)]
-
-# removing sstubs that have invalid bug type or reviewwer count 
-sstub_only = sstub_only.dropna(subset=["bugType", "reviewer_count"])
-
-#bin reviewer counts 0,1,2,3,4+
-sstub_only["reviewer_bin"] = pd.cut(
-    sstub_only["reviewer_count"],
-    bins=[-1, 0, 1, 2, 3, np.inf],
-    labels=["0", "1", "2", "3", "4+"]
-)
-
-#creat contingency for chi
-contingency = pd.crosstab(sstub_only["reviewer_bin"], sstub_only["bugType"])
-
-chi2, p, dof, expected = chi2_contingency(contingency)
-
-print(f"Chi-square statistic: {chi2:.2f}")
-print(f"Degrees of freedom: {dof}")
-print(f"P-value: {p:.4e}")
-
-#heatmap plot
-plt.figure(figsize=(18, 7))
-sns.heatmap(
-    contingency,
-    annot=True,
-    fmt="d",
-    cmap="Blues",
-    norm=LogNorm(),
-    cbar_kws={"label": "Count"}
-)
-plt.title("SStuB Type Distribution by Reviewer Count Bin")
-plt.ylabel("Reviewer Count (Binned)")
-plt.xlabel("SStuB Type")
-plt.xticks(rotation=45, ha="right")
-plt.tight_layout()
-plt.show()
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.analysis.rq1_analysis import bin_reviewers, load_sstubs, permutation_chi2
+
+PERMUTATIONS = 100000  #monte carlo permutations, the 4+ bin has too many tiny cells for the asymptotic p-value
+SEED = 0
+WORKERS = None  #None = all cores
+
+
+def main():
+    # Remove the bugs that dont have an associated PR with it, take only bugs that are sstubs,
+    # remove any sstubs that are considered tests (removing all that are under a test directory)
+    # and sstubs that have invalid bug type or reviewwer count
+    sstub_only = load_sstubs("./MSR Project/rq1_dataset.parquet", columns=["bugType", "reviewer_count", "projectName"])
+
+    #bin reviewer counts 0,1,2,3,4+
+    sstub_only["reviewer_bin"] = bin_reviewers(sstub_only["reviewer_count"])
+
+    #creat contingency for chi
+    contingency = pd.crosstab(sstub_only["reviewer_bin"], sstub_only["bugType"])
+
+    chi2, p, dof, expected = chi2_contingency(contingency)
+
+    print(f"Chi-square statistic: {chi2:.2f}")
+    print(f"Degrees of freedom: {dof}")
+    print(f"P-value: {p:.4e}")
+
+    #permutation test on the integer codes, shuffling bug types within each project
+    _, p_permutation = permutation_chi2(
+        sstub_only["reviewer_bin"].cat.codes.to_numpy(),
+        sstub_only["bugType"].cat.codes.to_numpy(),
+        strata=sstub_only["projectName"].cat.codes.to_numpy(),
+        permutations=PERMUTATIONS, seed=SEED, workers=WORKERS,
+    )
+    print(f"Permutation p-value ({PERMUTATIONS} permutations, stratified by project): {p_permutation:.4e}")
+
+    #heatmap plot
+    plt.figure(figsize=(18, 7))
+    sns.heatmap(
+        contingency,
+        annot=True,
+        fmt="d",
+        cmap="Blues",
+        norm=LogNorm(),
+        cbar_kws={"label": "Count"}
+    )
+    plt.title("SStuB Type Distribution by Reviewer Count Bin")
+    plt.ylabel("Reviewer Count (Binned)")
+    plt.xlabel("SStuB Type")
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,42 @@
-import pandas as pd
-import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.multiclass import OneVsRestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
-from sklearn.preprocessing import OneHotEncoder
+import sys
+from pathlib import Path
 import matplotlib.pyplot as plt
 
-df = pd.read_csv("./MSR Project/rq1_dataset.csv")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.analysis.rq1_analysis import load_sstubs, multinomial_cv
 
-# Remove the bugs that dont have an associated PR with it
-df = df[df["introducingCommitHasPR"] == True]
+N_SPLITS = 5
+N_REPEATS = 20  #repeated stratified cross validation, 100 fits in total
+SEED = 0
+WORKERS = None  #None = all cores
 
-# take only bugs that are sstubs
-sstub_only = df[df["sstub_introduced"] == 1]
+# Remove the bugs that dont have an associated PR with it, take only bugs that are sstubs,
+# remove any sstubs that are considered tests (removing all that are under a test directory)
+# and sstubs that have invalid bug type or reviewwer count
+sstub_only = load_sstubs("./MSR Project/rq1_dataset.parquet")
 
-#need to remove any sstubs that are considered tests (removing all that are under a test directory) 
-sstub_only = sstub_only[~sstub_only["bugFilePath"].str.contains("/test/", case=False, na=False)]
+#one multinomial model on the integer coded bug types, coefficients are log odds against the first bug type
+coef_df, scores = multinomial_cv(sstub_only, n_splits=N_SPLITS, n_repeats=N_REPEATS, seed=SEED, workers=WORKERS)
 
-# removing sstubs that have invalid bug type or reviewwer count 
-sstub_only = sstub_only.dropna(subset=["bugType", "reviewer_count"])
-
-
-X = sstub_only[["reviewer_count"]]
-y = sstub_only["bugType"]
-
-#one hot encode teh bug types
-encoder = OneHotEncoder(drop="first", sparse=False)
-y_encoded = encoder.fit_transform(y.values.reshape(-1, 1))
-y_cols = encoder.get_feature_names_out(["bugType"])
-
-#test train 80/20 split
-X_train, X_test, y_train, y_test = train_test_split(X, y_encoded, test_size=0.2)
-
-model = OneVsRestClassifier(LogisticRegression(max_iter=1000))
-model.fit(X_train, y_train)
-
-#predict One Vs All classifications label
-y_pred = model.predict(X_test)
+print(f"Reference bug type: {scores['reference']}")
+print(f"Held-out accuracy over {scores['folds']} folds: {scores['accuracy'][0]:.4f} (std {scores['accuracy'][1]:.4f})")
+print(f"Held-out log loss over {scores['folds']} folds: {scores['log_loss'][0]:.4f} (std {scores['log_loss'][1]:.4f})")
 
 #collect coefficient for each bug type
-coef_data = []
-for i, bug in enumerate(y_cols):
-    coef = model.estimators_[i].coef_[0][0]
-    coef_data.append((bug, coef))
-    print(f"{bug}: coefficient = {coef:.4f}")
+for row in coef_df.itertuples(index=False):
+    print(f"{row.bugType}: coefficient = {row.coefficient:.4f} (cv mean {row.cv_mean:.4f}, 95% interval [{row.cv_low:.4f}, {row.cv_high:.4f}])")
 
 #plot
-coef_df = pd.DataFrame(coef_data, columns=["bugType", "coefficient"])
 coef_df = coef_df.sort_values(by="coefficient", ascending=False)
 plt.figure(figsize=(12, 6))
-plt.bar(coef_df["bugType"], coef_df["coefficient"])
+plt.bar(
+    coef_df["bugType"].astype(str), coef_df["coefficient"],
+    yerr=[(coef_df["coefficient"] - coef_df["cv_low"]).to_numpy(), (coef_df["cv_high"] - coef_df["coefficient"]).to_numpy()],
+    capsize=3
+)
 plt.axhline(0, color='gray', linestyle='--')
 plt.xticks(rotation=90)
-plt.ylabel("Reviewer Count Coefficient")
+plt.ylabel(f"Reviewer Count Coefficient (vs {scores['reference']})")
 plt.title("Reviewer Count Influence on Each SStuB Type")
 plt.tight_layout()
 plt.show()
@@ -1,26 +1,41 @@
 #!/usr/bin/env python3
-import json
 import os
+import sys
+import asyncio
 import subprocess
-import shutil
-import stat
 from datetime import datetime
-from collections import OrderedDict
-from github import Github
+from collections import OrderedDict, Counter
+from pathlib import Path
 from tqdm import tqdm
 from dotenv import load_dotenv
-import diskcache as dc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.data_collection.token_pool import TokenPool
+from src.data_collection.github_client import AsyncGitHubClient
+from src.data_collection import github_graphql, github_collector
+from src.data_collection.response_cache import ResponseCache
+from src.preprocessing.journal import Journal, record_key
+from src.preprocessing.streaming import iter_records, project
+from src.data_collection.mirror_store import MirrorStore, default_root
+from src.preprocessing.blame import CACHE_FILE, BlameCache
+from src.preprocessing.git_objects import BlobLines, CatFileBatch
+from src.preprocessing.pickaxe import find_introducing_commits
+from src.preprocessing.review_analyzer import BUG_KEYWORDS, KeywordMatcher
+from src.preprocessing.review_corpus import ReviewCorpus
 
 # -------------------------------
 # LOAD ENVIRONMENT VARIABLES
 # -------------------------------
 load_dotenv()
-GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
-if not GITHUB_TOKEN:
-    raise ValueError("GITHUB_TOKEN not found in environment (.env)")
+# GITHUB_TOKENS is a comma-separated list, a single GITHUB_TOKEN still works.
+GITHUB_TOKENS = [t.strip() for t in os.environ.get("GITHUB_TOKENS", os.environ.get("GITHUB_TOKEN", "")).split(",") if t.strip()]
+if not GITHUB_TOKENS:
+    raise ValueError("GITHUB_TOKENS / GITHUB_TOKEN not found in environment (.env)")
 
-# Initialize global GitHub API client.
-g = Github(GITHUB_TOKEN)
+# Every request goes out with the token that has the most quota left.
+token_pool = TokenPool(GITHUB_TOKENS)
+# GraphQL has its own rate limit, so its quota is tracked separately.
+graphql_token_pool = TokenPool(GITHUB_TOKENS)
 
 # -------------------------------
 # CONFIGURATION
@@ -29,28 +44,42 @@ SSTUBS_JSON_PATH = os.path.join(os.getcwd(), "sstubs.json")
 CHECKPOINT_DIR = os.path.join(os.getcwd(), "augmented_subfiles")
 if not os.path.exists(CHECKPOINT_DIR):
     os.makedirs(CHECKPOINT_DIR)
+JOURNAL_PATH = os.path.join(CHECKPOINT_DIR, "journal.jsonl")
+MERGED_OUTPUT_PATH = os.path.join(os.getcwd(), "merged_checkpoints.json")
+# Fields of a ManySStuBs4J record used here; the rest (patches, ASTs) is dropped while streaming sstubs.json.
+SSTUB_FIELDS = ("fixCommitSHA1", "fixCommitParentSHA1", "projectName", "bugFilePath", "bugLineNum", "sourceBeforeFix", "bugType")
+
+# Whole-word, case-insensitive bug keywords (see src/preprocessing/review_analyzer.py), compiled once.
+KEYWORD_MATCHER = KeywordMatcher(BUG_KEYWORDS)
 
-BUG_KEYWORDS = [
-    "bug", "bugfix", "bug fix", "bug-fix", "bugfixes",
-    "fix", "fixes", "fixed", "patch", "correction", "repair",
-    "typo", "error", "exception", "fail", "failure", "crash",
-    "issue", "defect", "fault", "problem", "flaw", "mistake",
-    "logic error", "inconsistency", "unexpected behavior",
-    "misconfiguration", "misuse", "illegal", "unhandled",
-    "wrong", "missing", "incorrect", "unexpected",
-    "update required", "glitch", "anomaly", "malfunction", 
-    "vulnerability", "misimplemented", "misimplementation"
-]
-
-LOCAL_CLONES_DIR = os.path.join(os.getcwd(), "clones")
+MIRRORS_DIR = default_root()  # bare blobless mirrors shared with the RQ1 scripts (SSTUB_MIRRORS_DIR, may be set in .env)
+MIRROR_MAX_BYTES = 50 * 1024 ** 3  # least recently used mirrors are deleted past this budget
 CONTEXT_LINES = 3  # Number of context lines to extract
-CHUNK_SIZE = 100   # Number of records per checkpoint
+SNIPPET_CACHE_FILES = 256  # decoded files kept per repository for context snippets, keyed by (commit, path)
+FETCH_MODE = "graphql"    # "graphql" resolves commits/PRs in batched queries, "rest" fetches them one by one
+GRAPHQL_BATCH_SIZE = 20   # Number of commits per GraphQL query
+REST_CONCURRENCY = 16     # Number of REST requests in flight at once
+# SStuBs without a fix parent: "batched" walks each file's history once, newest first, for all of its
+# SStuBs and stops when all are found; "reverse" runs `git log -S --reverse` per SStuB (oldest match).
+PICKAXE_MODE = "batched"
+CHUNK_SIZE = 100  # records of one repository processed and journaled together
 
 # -------------------------------
-# PERSISTENT CACHING USING DISKCACHE
+# PERSISTENT RESPONSE CACHE
 # -------------------------------
-commit_cache = dc.Cache('commit_cache')
-pr_cache = dc.Cache('pr_cache')
+# Raw API responses, revalidated with ETags on re-runs. Set offline=True to replay without network.
+RESPONSE_CACHE_PATH = os.path.join(os.getcwd(), "github_cache.sqlite")
+RESPONSE_CACHE_MAX_BYTES = 4 * 1024 ** 3
+response_cache = ResponseCache(RESPONSE_CACHE_PATH, max_bytes=RESPONSE_CACHE_MAX_BYTES)
+mirror_store = MirrorStore(MIRRORS_DIR, max_bytes=MIRROR_MAX_BYTES)
+# Blamed lines per (project, fix parent, file), in the shared mirror root, so RQ1's dataEnrichmentSZZ.py uses the same file.
+BLAME_CACHE_PATH = os.path.join(MIRRORS_DIR, CACHE_FILE)
+blame_cache = BlameCache(BLAME_CACHE_PATH)
+
+# Every fetched commit message, review body and review comment, full-text indexed so the
+# explicit-mention flags can be recomputed offline for other keywords (see rescore.py).
+REVIEW_CORPUS_PATH = os.path.join(os.getcwd(), "review_corpus.sqlite")
+review_corpus = ReviewCorpus(REVIEW_CORPUS_PATH)
 
 # -------------------------------
 # HELPER FUNCTIONS
@@ -68,66 +97,49 @@ def get_repo_url(project_name: str) -> str:
     repo_full = parse_owner_repo(project_name)
     return f"https://github.com/{repo_full}.git"
 
-def get_local_repo_path(project_name: str) -> str:
-    """Returns the expected local clone path (e.g., clones/Owner_Repo)."""
-    repo_full = parse_owner_repo(project_name)
-    local_repo_name = repo_full.replace("/", "_")
-    return os.path.join(LOCAL_CLONES_DIR, local_repo_name)
-
 def clean_snippet(snippet: str) -> str:
     """Cleans the snippet by removing escape characters and extra whitespace."""
     return snippet.replace('\\"', '"').strip()
 
-def extract_context_snippet(local_repo_path: str, bug_file_path: str, bug_line_num: int, context: int = CONTEXT_LINES) -> str:
-    """Extracts a snippet of context from a file, or returns an empty string if not found."""
-    full_file_path = os.path.join(local_repo_path, bug_file_path)
-    if not os.path.exists(full_file_path):
-        print(f"[WARN] File not found: {full_file_path}. Falling back to sourceBeforeFix.")
+def fix_parent_rev(entry: dict) -> str:
+    """The revision the bug line numbers refer to: the fix parent, or the fix commit's first parent if unknown."""
+    return entry.get("fixCommitParentSHA1") or f"{entry.get('fixCommitSHA1')}^"
+
+def extract_context_snippet(blobs: BlobLines, rev: str, bug_file_path: str, bug_line_num: int, context: int = CONTEXT_LINES) -> str:
+    """Extracts a snippet of context around the bug line from the file at `rev`, or returns an empty string if not found."""
+    lines = blobs.get(rev, bug_file_path)
+    if lines is None:
+        print(f"[WARN] File not found: {bug_file_path} at {rev}. Falling back to sourceBeforeFix.")
         return ""
     try:
-        with open(full_file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
         start = max(0, bug_line_num - context - 1)  # Adjust for 0-indexing
         end = min(len(lines), bug_line_num + context)
         snippet = "".join(lines[start:end]).strip()
         return snippet
     except Exception as e:
-        print(f"[ERROR] Failed to extract snippet from {full_file_path}: {e}")
+        print(f"[ERROR] Failed to extract snippet from {bug_file_path}: {e}")
         return ""
 
-def build_enhanced_query(entry: dict, local_repo_path: str) -> str:
-    """Constructs an enhanced query using file context or falling back to sourceBeforeFix."""
+def build_enhanced_query(entry: dict, blobs: BlobLines) -> str:
+    """Constructs an enhanced query using file context at the fix parent or falling back to sourceBeforeFix."""
     source_before = entry.get("sourceBeforeFix", "").strip()
     bug_line_num = entry.get("bugLineNum")
     bug_file_path = entry.get("bugFilePath")
-    context_snippet = extract_context_snippet(local_repo_path, bug_file_path, bug_line_num)
-    return f'"{context_snippet}"' if context_snippet else f'"{source_before}"'
-
-def get_commit_date(commit_obj):
-    """Returns the commit's date using author or committer information."""
-    commit_data = commit_obj.commit
-    if commit_data.author and commit_data.author.date:
-        return commit_data.author.date
-    elif commit_data.committer and commit_data.committer.date:
-        return commit_data.committer.date
-    else:
-        return None
+    context_snippet = extract_context_snippet(blobs, fix_parent_rev(entry), bug_file_path, bug_line_num)
+    # passed to git as a single argument, so no shell quotes around it
+    return context_snippet if context_snippet else source_before
 
 def detect_explicit_mention(text: str) -> bool:
-    """Returns True if any of the BUG_KEYWORDS appear in the provided text."""
-    lower_text = text.lower()
-    for kw in BUG_KEYWORDS:
-        if kw in lower_text:
-            return True
-    return False
-
-def find_bug_introducing_commit_local(local_repo_path: str, bug_file_path: str, entry: dict, before_time: str = None) -> (str, str):
+    """Returns True if any of the BUG_KEYWORDS appears as a whole word in the provided text."""
+    return KEYWORD_MATCHER.search(text)
+
+def find_bug_introducing_commit_local(local_repo_path: str, bug_file_path: str, entry: dict, blobs: BlobLines, before_time: str = None) -> (str, str):
     """
     Uses git log with -S and the enhanced query to search for the introducing commit.
     If before_time is provided, adds a '--before' filter.
     Returns (introducing_commit_hash, introducing_commit_date_str) or (None, None).
     """
-    query_snippet = build_enhanced_query(entry, local_repo_path)
+    query_snippet = build_enhanced_query(entry, blobs)
     cmd = ["git", "log", "-S", query_snippet, "--reverse", "--pretty=format:%H %aI"]
     if before_time:
         cmd.extend(["--before", before_time])
@@ -144,131 +156,147 @@ def find_bug_introducing_commit_local(local_repo_path: str, bug_file_path: str,
         print(f"[ERROR] git log failed in {local_repo_path}: {e.stderr}")
         return None, None
 
-def szz_detect_bug_introducing_commit(local_repo_path: str, bug_file_path: str, fix_parent_sha: str, bug_line_num: int) -> (str, str):
-    """A simple SZZ implementation using git blame to find the last commit touching the bug line."""
-    cmd = ["git", "blame", fix_parent_sha, "--", bug_file_path]
-    try:
-        result = subprocess.run(
-            cmd,
-            cwd=local_repo_path,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding="utf-8",
-            errors="replace",  # Replace problematic characters
-            check=True
-        )
-        lines = result.stdout.splitlines()
-        if len(lines) < bug_line_num:
-            return None, None
-        target_line = lines[bug_line_num - 1]  # 1-indexed.
-        parts = target_line.split()
-        if parts:
-            introducing_commit_hash = parts[0]
-            cmd_date = ["git", "show", "-s", "--format=%aI", introducing_commit_hash]
-            result_date = subprocess.run(
-                cmd_date,
-                cwd=local_repo_path,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding="utf-8",
-                errors="replace",  # Replace problematic characters
-                check=True
-            )
-            introducing_commit_date = result_date.stdout.strip()
-            return introducing_commit_hash, introducing_commit_date
+def szz_detect_bug_introducing_commit(local_repo_path: str, project_name: str, bug_file_path: str, fix_parent_sha: str, bug_line_num: int, cat=None) -> (str, str):
+    """
+    A simple SZZ implementation: the commit that last touched the bug line as of the fix parent,
+    from the blame cache or one `git blame -L` of that line. Returns (full SHA, author date).
+    """
+    if not isinstance(bug_line_num, int):
         return None, None
+    try:
+        blamed = blame_cache.blame(local_repo_path, project_name, fix_parent_sha, bug_file_path, [bug_line_num], cat)
     except subprocess.CalledProcessError as e:
-        print(f"[ERROR] git blame failed in {local_repo_path}: {e.stderr}")
+        print(f"[ERROR] git blame failed in {local_repo_path}: {e}")
         return None, None
+    info = blamed.get(bug_line_num)
+    if not info:
+        return None, None
+    return info["commit"], info["authorDate"]
+
+# -------------------------------
+# COMMIT METADATA
+# -------------------------------
+async def fetch_commits_async(repo_full_name: str, shas: list) -> dict:
+    owner, repo = repo_full_name.split("/")
+    if FETCH_MODE == "graphql":
+        async with AsyncGitHubClient(graphql_token_pool, cache=response_cache) as client:
+            return await github_graphql.fetch_commits(client, owner, repo, shas, GRAPHQL_BATCH_SIZE)
+
+    async with AsyncGitHubClient(token_pool, concurrency=REST_CONCURRENCY, cache=response_cache) as client:
+        results = await asyncio.gather(*(github_collector.get_commit(client, owner, repo, sha) for sha in shas))
+    return {sha: commit for sha, commit in zip(shas, results) if commit}
+
+async def fetch_pull_requests_async(repo_full_name: str, numbers: list, with_comments: bool) -> dict:
+    owner, repo = repo_full_name.split("/")
+    if FETCH_MODE == "graphql":
+        async with AsyncGitHubClient(graphql_token_pool, cache=response_cache) as client:
+            return await github_graphql.fetch_pull_requests(client, owner, repo, numbers, with_comments, GRAPHQL_BATCH_SIZE)
+
+    async with AsyncGitHubClient(token_pool, concurrency=REST_CONCURRENCY, cache=response_cache) as client:
+        results = await asyncio.gather(*(
+            github_collector.get_pull_request_reviews(client, owner, repo, number, with_comments) for number in numbers
+        ))
+    return dict(zip(numbers, results))
 
-def get_pr_info_from_commit(repo_obj, commit_obj):
+def fetch_commits(repo_full_name: str, shas) -> dict:
     """
-    Retrieves PR info associated with a commit using the GitHub API.
-    Returns (dictionary with PR info, PR object or None).
+    Returns {sha: {"date", "message", "pr"}} for the commits that could be
+    fetched. In graphql mode the commits are resolved GRAPHQL_BATCH_SIZE at a time.
     """
-    pr_info = {}
+    shas = [sha for sha in dict.fromkeys(shas) if sha]
+    if not shas:
+        return {}
     try:
-        prs = commit_obj.get_pulls()
-        for pr in prs:
-            full_pr = repo_obj.get_pull(pr.number)
-            pr_info = {
-                "pr_number": full_pr.number,
-                "pr_created_at": full_pr.created_at.isoformat() if full_pr.created_at else None,
-                "pr_merged_at": full_pr.merged_at.isoformat() if full_pr.merged_at else None,
-                "reviewer_count": len({rv.user.login for rv in full_pr.get_reviews() if rv.user}),
-            }
-            return pr_info, full_pr
+        return asyncio.run(fetch_commits_async(repo_full_name, shas))
     except Exception as e:
-        print(f"[ERROR] Getting PR info failed: {e}")
-    return pr_info, None
-
-def handle_remove_readonly(func, path, exc_info):
-    """Callback for shutil.rmtree to handle read-only files on Windows."""
-    import errno
-    exc_value = exc_info[1]
-    if func in (os.rmdir, os.remove, os.unlink) and exc_value.errno == errno.EACCES:
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-    else:
-        raise
+        print(f"[ERROR] Fetching commits failed for {repo_full_name}: {e}")
+        return {}
 
-# -------------------------------
-# PERSISTENT CACHING FUNCTIONS
-# -------------------------------
-def get_cached_commit(repo_obj, commit_sha: str):
-    if commit_sha in commit_cache:
-        return commit_cache[commit_sha]
+def fetch_pull_requests(repo_full_name: str, numbers, with_comments: bool = False) -> dict:
+    """Returns {pr_number: {"reviewerCount", "reviewComments"}} for the PRs that could be fetched."""
+    numbers = list(dict.fromkeys(numbers))
+    if not numbers:
+        return {}
     try:
-        commit_obj = repo_obj.get_commit(sha=commit_sha)
-        commit_cache[commit_sha] = commit_obj
-        return commit_obj
+        return asyncio.run(fetch_pull_requests_async(repo_full_name, numbers, with_comments))
     except Exception as e:
-        print(f"[ERROR] Failed to fetch commit {commit_sha}: {e}")
-        return None
-
-def get_cached_pr_info(repo_obj, commit_sha: str):
-    if commit_sha in pr_cache:
-        return pr_cache[commit_sha]
-    commit_obj = get_cached_commit(repo_obj, commit_sha)
-    if commit_obj is None:
-        return {}, None
-    pr_info, pr_obj = get_pr_info_from_commit(repo_obj, commit_obj)
-    pr_cache[commit_sha] = (pr_info, pr_obj)
-    return pr_info, pr_obj
+        print(f"[ERROR] Fetching pull requests failed for {repo_full_name}: {e}")
+        return {}
+
+def commit_metadata(commit: dict, pull_requests: dict) -> dict:
+    """Joins a fetched commit with its PR's reviews into the metadata used by build_record."""
+    pr = commit["pr"]
+    pr_info = {}
+    reviews = {}
+    if pr:
+        reviews = pull_requests.get(pr["number"], {})
+        pr_info = {
+            "pr_number": pr["number"],
+            "pr_created_at": pr["createdAt"],
+            "pr_merged_at": pr["mergedAt"],
+            "reviewer_count": reviews.get("reviewerCount", 0),
+        }
+    return {
+        "date": commit["date"],
+        "message": commit["message"],
+        "pr": pr_info,
+        "reviewComments": reviews.get("reviewComments", []),
+    }
 
 # -------------------------------
-# PROCESSING FUNCTION FOR A SINGLE ENTRY
+# PROCESSING FUNCTIONS
 # -------------------------------
-def process_entry_inner(entry, local_repo_path, repo_obj):
-    fix_sha = entry.get("fixCommitSHA1")
-    bug_type = entry.get("bugType")
-    source_before_fix = entry.get("sourceBeforeFix")
+def fix_cutoff_time(fix_commit: dict) -> str:
+    """The bug was introduced before its fix was merged (or committed, without a PR)."""
+    return (fix_commit["pr"] or {}).get("mergedAt") or fix_commit["date"]
+
+def find_bug_introducing_commits_batched(local_repo_path: str, entries: list, commits: dict, blobs: BlobLines) -> dict:
+    """
+    Pickaxe search for every entry without a fix parent, one newest-first history walk per file
+    for all of its snippets. Returns {entry position: (introducing_commit_hash, date) or (None, None)}.
+    """
+    by_file = {}
+    for i, entry in enumerate(entries):
+        fix_commit = commits.get(entry.get("fixCommitSHA1"))
+        if fix_commit and not entry.get("fixCommitParentSHA1"):
+            query = (build_enhanced_query(entry, blobs), fix_cutoff_time(fix_commit))
+            by_file.setdefault(entry.get("bugFilePath"), {})[i] = query
+    found = {}
+    for bug_file_path, queries in by_file.items():
+        found.update(find_introducing_commits(local_repo_path, bug_file_path, queries))
+    return found
+
+def detect_introducing_commit(entry: dict, local_repo_path: str, fix_commit: dict, blobs: BlobLines, pickaxe_result=None) -> (str, str):
+    """
+    Runs SZZ when the fix parent is known, otherwise searches history before the fix
+    (or takes `pickaxe_result` from find_bug_introducing_commits_batched).
+    """
     bug_file_path = entry.get("bugFilePath")
-    bug_line_num = entry.get("bugLineNum")
     fix_parent_sha = entry.get("fixCommitParentSHA1")
-    
-    fix_commit_obj = get_cached_commit(repo_obj, fix_sha)
-    if not fix_commit_obj:
-        return None
-    fix_commit_date = get_commit_date(fix_commit_obj)
-    fix_commit_date_str = fix_commit_date.isoformat() if fix_commit_date else None
-    fix_pr_info, _ = get_cached_pr_info(repo_obj, fix_sha)
-    fix_commit_has_pr = bool(fix_pr_info)
-    
-    cutoff_time = fix_pr_info.get("pr_merged_at") if fix_pr_info.get("pr_merged_at") else fix_commit_date_str
-    
+    cutoff_time = fix_cutoff_time(fix_commit)
+
     if fix_parent_sha:
-        intro_commit_hash, intro_commit_date_str = szz_detect_bug_introducing_commit(local_repo_path, bug_file_path, fix_parent_sha, bug_line_num)
+        intro_commit_hash, intro_commit_date_str = szz_detect_bug_introducing_commit(
+            local_repo_path, entry.get("projectName"), bug_file_path, fix_parent_sha, entry.get("bugLineNum"), blobs.cat
+        )
+    elif pickaxe_result is not None:
+        intro_commit_hash, intro_commit_date_str = pickaxe_result
     else:
-        intro_commit_hash, intro_commit_date_str = find_bug_introducing_commit_local(local_repo_path, bug_file_path, entry, before_time=cutoff_time)
-    
+        intro_commit_hash, intro_commit_date_str = find_bug_introducing_commit_local(
+            local_repo_path, bug_file_path, entry, blobs, before_time=cutoff_time
+        )
+
     if intro_commit_hash:
         print(f"[INFO] Found introducing commit {intro_commit_hash} with date {intro_commit_date_str}")
     else:
-        print(f"[WARN] No introducing commit found for snippet: {source_before_fix}")
-    
+        print(f"[WARN] No introducing commit found for snippet: {entry.get('sourceBeforeFix')}")
+    return intro_commit_hash, intro_commit_date_str
+
+def build_record(entry: dict, fix_metadata: dict, intro_commit_hash: str, intro_commit_date_str: str, intro_metadata: dict):
+    """Combines an SStuB with its fix/introducing commit metadata into an augmented record."""
+    fix_commit_date_str = fix_metadata["date"]
+    fix_pr_info = fix_metadata["pr"]
+
     time_to_fix_hours_commit = None
     if fix_commit_date_str and intro_commit_date_str:
         try:
@@ -278,17 +306,11 @@ def process_entry_inner(entry, local_repo_path, repo_obj):
             time_to_fix_hours_commit = delta.total_seconds() / 3600.0
         except Exception as e:
             print(f"[ERROR] Commit-based time-to-fix calculation failed: {e}")
-    
-    introducing_commit_has_pr = False
-    introducing_pr_info = {}
-    if intro_commit_hash:
-        try:
-            intro_commit_obj = get_cached_commit(repo_obj, intro_commit_hash)
-            introducing_pr_info, _ = get_cached_pr_info(repo_obj, intro_commit_hash)
-            introducing_commit_has_pr = bool(introducing_pr_info)
-        except Exception as e:
-            print(f"[ERROR] Failed to get PR info for introducing commit {intro_commit_hash}: {e}")
-    
+
+    introducing_pr_info = intro_metadata["pr"] if intro_metadata else {}
+    if intro_commit_hash and intro_metadata is None:
+        print(f"[ERROR] Failed to get PR info for introducing commit {intro_commit_hash}")
+
     time_to_fix_hours_pr = None
     fix_pr_merged = fix_pr_info.get("pr_merged_at") if fix_pr_info.get("pr_merged_at") else None
     intro_pr_merged = introducing_pr_info.get("pr_merged_at") if introducing_pr_info.get("pr_merged_at") else None
@@ -300,252 +322,206 @@ def process_entry_inner(entry, local_repo_path, repo_obj):
             time_to_fix_hours_pr = delta_pr.total_seconds() / 3600.0
         except Exception as e:
             print(f"[ERROR] PR-based time-to-fix calculation failed: {e}")
-    
+
     # Separate explicit mention detection:
     explicit_bug_mention_commit = False
     explicit_bug_mention_pr = False
-    if intro_commit_hash:
-        try:
-            intro_commit_obj = get_cached_commit(repo_obj, intro_commit_hash)
-            commit_message = intro_commit_obj.commit.message
-            if detect_explicit_mention(commit_message):
-                explicit_bug_mention_commit = True
-                print(f"[DEBUG] Found explicit mention in introducing commit message: {commit_message}")
-        except Exception as e:
-            print(f"[ERROR] Failed to get commit message for introducing commit {intro_commit_hash}: {e}")
-        
+    if intro_metadata:
+        commit_message = intro_metadata["message"] or ""
+        if detect_explicit_mention(commit_message):
+            explicit_bug_mention_commit = True
+            print(f"[DEBUG] Found explicit mention in introducing commit message: {commit_message}")
         if introducing_pr_info:
-            try:
-                _, intro_pr_obj = get_cached_pr_info(repo_obj, intro_commit_hash)
-                if intro_pr_obj:
-                    for comment in intro_pr_obj.get_review_comments():
-                        if detect_explicit_mention(comment.body):
-                            explicit_bug_mention_pr = True
-                            print(f"[DEBUG] Found explicit mention in introducing PR review comment: {comment.body}")
-                            break
-            except Exception as e:
-                print(f"[ERROR] Failed to get review comments for introducing PR: {e}")
-    
+            # all review comments of the PR are scanned in one pass
+            comments = intro_metadata["reviewComments"]
+            for body, found in zip(comments, KEYWORD_MATCHER.any(comments)):
+                if found:
+                    explicit_bug_mention_pr = True
+                    print(f"[DEBUG] Found explicit mention in introducing PR review comment: {body}")
+                    break
+
     record = OrderedDict()
-    record["fixCommitSHA1"] = fix_sha
+    record["fixCommitSHA1"] = entry.get("fixCommitSHA1")
     record["fixCommitDate"] = fix_commit_date_str
-    record["fixCommitHasPR"] = fix_commit_has_pr
+    record["fixCommitHasPR"] = bool(fix_pr_info)
     record["fixPR"] = fix_pr_info
     record["introducingCommitSHA"] = intro_commit_hash
     record["introducingCommitDate"] = intro_commit_date_str
-    record["introducingCommitHasPR"] = introducing_commit_has_pr
+    record["introducingCommitHasPR"] = bool(introducing_pr_info)
     record["introducingPR"] = introducing_pr_info
     record["TimeToFixHoursCommit"] = time_to_fix_hours_commit
     record["TimeToFixHoursPR"] = time_to_fix_hours_pr
     record["explicitMentionInIntroducingCommit"] = explicit_bug_mention_commit
     record["explicitMentionInIntroducingPR"] = explicit_bug_mention_pr
-    record["bugType"] = bug_type
+    record["bugType"] = entry.get("bugType")
     record["projectName"] = entry.get("projectName")
-    record["sourceBeforeFix"] = source_before_fix
-    record["bugFilePath"] = bug_file_path
-    record["bugLineNum"] = bug_line_num
+    record["sourceBeforeFix"] = entry.get("sourceBeforeFix")
+    record["bugFilePath"] = entry.get("bugFilePath")
+    record["bugLineNum"] = entry.get("bugLineNum")
     return record
 
+def process_repository(repo_full_name: str, entries: list, local_repo_path: str, dedup_stats: dict,
+                       commits: dict, pull_requests: dict, reviewed: set) -> list:
+    """
+    Augments a batch of entries of one repository: every distinct fix commit,
+    introducing commit and PR is fetched once (commits that are both fix and
+    introducing commits only once), SZZ runs locally in between, and the
+    results are fanned out to the entries. `commits` and `pull_requests` hold
+    what earlier batches of the repository fetched and are extended here;
+    `reviewed` holds the PRs whose review comments were fetched.
+    Returns one record per entry, None where the fix commit could not be fetched.
+    """
+    fix_shas = [entry.get("fixCommitSHA1") for entry in entries]
+    fetched = fetch_commits(repo_full_name, [sha for sha in set(fix_shas) if sha not in commits])
+    commits.update(fetched)
+
+    introducing = []
+    with CatFileBatch(local_repo_path) as cat:
+        blobs = BlobLines(cat, max_files=SNIPPET_CACHE_FILES)
+        pickaxe_results = find_bug_introducing_commits_batched(local_repo_path, entries, commits, blobs) if PICKAXE_MODE == "batched" else {}
+        for i, entry in enumerate(entries):
+            fix_sha = entry.get("fixCommitSHA1")
+            if fix_sha not in commits:
+                print(f"[ERROR] Cannot find fix commit {fix_sha}")
+                introducing.append(None)
+                continue
+            introducing.append(detect_introducing_commit(entry, local_repo_path, commits[fix_sha], blobs, pickaxe_results.get(i)))
+
+    intro_shas = [found[0] for found in introducing if found and found[0]]
+    new_intro = fetch_commits(repo_full_name, [sha for sha in set(intro_shas) if sha not in commits])
+    commits.update(new_intro)
+    fetched.update(new_intro)
+
+    # review comments are only needed for introducing PRs
+    intro_prs = {commits[sha]["pr"]["number"] for sha in intro_shas if sha in commits and commits[sha]["pr"]}
+    fix_prs = {commits[sha]["pr"]["number"] for sha in set(fix_shas) if sha in commits and commits[sha]["pr"]}
+    new_reviewed = fetch_pull_requests(repo_full_name, sorted(intro_prs - reviewed), with_comments=True)
+    pull_requests.update(new_reviewed)
+    reviewed.update(new_reviewed)
+    project_name = entries[0].get("projectName")
+    review_corpus.add_commits(project_name, fetched)
+    review_corpus.add_pull_requests(project_name, new_reviewed)
+    new_prs = fetch_pull_requests(repo_full_name, sorted(fix_prs - intro_prs - set(pull_requests)))
+    pull_requests.update(new_prs)
+
+    dedup_stats["records"] += len(entries)
+    dedup_stats["fix_refs"] += len(fix_shas)
+    dedup_stats["fix_commits"] += len(set(fix_shas))
+    dedup_stats["intro_refs"] += len(intro_shas)
+    dedup_stats["intro_commits"] += len(set(intro_shas))
+    dedup_stats["commits_fetched"] += len(fetched)
+    dedup_stats["pr_refs"] += sum(1 for sha in fix_shas + intro_shas if sha in commits and commits[sha]["pr"])
+    dedup_stats["prs_fetched"] += len(new_reviewed) + len(new_prs)
+
+    records = []
+    for entry, found in zip(entries, introducing):
+        if found is None:
+            records.append(None)
+            continue
+        intro_commit_hash, intro_commit_date_str = found
+        fix_metadata = commit_metadata(commits[entry.get("fixCommitSHA1")], pull_requests)
+        intro_metadata = commit_metadata(commits[intro_commit_hash], pull_requests) if intro_commit_hash in commits else None
+        records.append(build_record(entry, fix_metadata, intro_commit_hash, intro_commit_date_str, intro_metadata))
+    return records
+
+def dedup_report(dedup_stats: dict) -> str:
+    """Summarizes how many lookups each fetched commit and PR served (references per unique fetch)."""
+    def ratio(refs, unique):
+        return f"{refs / unique:.1f}x" if unique else "n/a"
+    commit_refs = dedup_stats["fix_refs"] + dedup_stats["intro_refs"]
+    return (
+        f"{dedup_stats['records']} records -> "
+        f"{dedup_stats['fix_commits']} fix commits ({ratio(dedup_stats['fix_refs'], dedup_stats['fix_commits'])}), "
+        f"{dedup_stats['intro_commits']} introducing commits ({ratio(dedup_stats['intro_refs'], dedup_stats['intro_commits'])}), "
+        f"{dedup_stats['commits_fetched']} commits fetched ({ratio(commit_refs, dedup_stats['commits_fetched'])}), "
+        f"{dedup_stats['prs_fetched']} PRs fetched ({ratio(dedup_stats['pr_refs'], dedup_stats['prs_fetched'])})"
+    )
+
 def process_repo_entries(repo_full_name, entries, global_pbar):
-    results = []
-    local_repo_path = get_local_repo_path(repo_full_name)
-    if not os.path.exists(local_repo_path):
-        repo_url = get_repo_url(repo_full_name)
-        print(f"[INFO] Cloning {repo_url} into {local_repo_path}")
-        try:
-            subprocess.run(["git", "clone", "--config", "core.longpaths=true", repo_url, local_repo_path], check=True)
-        except subprocess.CalledProcessError as e:
-            print(f"[ERROR] Failed to clone {repo_url}: {e.stderr}")
-            return results
     try:
-        repo_obj = g.get_repo(repo_full_name)
-    except Exception as e:
-        print(f"[ERROR] Cannot access repository {repo_full_name}: {e}")
-        return results
-
-    for entry in entries:
-        record = process_entry_inner(entry, local_repo_path, repo_obj)
-        global_pbar.update(1)
-        if record:
-            results.append(record)
-    print(f"[INFO] Deleting local clone for {repo_full_name} at {local_repo_path}")
-    shutil.rmtree(local_repo_path, onerror=handle_remove_readonly)
+        local_repo_path = mirror_store.get(repo_full_name)
+    except subprocess.CalledProcessError as e:
+        print(f"[ERROR] Failed to mirror {repo_full_name}: {e.stderr}")
+        return []
+
+    dedup_stats = Counter()
+    results = [record for record in process_repository(repo_full_name, entries, local_repo_path, dedup_stats, {}, {}, set()) if record]
+    global_pbar.update(len(entries))
     return results
 
 def main():
-    # Load the full JSON dataset.
-    with open(SSTUBS_JSON_PATH, "r", encoding="utf-8") as f:
-        sstubs_data = json.load(f)
-    
-    total_entries = len(sstubs_data)
-    global_pbar = tqdm(total=total_entries, desc="Processing SStuBs", unit="stub")
-    
-    augmented_records = []
-    # Process records in chunks of CHUNK_SIZE.
-    for i in range(0, total_entries, CHUNK_SIZE):
-        checkpoint_file = os.path.join(CHECKPOINT_DIR, f"checkpoint_{i}.json")
-        if os.path.exists(checkpoint_file):
-            print(f"[INFO] Skipping checkpoint {i} as it already exists.")
-            global_pbar.update(CHUNK_SIZE)
+    # Replay the journal so finished records are skipped and failed ones retried.
+    journal = Journal(JOURNAL_PATH)
+    if not len(journal):
+        index_of = {record_key(entry): i for i, entry in enumerate(iter_records(SSTUBS_JSON_PATH))}
+        imported = journal.import_checkpoints(CHECKPOINT_DIR, index_of)
+        if imported:
+            print(f"[INFO] Imported {imported} records from existing checkpoint files.")
+    print(f"[INFO] Journal: {journal.counts()}")
+
+    # Stream sstubs.json and plan the pending work per repository (the file is not sorted
+    # by project), so every repository is cloned once and each of its commits and PRs is
+    # fetched once. Only the fields in SSTUB_FIELDS of pending records are kept in memory.
+    total_entries = 0
+    pending = 0
+    plan = {}
+    for i, entry in enumerate(project(iter_records(SSTUBS_JSON_PATH), SSTUB_FIELDS)):
+        total_entries += 1
+        if journal.is_done(entry):
             continue
-        
-        chunk = sstubs_data[i:i+CHUNK_SIZE]
-        current_repo = None
-        current_local_repo_path = None
-        chunk_records = []
-        for entry in chunk:
-            fix_sha = entry.get("fixCommitSHA1")
-            project_name = entry.get("projectName")
-            source_before_fix = entry.get("sourceBeforeFix")
-            bug_file_path = entry.get("bugFilePath")
-            bug_line_num = entry.get("bugLineNum")
-            fix_parent_sha = entry.get("fixCommitParentSHA1")
-            bug_type = entry.get("bugType")
-        
-            if not fix_sha or not project_name or not source_before_fix or not bug_file_path or not bug_line_num:
-                print("[WARN] Missing essential fields; skipping record.")
-                global_pbar.update(1)
-                continue
-        
-            repo_full_name = parse_owner_repo(project_name)
-            new_local_repo_path = get_local_repo_path(project_name)
-        
-            if current_repo != repo_full_name:
-                if current_local_repo_path and os.path.exists(current_local_repo_path):
-                    print(f"[INFO] Deleting local clone for {current_repo} at {current_local_repo_path}")
-                    shutil.rmtree(current_local_repo_path, onerror=handle_remove_readonly)
-                if not os.path.exists(new_local_repo_path):
-                    repo_url = get_repo_url(project_name)
-                    print(f"[INFO] Cloning {repo_url} into {new_local_repo_path}")
-                    try:
-                        subprocess.run(["git", "clone", "--config", "core.longpaths=true", repo_url, new_local_repo_path], check=True)
-                    except subprocess.CalledProcessError as e:
-                        print(f"[ERROR] Failed to clone {repo_url}: {e.stderr}")
-                        global_pbar.update(1)
-                        continue
-                current_repo = repo_full_name
-                current_local_repo_path = new_local_repo_path
-        
-            print(f"\n[INFO] Processing project: {repo_full_name}, fix commit: {fix_sha}")
-        
-            try:
-                repo_obj = g.get_repo(repo_full_name)
-            except Exception as e:
-                print(f"[ERROR] Cannot access repository {repo_full_name}: {e}")
-                global_pbar.update(1)
-                continue
+        if not all(entry.get(k) for k in ("fixCommitSHA1", "projectName", "sourceBeforeFix", "bugFilePath", "bugLineNum")):
+            print("[WARN] Missing essential fields; skipping record.")
+            journal.append(entry, i, "skipped", error="missing essential fields")
+            continue
+        plan.setdefault(parse_owner_repo(entry["projectName"]), []).append((i, entry))
+        pending += 1
+
+    global_pbar = tqdm(total=total_entries, initial=total_entries - pending, desc="Processing SStuBs", unit="stub")
+
+    dedup_stats = Counter()
+    for repo_full_name, indexed_entries in plan.items():
+        try:
+            local_repo_path = mirror_store.get(repo_full_name, get_repo_url(indexed_entries[0][1]["projectName"]))
+        except subprocess.CalledProcessError as e:
+            print(f"[ERROR] Failed to mirror {repo_full_name}: {e.stderr}")
+            for i, entry in indexed_entries:
+                journal.append(entry, i, "failed", error="clone failed")
+            global_pbar.update(len(indexed_entries))
+            continue
+
+        print(f"\n[INFO] Processing project: {repo_full_name}, {len(indexed_entries)} records")
+        # batches are journaled as soon as they finish; commits and PRs fetched for one batch serve the next ones
+        commits, pull_requests, reviewed = {}, {}, set()
+        for start in range(0, len(indexed_entries), CHUNK_SIZE):
+            batch = indexed_entries[start:start + CHUNK_SIZE]
             try:
-                fix_commit_obj = repo_obj.get_commit(sha=fix_sha)
-                fix_commit_date = get_commit_date(fix_commit_obj)
+                records = process_repository(repo_full_name, [entry for _, entry in batch], local_repo_path, dedup_stats,
+                                             commits, pull_requests, reviewed)
             except Exception as e:
-                print(f"[ERROR] Cannot find fix commit {fix_sha}: {e}")
-                global_pbar.update(1)
+                print(f"[ERROR] Processing {repo_full_name} failed: {e!r}")
+                for i, entry in batch:
+                    journal.append(entry, i, "failed", error=repr(e))
+                global_pbar.update(len(batch))
                 continue
-            fix_commit_date_str = fix_commit_date.isoformat() if fix_commit_date else None
-            fix_pr_info, _ = get_pr_info_from_commit(repo_obj, fix_commit_obj)
-        
-            cutoff_time = fix_pr_info.get("pr_merged_at") if fix_pr_info.get("pr_merged_at") else fix_commit_date_str
-        
-            if fix_parent_sha:
-                intro_commit_hash, intro_commit_date_str = szz_detect_bug_introducing_commit(
-                    current_local_repo_path, bug_file_path, fix_parent_sha, bug_line_num
-                )
-            else:
-                intro_commit_hash, intro_commit_date_str = find_bug_introducing_commit_local(
-                    current_local_repo_path, bug_file_path, entry, before_time=cutoff_time
-                )
-        
-            if intro_commit_hash:
-                print(f"[INFO] Found introducing commit {intro_commit_hash} with date {intro_commit_date_str}")
-            else:
-                print(f"[WARN] No introducing commit found for snippet: {source_before_fix}")
-        
-            time_to_fix_hours_commit = None
-            if fix_commit_date_str and intro_commit_date_str:
-                try:
-                    fix_dt = datetime.fromisoformat(fix_commit_date_str)
-                    intro_dt = datetime.fromisoformat(intro_commit_date_str)
-                    delta = fix_dt - intro_dt
-                    time_to_fix_hours_commit = delta.total_seconds() / 3600.0
-                except Exception as e:
-                    print(f"[ERROR] Commit-based time-to-fix calculation failed: {e}")
-        
-            introducing_commit_has_pr = False
-            introducing_pr_info = {}
-            if intro_commit_hash:
-                try:
-                    intro_commit_obj = repo_obj.get_commit(sha=intro_commit_hash)
-                    introducing_pr_info, _ = get_pr_info_from_commit(repo_obj, intro_commit_obj)
-                    introducing_commit_has_pr = bool(introducing_pr_info)
-                except Exception as e:
-                    print(f"[ERROR] Failed to get PR info for introducing commit {intro_commit_hash}: {e}")
-        
-            time_to_fix_hours_pr = None
-            fix_pr_merged = fix_pr_info.get("pr_merged_at") if fix_pr_info.get("pr_merged_at") else None
-            intro_pr_merged = introducing_pr_info.get("pr_merged_at") if introducing_pr_info.get("pr_merged_at") else None
-            if fix_pr_merged and intro_pr_merged:
-                try:
-                    fix_pr_merge_dt = datetime.fromisoformat(fix_pr_merged)
-                    intro_pr_merge_dt = datetime.fromisoformat(intro_pr_merged)
-                    delta_pr = fix_pr_merge_dt - intro_pr_merge_dt
-                    time_to_fix_hours_pr = delta_pr.total_seconds() / 3600.0
-                except Exception as e:
-                    print(f"[ERROR] PR-based time-to-fix calculation failed: {e}")
-        
-            explicit_bug_mention_commit = False
-            explicit_bug_mention_pr = False
-            if intro_commit_hash:
-                try:
-                    intro_commit_obj = repo_obj.get_commit(sha=intro_commit_hash)
-                    commit_message = intro_commit_obj.commit.message
-                    if detect_explicit_mention(commit_message):
-                        explicit_bug_mention_commit = True
-                        print(f"[DEBUG] Found explicit mention in introducing commit message: {commit_message}")
-                except Exception as e:
-                    print(f"[ERROR] Failed to get commit message for introducing commit {intro_commit_hash}: {e}")
-        
-            if introducing_pr_info:
-                try:
-                    _, intro_pr_obj = get_pr_info_from_commit(repo_obj, intro_commit_obj)
-                    if intro_pr_obj:
-                        for comment in intro_pr_obj.get_review_comments():
-                            if detect_explicit_mention(comment.body):
-                                explicit_bug_mention_pr = True
-                                print(f"[DEBUG] Found explicit mention in introducing PR review comment: {comment.body}")
-                                break
-                except Exception as e:
-                    print(f"[ERROR] Failed to get review comments for introducing PR: {e}")
-        
-            record = OrderedDict()
-            record["fixCommitSHA1"] = fix_sha
-            record["fixCommitDate"] = fix_commit_date_str
-            record["fixCommitHasPR"] = bool(fix_pr_info)
-            record["fixPR"] = fix_pr_info
-            record["introducingCommitSHA"] = intro_commit_hash
-            record["introducingCommitDate"] = intro_commit_date_str
-            record["introducingCommitHasPR"] = bool(introducing_pr_info)
-            record["introducingPR"] = introducing_pr_info
-            record["TimeToFixHoursCommit"] = time_to_fix_hours_commit
-            record["TimeToFixHoursPR"] = time_to_fix_hours_pr
-            record["explicitMentionInIntroducingCommit"] = explicit_bug_mention_commit
-            record["explicitMentionInIntroducingPR"] = explicit_bug_mention_pr
-            record["bugType"] = bug_type
-            record["projectName"] = project_name
-            record["sourceBeforeFix"] = source_before_fix
-            record["bugFilePath"] = bug_file_path
-            record["bugLineNum"] = bug_line_num
-        
-            augmented_records.append(record)
-        
-        # End of chunk: save this chunk's results as a checkpoint.
-        checkpoint_file = os.path.join(CHECKPOINT_DIR, f"checkpoint_{i}.json")
-        with open(checkpoint_file, "w", encoding="utf-8") as f:
-            json.dump(augmented_records, f, indent=2, default=str)
-        print(f"[INFO] Saved checkpoint for records {i} to {i+len(augmented_records)} in {checkpoint_file}")
-        augmented_records = []  # Reset for next chunk
-    
+            for (i, entry), record in zip(batch, records):
+                if record is None:
+                    journal.append(entry, i, "failed", error="fix commit not found")
+                else:
+                    journal.append(entry, i, "ok", record=record)
+            global_pbar.update(len(batch))
+        mirror_store.touch(repo_full_name)
+
     global_pbar.close()
-    print(f"\n[INFO] Augmentation complete for {total_entries} records.")
+    merged = journal.compact(MERGED_OUTPUT_PATH)
+    journal.close()
+    print(f"\n[INFO] Augmentation complete for {total_entries} records, {merged} written to {MERGED_OUTPUT_PATH}.")
+    print(f"[INFO] Journal: {journal.counts()}")
+    print(f"[INFO] Dedup: {dedup_report(dedup_stats)}")
+    print(f"[INFO] Response cache: {response_cache.summary()}")
+    print(f"[INFO] Mirrors: {mirror_store.summary()}")
+    print(f"[INFO] Blame cache: {blame_cache.summary()}")
+    blame_cache.close()
+    review_corpus.close()
 
 if __name__ == "__main__":
     main()
@@ -1,5 +1,10 @@
-import json
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.preprocessing.streaming import iter_records, JsonArrayWriter
+from src.preprocessing.columnar import write_table
 
 def is_test_file(file_path):
     path = file_path.lower()
@@ -9,19 +14,17 @@ def is_valid_fixing_time(bug):
     time = bug.get("TimeToFixHoursCommit")
     return time is not None and time > 0
 
-# Load the bug dataset
-with open('merged_checkpoints.json', 'r') as f:
-    bug_data = json.load(f)
-
+# Stream the bug dataset through the filter into the output, one record at a time
 # Filter: exclude test files AND invalid fixing times
-filtered_bugs = [
-    bug for bug in bug_data
-    if not is_test_file(bug.get("bugFilePath", "")) and is_valid_fixing_time(bug)
-]
+def filtered_bugs(writer):
+    for bug in iter_records('merged_checkpoints.json'):
+        if not is_test_file(bug.get("bugFilePath", "")) and is_valid_fixing_time(bug):
+            writer.write(bug)
+            yield bug
 
-# Save filtered dataset
-with open('bugs_no_test_files.json', 'w') as f:
-    json.dump(filtered_bugs, f, indent=4)
+# Save filtered dataset as JSON and as a typed parquet dataset (read by analysis.py)
+with JsonArrayWriter('bugs_no_test_files.json', indent=4) as writer:
+    write_table(filtered_bugs(writer), 'bugs_no_test_files.parquet', 'sstubs')
 
-print(f"Filtered dataset written with {len(filtered_bugs)} entries (excluding test files and non-positive fixing times).")
-print("Saved to:", os.path.abspath('bugs_no_test_files.json'))
+print(f"Filtered dataset written with {writer.count} entries (excluding test files and non-positive fixing times).")
+print("Saved to:", os.path.abspath('bugs_no_test_files.json'), "and", os.path.abspath('bugs_no_test_files.parquet'))
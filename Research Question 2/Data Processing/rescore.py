@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Recomputes explicitMentionInIntroducingCommit / explicitMentionInIntroducingPR
+of augmented records from the review corpus augment.py fills
+(review_corpus.sqlite), without any GitHub request. Keywords are BUG_KEYWORDS
+unless a file with one keyword per line is given.
+
+    python rescore.py --keywords keywords.txt --output merged_rescored.json
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from src.preprocessing.review_analyzer import BUG_KEYWORDS, KeywordMatcher
+from src.preprocessing.review_corpus import PR_KINDS, ReviewCorpus, rescore
+from src.preprocessing.streaming import JsonArrayWriter, iter_records
+
+
+def read_keywords(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default="merged_checkpoints.json")
+    parser.add_argument("--output", default="merged_rescored.json")
+    parser.add_argument("--corpus", default="review_corpus.sqlite")
+    parser.add_argument("--keywords", help="file with one keyword per line (default: BUG_KEYWORDS)")
+    parser.add_argument("--with-review-bodies", action="store_true", help="let review bodies set the PR flag too")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.corpus):
+        raise FileNotFoundError(f"{args.corpus} not found, run augment.py first")
+    keywords = read_keywords(args.keywords) if args.keywords else BUG_KEYWORDS
+    pr_kinds = PR_KINDS + ("review",) if args.with_review_bodies else PR_KINDS
+
+    start = time.perf_counter()
+    stats = {}
+    with ReviewCorpus(args.corpus) as corpus, JsonArrayWriter(args.output, indent=4) as writer:
+        writer.write_all(rescore(iter_records(args.input), corpus, KeywordMatcher(keywords), pr_kinds, stats))
+
+    print(f"[INFO] Rescored {writer.count} records with {len(keywords)} keywords in {time.perf_counter() - start:.1f}s: "
+          f"{stats['rescored']} flags recomputed, {stats['changed']} changed, "
+          f"{stats['missing']} left as they were (commit or PR not in the corpus)")
+    print("[INFO] Saved to:", os.path.abspath(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Start-up time of the `sstub` CLI (src/cli.py): wall time of `python -m src
+... --help` in a fresh interpreter, against the module-level imports each
+stage's script pays before doing any work, and against importing all of
+them at once, which a CLI importing its stages eagerly would pay on every
+call. Checks that --help loads none of the heavy scientific, plotting or
+HTTP packages (python -X importtime).
+
+    python benchmarks/bench_cli_startup.py --repeat 5
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from src.cli import SCRIPTS
+
+HEAVY = ("numpy", "pandas", "pyarrow", "scipy", "sklearn", "lifelines", "matplotlib", "seaborn", "aiohttp", "tqdm")
+HELP_COMMANDS = [["--help"], ["szz", "--help"], ["enrich", "--help"], ["analyze", "rq1", "--help"], ["analyze", "rq3", "--help"]]
+
+
+def script_imports(path: Path) -> list:
+    """Module-level import statements of a script, as source lines."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def import_code(statements) -> str:
+    # scripts import siblings that may be missing here (GH_token), those are skipped
+    return "\n".join(f"try:\n    {statement}\nexcept ImportError:\n    pass" for statement in statements)
+
+
+def wall_time(args, repeat: int) -> float:
+    """Median seconds of running `python *args` from the checkout."""
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def imported_modules(args) -> set:
+    """Top-level packages `python -X importtime *args` imports."""
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, env=env, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return {line.rsplit("|", 1)[-1].strip().split(".")[0] for line in result.stderr.splitlines() if line.startswith("import time:")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'command':36} {'median':>8}")
+    print(f"{'python -c pass':36} {wall_time(['-c', 'pass'], args.repeat):7.3f}s")
+    for command in HELP_COMMANDS:
+        loaded = imported_modules(["-m", "src", *command]) & set(HEAVY)
+        assert not loaded, f"sstub {' '.join(command)} imports {sorted(loaded)}"
+        print(f"{'sstub ' + ' '.join(command):36} {wall_time(['-m', 'src', *command], args.repeat):7.3f}s")
+
+    print(f"\n{'stage imports (before any work)':36} {'median':>8}")
+    everything = []
+    for stage, parts in SCRIPTS.items():
+        statements = script_imports(ROOT.joinpath(*parts))
+        everything += statements
+        print(f"{stage:36} {wall_time(['-c', import_code(statements)], args.repeat):7.3f}s")
+    print(f"{'all stages (eager CLI)':36} {wall_time(['-c', import_code(everything)], args.repeat):7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
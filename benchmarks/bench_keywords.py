@@ -0,0 +1,93 @@
+"""
+Compares explicit-mention detection as augment.py did it (lowercase the
+text, then `kw in text` for every keyword) with the compiled KeywordMatcher
+in src/preprocessing/review_analyzer.py on a synthetic review-comment
+corpus. It checks the matcher against a per-keyword word-boundary regex,
+counts the substring false positives ("prefix" -> "fix"), and measures
+matcher throughput as the keyword list grows.
+
+    python benchmarks/bench_keywords.py --comments 200000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.preprocessing.review_analyzer import BUG_KEYWORDS, KeywordMatcher
+
+WORDS = (
+    "the this method should be renamed please add a test for null input why not use "
+    "stream here looks good to me nit spacing prefix suffix fixture debugging errors "
+    "bugs issues problematic patched LGTM can we extract constant consider moving "
+    "into helper thanks merge after CI passes variable name unclear javadoc missing"
+).split()
+
+
+def make_corpus(n_comments, seed=0):
+    rng = random.Random(seed)
+    vocabulary = WORDS + BUG_KEYWORDS
+    weights = [20] * len(WORDS) + [1] * len(BUG_KEYWORDS)
+    corpus = []
+    for _ in range(n_comments):
+        words = rng.choices(vocabulary, weights, k=rng.randint(3, 60))
+        text = " ".join(words)
+        corpus.append(text.capitalize() + rng.choice([".", "?", "!", ""]))
+    return corpus
+
+
+def substring_mentions(corpus, keywords):
+    # augment.py's detect_explicit_mention before the matcher
+    results = []
+    for text in corpus:
+        lower_text = text.lower()
+        results.append(any(kw in lower_text for kw in keywords))
+    return results
+
+
+def reference_mentions(corpus, keywords):
+    patterns = [re.compile(r"(?<!\w)" + re.escape(kw) + r"(?!\w)", re.IGNORECASE) for kw in keywords]
+    return [any(p.search(text) for p in patterns) for text in corpus]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--comments", type=int, default=200000)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.comments)
+    mib = sum(len(text) for text in corpus) / 1024 ** 2
+    matcher = KeywordMatcher(BUG_KEYWORDS)
+
+    substring, substring_time = timed(substring_mentions, corpus, BUG_KEYWORDS)
+    matched, matcher_time = timed(matcher.any, corpus)
+    reference = reference_mentions(corpus, BUG_KEYWORDS)
+    assert matched == reference, "KeywordMatcher differs from the per-keyword word-boundary regex"
+    assert [bool(matcher.find(text)) for text in corpus[:5000]] == matched[:5000]
+    false_positives = sum(s and not m for s, m in zip(substring, matched))
+
+    print(f"{args.comments} comments, {mib:.1f} MiB, {len(BUG_KEYWORDS)} keywords")
+    print(f"substring loop:  {substring_time:.2f}s ({mib / substring_time:.1f} MiB/s), {sum(substring)} mentions")
+    print(f"KeywordMatcher:  {matcher_time:.2f}s ({mib / matcher_time:.1f} MiB/s), {sum(matched)} mentions "
+          f"({false_positives} substring matches were not whole words)")
+
+    rng = random.Random(1)
+    for factor in (1, 10, 100):
+        extra = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 12))) for _ in range(len(BUG_KEYWORDS) * (factor - 1))]
+        keywords = BUG_KEYWORDS + extra
+        _, big_time = timed(KeywordMatcher(keywords).any, corpus)
+        _, loop_time = timed(substring_mentions, corpus[:20000], keywords)
+        print(f"{len(keywords):5d} keywords: matcher {mib / big_time:6.1f} MiB/s, "
+              f"substring loop {mib * 20000 / len(corpus) / loop_time:6.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
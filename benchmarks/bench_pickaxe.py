@@ -0,0 +1,150 @@
+"""
+Pickaxe fallback of augment.py (SStuBs without a fix parent) in a bare
+blobless mirror like MirrorStore's, on a synthetic repository served over
+file://. In such a mirror every blob git reads is fetched from the remote
+on first use, one request per object or per commit shown. The benchmark
+compares three ways of finding the introducing commit of each SStuB:
+`git log -S --reverse` per SStuB (the old path), the batched newest-first
+walk of src/preprocessing/pickaxe.py without prefetching, and the same
+walk with prefetch_blobs. Each runs on a fresh copy of the mirror and
+reports the fetches it made; over the network each is a round trip to
+GitHub. The batched results are checked against the walk in the full
+repository.
+
+    python benchmarks/bench_pickaxe.py --commits 5000 --files 200 --sstubs 40
+"""
+import argparse
+import glob
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.preprocessing import pickaxe
+
+WORDS = ["value", "count", "index", "result", "buffer", "offset", "length", "node", "entry", "token"]
+
+
+def make_repo(path: str, n_commits: int, n_files: int, seed: int = 0):
+    """A repository with `n_commits` commits, each editing a few lines of one of `n_files` Java files."""
+    rng = random.Random(seed)
+    files = {f"src/pkg{i % 10}/File{i}.java": [f"int {rng.choice(WORDS)}{j} = {j};\n" for j in range(60)] for i in range(n_files)}
+    names = sorted(files)
+    stream = []
+    for n in range(n_commits):
+        # the first commit adds every file, then half of the edits go to the first tenth of them
+        touched = names if n == 0 else [rng.choice(names[:max(1, n_files // 10)] if rng.random() < 0.5 else names)]
+        if n:
+            lines = files[touched[0]]
+            for _ in range(rng.randint(1, 3)):
+                lines[rng.randrange(len(lines))] = f"int {rng.choice(WORDS)}{rng.randrange(10 ** 6)} = {n};\n"
+        message = f"commit {n}\n"
+        stream.append(f"commit refs/heads/master\nauthor A <a@x> {1500000000 + n * 600} +0000\n"
+                      f"committer A <a@x> {1500000000 + n * 600} +0000\ndata {len(message)}\n{message}")
+        for name in touched:
+            data = "".join(files[name]).encode()
+            stream.append(f"M 100644 inline {name}\ndata {len(data)}\n{data.decode()}\n")
+    subprocess.run(["git", "init", "-q", "-b", "master", path], check=True)
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=path, input="".join(stream).encode(), check=True)
+    for key in ("uploadpack.allowFilter", "uploadpack.allowAnySHA1InWant"):
+        subprocess.run(["git", "config", key, "true"], cwd=path, check=True)
+    return files
+
+
+def make_queries(repo: str, files: dict, n_sstubs: int, seed: int = 0) -> dict:
+    """{key: (path, snippet, before)} for SStuBs on the most edited files, snippets taken at random past commits."""
+    rng = random.Random(seed)
+    hot = sorted(files)[:max(1, len(files) // 10)]
+    queries = {}
+    for key in range(n_sstubs):
+        path = hot[key % min(len(hot), 4)]
+        revs = subprocess.run(["git", "log", "--format=%H %cI", "--", path], cwd=repo, stdout=subprocess.PIPE,
+                              text=True, check=True).stdout.split()
+        sha, date = revs[2 * rng.randrange(len(revs) // 2):][:2]
+        lines = subprocess.run(["git", "show", f"{sha}:{path}"], cwd=repo, stdout=subprocess.PIPE, text=True,
+                               check=True).stdout.splitlines(keepends=True)
+        line = rng.randrange(len(lines))
+        queries[key] = (path, "".join(lines[line:line + rng.choice([1, 2, 3])]).strip(), date)
+    return queries
+
+
+def fetches(mirror: str) -> int:
+    return len(glob.glob(os.path.join(mirror, "objects", "pack", "*.promisor")))
+
+
+def run(template: str, work: str, name: str, search) -> tuple:
+    mirror = os.path.join(work, name)
+    shutil.copytree(template, mirror)
+    before = fetches(mirror)
+    start = time.perf_counter()
+    results = search(mirror)
+    return results, time.perf_counter() - start, fetches(mirror) - before
+
+
+def reverse_pickaxe(queries):
+    def search(mirror):
+        results = {}
+        for key, (path, snippet, before) in queries.items():
+            output = subprocess.run(["git", "log", "-S", snippet, "--reverse", "--format=%H %aI",
+                                     f"--before={before}", "--", path], cwd=mirror, stdout=subprocess.PIPE, text=True).stdout
+            results[key] = tuple(output.split("\n")[0].split(" ", 1)) if output else (None, None)
+        return results
+    return search
+
+
+def batched(queries, prefetch: bool):
+    def search(mirror):
+        by_file = {}
+        for key, (path, snippet, before) in queries.items():
+            by_file.setdefault(path, {})[key] = (snippet, before)
+        saved = pickaxe.prefetch_blobs
+        if not prefetch:
+            pickaxe.prefetch_blobs = lambda *args: 0
+        try:
+            results = {}
+            for path, file_queries in by_file.items():
+                results.update(pickaxe.find_introducing_commits(mirror, path, file_queries))
+        finally:
+            pickaxe.prefetch_blobs = saved
+        return results
+    return search
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commits", type=int, default=5000)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--sstubs", type=int, default=40)
+    args = parser.parse_args()
+
+    # maintenance would repack the fetched objects and hide the fetch count
+    os.environ["GIT_CONFIG_COUNT"] = "1"
+    os.environ["GIT_CONFIG_KEY_0"], os.environ["GIT_CONFIG_VALUE_0"] = "gc.auto", "0"
+    with tempfile.TemporaryDirectory() as work:
+        origin = os.path.join(work, "origin")
+        files = make_repo(origin, args.commits, args.files)
+        template = os.path.join(work, "template.git")
+        subprocess.run(["git", "clone", "-q", "--bare", "--filter=blob:none", f"file://{origin}", template], check=True)
+        subprocess.run(["git", "commit-graph", "write", "--reachable", "--changed-paths"], cwd=template, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        queries = make_queries(origin, files, args.sstubs)
+        expected = batched(queries, prefetch=True)(origin)
+
+        print(f"{args.commits} commits, {args.files} files, {len(queries)} SStuBs on {len({q[0] for q in queries.values()})} files")
+        print(f"{'':28} {'time':>8} {'per SStuB':>10} {'fetches':>8}")
+        for name, search in (("log -S --reverse per SStuB", reverse_pickaxe(queries)),
+                             ("batched walk", batched(queries, prefetch=False)),
+                             ("batched walk + prefetch", batched(queries, prefetch=True))):
+            results, elapsed, fetched = run(template, work, name.replace(" ", "_"), search)
+            if name.startswith("batched"):
+                assert results == expected, f"{name} differs from the walk in the full repository"
+            print(f"{name:28} {elapsed:7.2f}s {1000 * elapsed / len(queries):8.1f}ms {fetched:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compares holding SStuB records as the dicts json.loads returns with the
+compact RecordTable in src/preprocessing/records.py: memory of the loaded
+records (tracemalloc), grouping by project and by (fix parent, file) as
+dataEnrichmentSZZ.py / szz.shard_project do, and the JSON round trip, which
+must give back the input exactly.
+
+    python benchmarks/bench_records.py --records 150000
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.preprocessing.records import SSTUB_SCHEMA, RecordTable
+
+BUG_TYPES = ["CHANGE_IDENTIFIER", "CHANGE_NUMERAL", "CHANGE_OPERAND", "CHANGE_OPERATOR", "CHANGE_UNARY_OPERATOR",
+             "CHANGE_MODIFIER", "DIFFERENT_METHOD_SAME_ARGS", "LESS_SPECIFIC_IF", "MORE_SPECIFIC_IF",
+             "OVERLOAD_METHOD_DELETED_ARGS", "OVERLOAD_METHOD_MORE_ARGS", "SWAP_ARGUMENTS", "SWAP_BOOLEAN_LITERAL",
+             "ADD_THROWS_EXCEPTION", "DELETE_THROWS_EXCEPTION", "SINGLE_STMT"]
+
+
+def make_lines(n_records, seed=0):
+    """JSON lines shaped like the SStuB fields the pipeline keeps: ~1000 projects, files shared by several bugs."""
+    rng = random.Random(seed)
+    projects = [f"owner{i}.repo{i}" for i in range(1000)]
+    lines = []
+    for _ in range(n_records):
+        project = rng.choice(projects)
+        fix = "%040x" % rng.getrandbits(160)
+        lines.append(json.dumps({
+            "bugType": rng.choice(BUG_TYPES),
+            "fixCommitSHA1": fix,
+            "fixCommitParentSHA1": "%040x" % rng.getrandbits(160),
+            "projectName": project,
+            "bugFilePath": f"src/main/java/org/{project.split('.')[0]}/module{rng.randrange(20)}/Class{rng.randrange(40)}.java",
+            "bugLineNum": rng.randrange(1, 2000),
+        }))
+    return lines
+
+
+def measured(build):
+    """(result, bytes held, seconds); timed without tracemalloc, which slows allocation down a lot."""
+    gc.collect()
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def group_dicts(records):
+    grouped = defaultdict(list)
+    for record in records:
+        grouped[record["projectName"]].append(record)
+    pairs = defaultdict(list)
+    for record in records:
+        pairs[(record["fixCommitParentSHA1"], record["bugFilePath"])].append(record)
+    return grouped, pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=150000)
+    args = parser.parse_args()
+
+    lines = make_lines(args.records)
+    dicts, dict_bytes, dict_time = measured(lambda: [json.loads(line) for line in lines])
+    table, table_bytes, table_time = measured(lambda: RecordTable.from_records((json.loads(line) for line in lines), SSTUB_SCHEMA))
+    assert [json.dumps(record) for record in table] == lines, "RecordTable round trip differs from the input"
+
+    start = time.perf_counter()
+    grouped, pairs = group_dicts(dicts)
+    dict_group = time.perf_counter() - start
+    start = time.perf_counter()
+    by_project = table.group_by("projectName")
+    pair_rows = table.group_rows("fixCommitParentSHA1", "bugFilePath")
+    table_group = time.perf_counter() - start
+    assert len(by_project) == len(grouped) and len(pair_rows) == len(pairs)
+    assert all(by_project[name].records() == records for name, records in list(grouped.items())[:50])
+
+    print(f"{args.records} records")
+    print(f"dicts:       {dict_bytes / 1024 ** 2:7.1f} MiB, loaded in {dict_time:.2f}s, grouped in {dict_group:.2f}s")
+    print(f"RecordTable: {table_bytes / 1024 ** 2:7.1f} MiB, loaded in {table_time:.2f}s, grouped in {table_group:.2f}s "
+          f"({dict_bytes / table_bytes:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
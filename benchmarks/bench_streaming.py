@@ -0,0 +1,103 @@
+"""
+Compares peak memory of loading a ManySStuBs4J-style JSON array with
+json.load and re-serializing it with json.dump (what clean.py did) against
+streaming it through src/preprocessing/streaming.py, on synthetic data.
+Checks that both write byte-identical output. Peak memory is measured with
+tracemalloc, so it counts Python allocations only.
+
+    python benchmarks/bench_streaming.py --records 200000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.preprocessing.streaming import JsonArrayWriter, iter_records
+
+BUG_TYPES = ["CHANGE_IDENTIFIER", "CHANGE_NUMERAL", "SWAP_BOOLEAN_LITERAL", "OVERLOAD_METHOD_MORE_ARGS"]
+
+
+def make_data(path, n_records, seed=0):
+    rng = random.Random(seed)
+
+    def records():
+        for i in range(n_records):
+            yield {
+                "bugType": rng.choice(BUG_TYPES),
+                "fixCommitSHA1": "%040x" % rng.getrandbits(160),
+                "fixCommitParentSHA1": "%040x" % rng.getrandbits(160),
+                "bugFilePath": f"src/main/java/org/example/{'test/' if rng.random() < 0.3 else ''}File{i % 500}.java",
+                "fixPatch": "@@ -1,3 +1,3 @@\n-" + "x" * rng.randint(100, 600) + "\n+" + "y" * rng.randint(100, 600),
+                "projectName": f"owner{i % 100}.repo{i % 100}",
+                "bugLineNum": rng.randint(1, 2000),
+                "sourceBeforeFix": "a" * rng.randint(5, 60),
+                "sourceAfterFix": "b" * rng.randint(5, 60),
+                "TimeToFixHoursCommit": rng.choice([None, 0, rng.random() * 1000]),
+            }
+
+    with JsonArrayWriter(path) as writer:
+        writer.write_all(records())
+
+
+def keep(bug):
+    # clean.py's filter
+    path = bug.get("bugFilePath", "").lower()
+    time_to_fix = bug.get("TimeToFixHoursCommit")
+    return not any(k in path for k in ["test", "tests", "testing"]) and time_to_fix is not None and time_to_fix > 0
+
+
+def clean_in_memory(src, dst):
+    with open(src, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    with open(dst, "w", encoding="utf-8") as f:
+        json.dump([bug for bug in data if keep(bug)], f, indent=4)
+
+
+def clean_streaming(src, dst):
+    with JsonArrayWriter(dst, indent=4) as writer:
+        for bug in iter_records(src):
+            if keep(bug):
+                writer.write(bug)
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "sstubs.json")
+        make_data(src, args.records)
+        size = os.path.getsize(src)
+        in_memory_out, streaming_out = os.path.join(tmp, "in_memory.json"), os.path.join(tmp, "streaming.json")
+
+        in_memory_time, in_memory_peak = measure(clean_in_memory, src, in_memory_out)
+        streaming_time, streaming_peak = measure(clean_streaming, src, streaming_out)
+
+        with open(in_memory_out, "rb") as a, open(streaming_out, "rb") as b:
+            assert a.read() == b.read(), "streaming output differs from json.dump"
+
+    mib = 1024 ** 2
+    print(f"{args.records} records, {size / mib:.1f} MiB of JSON")
+    print(f"json.load/json.dump: {in_memory_time:.2f}s, peak {in_memory_peak / mib:.1f} MiB")
+    print(f"streaming:           {streaming_time:.2f}s, peak {streaming_peak / mib:.1f} MiB ({in_memory_peak / streaming_peak:.0f}x less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import RepeatedStratifiedKFold, cross_validate
+
+from ..preprocessing.columnar import contains, field, read_frame
+
+REVIEWER_BINS = [-1, 0, 1, 2, 3, np.inf]
+REVIEWER_LABELS = ["0", "1", "2", "3", "4+"]
+CHUNK_ELEMENTS = 1 << 23  # permuted labels / cell counts held in memory at once per worker
+PERMUTATION_CHUNK = 2000  # permutations per pool task; fixed so the p-value does not depend on the worker count
+HYPERGEOMETRIC_FACTOR = 4  # strata with more observations than this many per table cell are drawn cell by cell
+
+
+def load_sstubs(path: str, columns=("bugType", "reviewer_count")) -> pd.DataFrame:
+    """
+    Reads `columns` of the RQ1 SStuBs from rq1_dataset.parquet: bugs whose
+    introducing commit has a PR, that are SStuBs and are not under a test
+    directory (filters pushed down to the parquet scan), with a bug type and
+    reviewer count.
+    """
+    frame = read_frame(
+        path, "introducing_commits",
+        columns=list(columns),
+        filter=(field("introducingCommitHasPR") == True)
+        & (field("sstub_introduced") == 1)
+        & ~contains(field("bugFilePath"), "/test/", ignore_case=True),
+    )
+    return frame.dropna(subset=["bugType", "reviewer_count"])
+
+
+def bin_reviewers(reviewer_count: pd.Series) -> pd.Series:
+    """Bins reviewer counts into 0, 1, 2, 3, 4+."""
+    return pd.cut(reviewer_count, bins=REVIEWER_BINS, labels=REVIEWER_LABELS)
+
+
+def chi2_statistics(tables, expected):
+    """Pearson chi-square of each table in a (batch, rows, cols) stack against `expected`; empty margins are skipped."""
+    cells = expected > 0
+    return (((tables - expected) ** 2)[:, cells] / expected[cells]).sum(axis=1)
+
+
+def _crosstabs(rows, cols, n_rows: int, n_cols: int):
+    """(batch, n) row and column codes -> (batch, n_rows, n_cols) count tables, with one bincount."""
+    batch = cols.shape[0]
+    offsets = (np.arange(batch) * (n_rows * n_cols))[:, None]
+    flat = np.bincount((offsets + rows * n_cols + cols).ravel(), minlength=batch * n_rows * n_cols)
+    return flat.reshape(batch, n_rows, n_cols)
+
+
+def _shuffled_tables(rows, cols, strata, n_rows: int, n_cols: int, size: int, rng):
+    """Tables of `size` shuffles of the column labels within each stratum (rows sorted by stratum)."""
+    if len(cols) == 0:
+        return np.zeros((size, n_rows, n_cols), dtype=np.int64)
+    # sorting stratum + U(0, 1) keys shuffles within each stratum only
+    order = np.argsort(strata + rng.random((size, len(cols))), axis=1)
+    return _crosstabs(rows, cols[order], n_rows, n_cols)
+
+
+def _hypergeometric_tables(row_margins, col_margins, size: int, rng):
+    """
+    Tables of `size` shuffles drawn without shuffling: given the (strata, rows)
+    and (strata, cols) margins, each cell is drawn in turn from the
+    hypergeometric distribution a within-stratum shuffle of the column labels
+    induces, and the strata are summed. Costs O(rows x cols) draws per stratum
+    instead of O(observations).
+    """
+    n_strata, n_rows = row_margins.shape
+    n_cols = col_margins.shape[1]
+    tables = np.zeros((size, n_rows, n_cols), dtype=np.int64)
+    remaining = np.broadcast_to(col_margins, (size, n_strata, n_cols)).copy()
+    for r in range(n_rows - 1):
+        need = np.broadcast_to(row_margins[:, r], (size, n_strata)).copy()
+        others = remaining.sum(axis=2)
+        for c in range(n_cols - 1):
+            others -= remaining[:, :, c]
+            drawn = rng.hypergeometric(remaining[:, :, c], others, need)
+            remaining[:, :, c] -= drawn
+            need -= drawn
+            tables[:, r, c] = drawn.sum(axis=1)
+        remaining[:, :, -1] -= need
+        tables[:, r, -1] = need.sum(axis=1)
+    tables[:, -1, :] = remaining.sum(axis=1)
+    return tables
+
+
+def _exceedances(task) -> int:
+    """Number of permutations in one chunk whose chi-square reaches the observed one."""
+    shuffled, margins, fixed, expected, observed, permutations, seed = task
+    rows, cols, strata = shuffled
+    n_rows, n_cols = expected.shape
+    rng = np.random.default_rng(seed)
+    batch = max(1, CHUNK_ELEMENTS // max(1, 2 * len(cols) + margins[1].size))
+    count = 0
+    for start in range(0, permutations, batch):
+        size = min(batch, permutations - start)
+        tables = fixed + _shuffled_tables(rows, cols, strata, n_rows, n_cols, size, rng)
+        if len(margins[0]):
+            tables += _hypergeometric_tables(*margins, size, rng)
+        # tolerance for permutations that only reorder the same table
+        count += int((chi2_statistics(tables, expected) >= observed * (1 - 1e-12)).sum())
+    return count
+
+
+def permutation_chi2(rows, cols, strata=None, permutations: int = 100000, seed: int = 0, workers: int = None):
+    """
+    Monte Carlo permutation test of independence for a contingency table
+    given as integer codes per observation (e.g. reviewer bin and bugType
+    categorical codes); with `strata` (e.g. project codes) the column labels
+    are only permuted within each stratum. Returns (observed chi-square,
+    p-value), with p = (exceedances + 1) / (permutations + 1).
+
+    Permuted tables are generated in batched NumPy arrays. A stratum whose
+    table is fixed by its margins is added as a constant; a small stratum
+    has its labels shuffled; a large one has its cells drawn directly from
+    the hypergeometric distribution the shuffle induces, which is much
+    cheaper than shuffling its observations. Chunks of PERMUTATION_CHUNK
+    permutations run in a process pool of `workers` (all cores by default),
+    seeded from `seed`, so the p-value does not depend on the worker count.
+    """
+    rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+    strata = np.zeros(len(rows), dtype=np.int64) if strata is None else np.asarray(strata, dtype=np.int64)
+    keep = (rows >= 0) & (cols >= 0) & (strata >= 0)
+    rows, cols, strata = rows[keep], cols[keep], strata[keep]
+    n_rows, n_cols = int(rows.max()) + 1, int(cols.max()) + 1
+    n_strata = int(strata.max()) + 1
+
+    table = _crosstabs(rows, cols[None, :], n_rows, n_cols)
+    # both margins are fixed under shuffling (within strata too), so the expected counts are as well
+    expected = np.outer(table[0].sum(axis=1), table[0].sum(axis=0)) / len(rows)
+    observed = float(chi2_statistics(table, expected)[0])
+
+    row_margins = np.bincount(strata * n_rows + rows, minlength=n_strata * n_rows).reshape(n_strata, n_rows)
+    col_margins = np.bincount(strata * n_cols + cols, minlength=n_strata * n_cols).reshape(n_strata, n_cols)
+    sizes = row_margins.sum(axis=1)
+    constant = ((row_margins > 0).sum(axis=1) <= 1) | ((col_margins > 0).sum(axis=1) <= 1)
+    drawn = ~constant & (sizes > HYPERGEOMETRIC_FACTOR * (n_rows - 1) * (n_cols - 1))
+    shuffled = ~constant & ~drawn
+
+    fixed = _crosstabs(rows[constant[strata]], cols[constant[strata]][None, :], n_rows, n_cols)
+    in_shuffled = shuffled[strata]
+    order = np.argsort(strata[in_shuffled], kind="stable")
+    shuffled_codes = (rows[in_shuffled][order], cols[in_shuffled][order], strata[in_shuffled][order].astype(np.float64))
+    margins = (row_margins[drawn], col_margins[drawn])
+
+    seeds = np.random.SeedSequence(seed).spawn(-(-permutations // PERMUTATION_CHUNK))
+    tasks = [
+        (shuffled_codes, margins, fixed, expected, observed,
+         min(PERMUTATION_CHUNK, permutations - i * PERMUTATION_CHUNK), chunk_seed)
+        for i, chunk_seed in enumerate(seeds)
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        exceedances = sum(map(_exceedances, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            exceedances = sum(pool.map(_exceedances, tasks))
+    return observed, (exceedances + 1) / (permutations + 1)
+
+
+def _relative_coefficients(model) -> np.ndarray:
+    """
+    Reviewer-count coefficient of each bug type but the first, as log-odds
+    against the first (reference) type, which makes the multinomial
+    coefficients identifiable and comparable across fits.
+    """
+    coef = model.coef_[:, 0]
+    if len(model.classes_) == 2:
+        return coef
+    return coef[1:] - coef[0]
+
+
+def multinomial_cv(frame: pd.DataFrame, n_splits: int = 5, n_repeats: int = 10, seed: int = 0,
+                   workers: int = None, alpha: float = 0.05):
+    """
+    Fits one multinomial logistic regression of bugType (its integer
+    categorical codes) on reviewer_count, given as a sparse matrix, and
+    repeats it under seeded repeated stratified k-fold cross-validation with
+    the folds fitted in parallel (`workers`, all cores by default). Bug
+    types with fewer than `n_splits` SStuBs cannot be stratified and are left out.
+
+    Returns (coefficients, scores): one row per non-reference bug type with
+    the full-data coefficient and the mean and percentile interval across
+    folds, and the mean / std of held-out accuracy and log loss.
+    """
+    counts = frame["bugType"].value_counts()
+    frame = frame[frame["bugType"].isin(counts.index[counts >= n_splits])]
+    frame = frame.assign(bugType=frame["bugType"].cat.remove_unused_categories())
+    X = sparse.csr_matrix(frame[["reviewer_count"]].to_numpy(dtype=np.float64))
+    y = frame["bugType"].cat.codes.to_numpy()
+    model = LogisticRegression(max_iter=1000)
+
+    full = LogisticRegression(max_iter=1000).fit(X, y)
+    folds = cross_validate(
+        model, X, y,
+        cv=RepeatedStratifiedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=seed),
+        scoring=("accuracy", "neg_log_loss"),
+        return_estimator=True,
+        n_jobs=workers or -1,
+    )
+    per_fold = np.array([_relative_coefficients(estimator) for estimator in folds["estimator"]])
+
+    categories = frame["bugType"].cat.categories
+    coefficients = pd.DataFrame({
+        "bugType": list(categories[full.classes_[1:]]),
+        "coefficient": _relative_coefficients(full),
+        "cv_mean": per_fold.mean(axis=0),
+        "cv_low": np.quantile(per_fold, alpha / 2, axis=0),
+        "cv_high": np.quantile(per_fold, 1 - alpha / 2, axis=0),
+    })
+    scores = {
+        "reference": categories[full.classes_[0]],
+        "folds": len(per_fold),
+        "accuracy": (float(folds["test_accuracy"].mean()), float(folds["test_accuracy"].std())),
+        "log_loss": (float(-folds["test_neg_log_loss"].mean()), float(folds["test_neg_log_loss"].std())),
+    }
+    return coefficients, scores
@@ -0,0 +1,103 @@
+import pandas as pd
+import pyarrow.compute as pc
+
+from ..preprocessing.columnar import contains, dataset, field, read_table
+
+WITH_MENTION = "With Explicit Mention"
+WITHOUT_MENTION = "Without Explicit Mention"
+MIN_COX_SAMPLES = 10  # bug types with fewer fixes (or without both mention groups) get no Cox model
+
+ANALYSIS_COLUMNS = [
+    "fixPR", "introducingPR", "TimeToFixHoursCommit", "bugType",
+    "explicitMentionInIntroducingCommit", "explicitMentionInIntroducingPR",
+]
+
+
+def load_frame(path: str) -> pd.DataFrame:
+    """
+    Reads the RQ2 columns of the non-test SStuBs in a bugs_no_test_files.parquet
+    snapshot into one flat frame: bugType, hours (TimeToFixHoursCommit),
+    explicit (mentioned in the introducing commit or PR) and has_prs (both
+    the fixing and the introducing PR were merged).
+    """
+    table = read_table(path, "sstubs", columns=ANALYSIS_COLUMNS,
+                       filter=~contains(field("bugFilePath"), "test", ignore_case=True))
+
+    def merged(column):
+        return pc.is_valid(pc.struct_field(table[column], "pr_merged_at")).to_numpy(zero_copy_only=False)
+
+    def flag(column):
+        return pc.fill_null(table[column], False).to_numpy(zero_copy_only=False)
+
+    return pd.DataFrame({
+        "bugType": table["bugType"].cast("string").fill_null("Unknown").to_pandas(),
+        "hours": table["TimeToFixHoursCommit"].to_pandas(),
+        "explicit": flag("explicitMentionInIntroducingCommit") | flag("explicitMentionInIntroducingPR"),
+        "has_prs": merged("fixPR") & merged("introducingPR"),
+    })
+
+
+def fix_time_summary(cohort: pd.DataFrame) -> pd.DataFrame:
+    """Count, mean and median fix time in days of each mention group (0 for an empty group)."""
+    days = cohort.loc[cohort["hours"].notna(), "hours"] / 24
+    groups = days.groupby(cohort["explicit"].map({True: WITH_MENTION, False: WITHOUT_MENTION}))
+    summary = groups.agg(["count", "mean", "median"]).reindex([WITH_MENTION, WITHOUT_MENTION])
+    return summary.fillna({"count": 0, "mean": 0.0, "median": 0.0}).astype({"count": int})
+
+
+def bug_type_summary(cohort: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mean and median fix time in days per (bug type, mention group), in one
+    groupby, for the bug types that have fixes in both groups.
+    """
+    timed = cohort[cohort["hours"].notna()]
+    stats = (timed["hours"] / 24).groupby(
+        [timed["bugType"], timed["explicit"].map({True: WITH_MENTION, False: WITHOUT_MENTION})]
+    ).agg(["mean", "median"])
+    stats.index.names = ["Bug Type", "Group"]
+    both = stats.groupby(level="Bug Type").size() == 2
+    stats = stats[stats.index.get_level_values("Bug Type").isin(both[both].index)]
+    return stats.rename(columns={"mean": "Mean Fix Time (days)", "median": "Median Fix Time (days)"}).reset_index()
+
+
+def cox_cohorts(cohort: pd.DataFrame):
+    """
+    Yields (bug type, frame) with the time_to_fix / event_observed /
+    explicit_mention columns of a Cox model for every bug type, in sorted
+    order, that has at least MIN_COX_SAMPLES positive fix times and both
+    mention groups.
+    """
+    timed = cohort[cohort["hours"] > 0]
+    frame = pd.DataFrame({
+        "time_to_fix": timed["hours"],
+        "event_observed": 1,
+        "explicit_mention": timed["explicit"].astype(int),
+    })
+    for bug_type, rows in frame.groupby(timed["bugType"].str.strip(), sort=True):
+        if len(rows) >= MIN_COX_SAMPLES and rows["explicit_mention"].nunique() == 2:
+            yield bug_type, rows.reset_index(drop=True)
+
+
+def analyze(path: str) -> dict:
+    """
+    Runs the RQ2 cohort statistics over one snapshot and returns the summary
+    tables: "counts" (steps 1-4), "fix_times" (steps 5-8, in days), "by_bug_type"
+    (long form) with its "mean_days" / "median_days" pivots for plotting, and
+    "cohort", the PR-filtered frame the survival models are fitted on.
+    """
+    frame = load_frame(path)
+    cohort = frame[frame["has_prs"]].reset_index(drop=True)
+    by_bug_type = bug_type_summary(cohort)
+    return {
+        "counts": {
+            "total": dataset(path, "sstubs").count_rows(),
+            "non_test": len(frame),
+            "with_prs": len(cohort),
+            "explicit": int(cohort["explicit"].sum()),
+        },
+        "fix_times": fix_time_summary(cohort),
+        "by_bug_type": by_bug_type,
+        "mean_days": by_bug_type.pivot(index="Bug Type", columns="Group", values="Mean Fix Time (days)"),
+        "median_days": by_bug_type.pivot(index="Bug Type", columns="Group", values="Median Fix Time (days)"),
+        "cohort": cohort,
+    }
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+from scipy import special, stats
+
+from ..preprocessing.columnar import read_table
+
+# PR-size metrics, in the column order of the matrix returned by load_prs
+METRICS = ["linesChanged", "filesChanged", "linesAdded", "linesRemoved"]
+ALL_SSTUBS = "All SStuBs"
+CHUNK_ELEMENTS = 1 << 24  # resampled counts held in memory at once by the bootstrap (128 MiB of float64)
+EXACT_MAX_N = 8           # scipy's cut-off: smaller samples without ties get the exact U distribution
+
+
+def load_prs(path: str):
+    """
+    Reads an updated_dataset.parquet snapshot into one (PRs x METRICS) float
+    matrix. Returns (sizes, has_sstub, bug_types), where has_sstub marks PRs
+    linked to at least one SStuB and bug_types maps each SStuB type to a mask
+    of the PRs linked to an SStuB of that type.
+    """
+    table = read_table(path, "pull_requests", columns=METRICS + ["sstubs"])
+    sizes = np.column_stack([table[metric].to_numpy().astype(float) for metric in METRICS])
+    sstubs = table["sstubs"].combine_chunks()
+    has_sstub = pc.fill_null(pc.list_value_length(sstubs), 0).to_numpy() > 0
+
+    owners = pc.list_parent_indices(sstubs).to_numpy()
+    types = pc.struct_field(pc.list_flatten(sstubs), "bugType").to_numpy(zero_copy_only=False)
+    bug_types = {}
+    for bug_type in sorted(set(types) - {None}):
+        mask = np.zeros(len(table), dtype=bool)
+        mask[owners[types == bug_type]] = True
+        bug_types[bug_type] = mask
+    return sizes, has_sstub, bug_types
+
+
+def rank_biserial(u, n1: int, n2: int):
+    """Rank-biserial correlation of the first sample's U: +1 when all of it ranks above the second."""
+    return 2 * np.asarray(u) / (n1 * n2) - 1
+
+
+def u_from_counts(x_counts, y_below):
+    """
+    U of sample x from its counts per distinct value (last axis) and, per
+    value, the number of y values below it plus half the tied ones.
+    """
+    return (x_counts * y_below).sum(axis=-1)
+
+
+def below_and_tied(y_counts):
+    """Per distinct value: count of smaller y values plus half the equal ones (the score of an x at that value)."""
+    return np.cumsum(y_counts, axis=-1) - 0.5 * y_counts
+
+
+def mann_whitney_counts(x_counts, y_counts):
+    """
+    Two-sided Mann-Whitney U test from the counts of both samples per
+    distinct value, with scipy's tie and continuity corrections (its
+    asymptotic method). Returns (U of x, p-value).
+    """
+    n1, n2 = x_counts.sum(), y_counts.sum()
+    n = n1 + n2
+    u1 = u_from_counts(x_counts, below_and_tied(y_counts))
+    ties = (x_counts + y_counts).astype(float)
+    s = np.sqrt(n1 * n2 / 12 * ((n + 1) - (ties ** 3 - ties).sum() / (n * (n - 1))))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (max(u1, n1 * n2 - u1) - n1 * n2 / 2 - 0.5) / s
+    return u1, float(np.clip(2 * special.ndtr(-z), 0, 1))
+
+
+def compare(sizes, has_sstub, bug_types=None, resamples: int = 1000, alpha: float = 0.05,
+            seed: int = 0, min_prs: int = 1) -> pd.DataFrame:
+    """
+    Mann-Whitney U tests of PRs with SStuBs against PRs without, on every
+    metric: once for all SStuBs and, given bug_types (see load_prs), once per
+    SStuB type with at least `min_prs` PRs. Returns one row per (group,
+    metric) with U, p-value, the rank-biserial effect size and, for
+    resamples > 0, its percentile bootstrap CI.
+
+    Each metric column is reduced once to counts per distinct value, so a
+    test costs O(distinct values) instead of a re-ranking of every PR, and a
+    bootstrap resample is a draw of multinomial counts over those values
+    (the same distribution as drawing PRs with replacement). The non-SStuB
+    resamples are drawn once per metric and shared by all groups; resamples
+    are processed in batches bounded by CHUNK_ELEMENTS.
+    """
+    rng = np.random.default_rng(seed)
+    groups = {ALL_SSTUBS: has_sstub}
+    groups.update({bug_type: mask for bug_type, mask in (bug_types or {}).items() if mask.sum() >= min_prs})
+
+    rows = {(group, metric): {} for group in groups for metric in METRICS}
+    for i, metric in enumerate(METRICS):
+        column = sizes[:, i]
+        valid = ~np.isnan(column)
+        values, inverse = np.unique(column[valid], return_inverse=True)
+        y_counts = np.bincount(inverse[~has_sstub[valid]], minlength=len(values))
+        n2 = int(y_counts.sum())
+        x_counts = {group: np.bincount(inverse[mask[valid]], minlength=len(values)) for group, mask in groups.items()}
+
+        for group, counts in x_counts.items():
+            n1 = int(counts.sum())
+            if n1 <= EXACT_MAX_N or n2 <= EXACT_MAX_N:
+                u, p = stats.mannwhitneyu(column[valid & groups[group]], column[valid & ~has_sstub], alternative="two-sided")
+            else:
+                u, p = mann_whitney_counts(counts, y_counts)
+            rows[group, metric].update({
+                "n SStuB": n1, "n non-SStuB": n2, "U-statistic": float(u), "p-value": float(p),
+                "rank-biserial": float(rank_biserial(u, n1, n2)) if n1 and n2 else np.nan,
+            })
+
+        if not resamples:
+            continue
+        estimates = {group: np.full(resamples, np.nan) for group in groups}
+        if n2:
+            batch = max(1, CHUNK_ELEMENTS // len(values))
+            for start in range(0, resamples, batch):
+                size = min(batch, resamples - start)
+                y_below = below_and_tied(rng.multinomial(n2, y_counts / n2, size=size))
+                for group, counts in x_counts.items():
+                    n1 = int(counts.sum())
+                    if n1:
+                        resampled = rng.multinomial(n1, counts / n1, size=size)
+                        estimates[group][start:start + size] = rank_biserial(u_from_counts(resampled, y_below), n1, n2)
+        for group in groups:
+            low, high = np.quantile(estimates[group], [alpha / 2, 1 - alpha / 2])
+            rows[group, metric].update({"CI low": low, "CI high": high})
+
+    return pd.DataFrame([{"group": group, "metric": metric, **row} for (group, metric), row in rows.items()])
+
+
+def below_percentile(values, q: float):
+    """The values at or below their q-th percentile, e.g. to cut off outliers before a boxplot."""
+    values = np.asarray(values)
+    return values[values <= np.percentile(values, q)]
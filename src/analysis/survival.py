@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import pickle
+import warnings
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from lifelines import CoxPHFitter, KaplanMeierFitter
+
+CACHE_VERSION = 1      # bump when a fit's inputs or outputs change meaning, to invalidate old entries
+BOOTSTRAP_CHUNK = 50   # resamples per pool task; fixed so results do not depend on the worker count
+
+COX_COLUMNS = ["Bug Type", "Hazard Ratio (exp(coef))", "Lower CI", "Upper CI", "p-value"]
+
+
+def slice_key(kind: str, frame: pd.DataFrame, **params) -> str:
+    """SHA-256 of a fit's kind, parameters and input rows (values, dtypes and column names)."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([CACHE_VERSION, kind, params, list(map(str, frame.columns)),
+                              list(map(str, frame.dtypes))], sort_keys=True).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FitCache:
+    """
+    Fitted survival models pickled one file per input slice under `root`, so
+    a re-run only refits the bug types whose rows changed. With root=None
+    nothing is stored.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root
+        self.stats = {"hits": 0, "misses": 0}
+        if root:
+            os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".pkl")
+
+    def get(self, key: str):
+        if self.root and os.path.exists(self._path(key)):
+            with open(self._path(key), "rb") as f:
+                self.stats["hits"] += 1
+                return pickle.load(f)
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, value):
+        if not self.root:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f)
+        os.replace(tmp_path, path)
+
+    def summary(self) -> str:
+        return f"{self.stats['hits']} cached fits reused, {self.stats['misses']} fitted"
+
+
+# --- Fits (module-level so they can run in worker processes) ---
+
+def fit_cox(frame: pd.DataFrame) -> dict:
+    """Cox model of time_to_fix on explicit_mention; returns its hazard ratio row."""
+    cph = CoxPHFitter()
+    cph.fit(frame, duration_col="time_to_fix", event_col="event_observed")
+    summary = cph.summary.loc["explicit_mention"]
+    return {
+        "Hazard Ratio (exp(coef))": summary["exp(coef)"],
+        "Lower CI": summary["exp(coef) lower 95%"],
+        "Upper CI": summary["exp(coef) upper 95%"],
+        "p-value": summary["p"],
+    }
+
+
+def fit_km(frame: pd.DataFrame, label: str) -> KaplanMeierFitter:
+    """Kaplan-Meier fit of a frame with duration / event_observed columns."""
+    return KaplanMeierFitter().fit(durations=frame["duration"], event_observed=frame["event_observed"], label=label)
+
+
+def bootstrap_hazard_ratios(frame: pd.DataFrame, n: int, seed) -> np.ndarray:
+    """
+    Hazard ratios of `n` Cox fits on row resamples (with replacement) of
+    `frame`. Resamples without both mention groups or that fail to converge
+    give NaN.
+    """
+    rng = np.random.default_rng(seed)
+    ratios = np.full(n, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for i in range(n):
+            sample = frame.iloc[rng.integers(0, len(frame), len(frame))]
+            if sample["explicit_mention"].nunique() < 2:
+                continue
+            try:
+                ratios[i] = fit_cox(sample)["Hazard Ratio (exp(coef))"]
+            except Exception:
+                continue
+    return ratios
+
+
+def _run(task):
+    kind, args = task
+    if kind == "cox":
+        return fit_cox(*args)
+    if kind == "km":
+        return fit_km(*args)
+    return bootstrap_hazard_ratios(*args)
+
+
+def _map(tasks, workers: int):
+    """Runs (kind, args) tasks in a process pool (in-process for one worker), in order."""
+    if not tasks:
+        return []
+    if workers == 1 or len(tasks) == 1:
+        return [_run(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run, tasks))
+
+
+class SurvivalRunner:
+    """
+    Fits per-bug-type Cox models, Kaplan-Meier curves and bootstrapped
+    hazard ratios in a pool of `workers` processes (all cores by default),
+    memoizing every fit in `cache_dir` by a hash of its input slice.
+    """
+
+    def __init__(self, cache_dir: str = None, workers: int = None):
+        self.cache = FitCache(cache_dir)
+        self.workers = workers or os.cpu_count() or 1
+
+    def _cached(self, jobs):
+        """jobs: [(key, task)] -> results, fitting only the keys missing from the cache."""
+        results = [self.cache.get(key) for key, _ in jobs]
+        missing = [i for i, result in enumerate(results) if result is None]
+        for i, result in zip(missing, _map([jobs[i][1] for i in missing], self.workers)):
+            self.cache.put(jobs[i][0], result)
+            results[i] = result
+        return results
+
+    def cox(self, cohorts) -> pd.DataFrame:
+        """
+        Fits one Cox model per (bug type, frame) of `cohorts` (see
+        rq2_analysis.cox_cohorts). Returns the hazard ratio table, one row per
+        bug type, in the order of `cohorts`.
+        """
+        cohorts = list(cohorts)
+        jobs = [(slice_key("cox", frame), ("cox", (frame,))) for _, frame in cohorts]
+        rows = [{"Bug Type": bug_type, **result} for (bug_type, _), result in zip(cohorts, self._cached(jobs))]
+        return pd.DataFrame(rows, columns=COX_COLUMNS)
+
+    def kaplan_meier(self, groups) -> dict:
+        """Fits a Kaplan-Meier curve per {label: frame with duration / event_observed}; returns {label: fitter}."""
+        labels = list(groups)
+        jobs = [(slice_key("km", groups[label], label=label), ("km", (groups[label], label))) for label in labels]
+        return dict(zip(labels, self._cached(jobs)))
+
+    def bootstrap(self, cohorts, resamples: int = 1000, seed: int = 0, alpha: float = 0.05) -> pd.DataFrame:
+        """
+        Percentile bootstrap of each bug type's hazard ratio from `resamples`
+        resamples, split into chunks of BOOTSTRAP_CHUNK spread over the pool.
+        Chunk seeds derive from `seed` and the bug type, so the intervals are
+        reproducible whatever the worker count.
+        """
+        cohorts = list(cohorts)
+        jobs, owners = [], []
+        for bug_type, frame in cohorts:
+            chunks = np.random.SeedSequence([seed, zlib.crc32(bug_type.encode("utf-8"))]).spawn(
+                -(-resamples // BOOTSTRAP_CHUNK))
+            for i, chunk_seed in enumerate(chunks):
+                n = min(BOOTSTRAP_CHUNK, resamples - i * BOOTSTRAP_CHUNK)
+                key = slice_key("bootstrap", frame, n=n, seed=seed, chunk=i, bug_type=bug_type)
+                jobs.append((key, ("bootstrap", (frame, n, chunk_seed))))
+                owners.append(bug_type)
+
+        ratios = {}
+        for bug_type, result in zip(owners, self._cached(jobs)):
+            ratios.setdefault(bug_type, []).append(result)
+
+        rows = []
+        for bug_type, _ in cohorts:
+            values = np.concatenate(ratios[bug_type])
+            values = values[np.isfinite(values)]
+            rows.append({
+                "Bug Type": bug_type,
+                "Bootstrap Lower CI": np.quantile(values, alpha / 2) if len(values) else np.nan,
+                "Bootstrap Upper CI": np.quantile(values, 1 - alpha / 2) if len(values) else np.nan,
+                "Resamples": len(values),
+            })
+        return pd.DataFrame(rows, columns=["Bug Type", "Bootstrap Lower CI", "Bootstrap Upper CI", "Resamples"])
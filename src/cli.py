@@ -0,0 +1,124 @@
+"""
+Command line entry point of the pipeline, one subcommand per stage:
+
+    sstub collect            mirror the top Java projects       (projectCollection.py)
+    sstub szz                find bug-introducing commits        (dataEnrichmentSZZ.py)
+    sstub enrich rq1|rq2     fetch PR / review data from GitHub  (fetchReviewData.py, augment.py)
+    sstub rescore ...        re-score explicit mentions offline  (rescore.py)
+    sstub merge              join SZZ output with the SStuBs     (mergeDatasets.py)
+    sstub clean              filter the RQ2 dataset              (clean.py)
+    sstub analyze rq1|rq2|rq3
+
+Stages run the research-question scripts of the checkout from the current
+directory, so their relative input and output paths work as before. This
+module only imports the standard library: pandas, scipy, sklearn, lifelines
+and matplotlib are loaded by the stage that needs them, when it runs.
+"""
+import argparse
+import os
+import runpy
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+RQ1 = "Reseach Question 1"
+RQ2 = "Research Question 2"
+
+# stage -> script, relative to the checkout
+SCRIPTS = {
+    "collect": (RQ1, "Data Enrichment", "projectCollection.py"),
+    "szz": (RQ1, "Data Enrichment", "dataEnrichmentSZZ.py"),
+    "enrich rq1": (RQ1, "Data Enrichment", "fetchReviewData.py"),
+    "enrich rq2": (RQ2, "Data Processing", "augment.py"),
+    "rescore": (RQ2, "Data Processing", "rescore.py"),
+    "merge": (RQ1, "Data Enrichment", "mergeDatasets.py"),
+    "clean": (RQ2, "Data Processing", "clean.py"),
+    "analyze rq1 chi": (RQ1, "RQ1", "rq1_chi.py"),
+    "analyze rq1 log": (RQ1, "RQ1", "rq1_log.py"),
+    "analyze rq2": (RQ2, "Analysis", "analysis.py"),
+}
+
+
+def script_path(stage: str) -> Path:
+    path = ROOT.joinpath(*SCRIPTS[stage])
+    if not path.exists():
+        # a non-editable install only ships src/, the stages live in the research-question folders
+        raise SystemExit(f"[ERROR] {path} not found, install the package from a checkout with `pip install -e .`")
+    return path
+
+
+def run_script(stage: str, argv=()):
+    """Runs a stage's script as `python script.py *argv` would, in this process."""
+    path = script_path(stage)
+    saved_argv, saved_path = sys.argv, list(sys.path)
+    sys.argv = [str(path), *argv]
+    sys.path.insert(0, str(path.parent))  # scripts import siblings such as GH_token
+    try:
+        runpy.run_path(str(path), run_name="__main__")
+    finally:
+        sys.argv, sys.path[:] = saved_argv, saved_path
+
+
+def analyze_rq3(args):
+    from .analysis.rq3_analysis import ALL_SSTUBS, compare, load_prs
+
+    sizes, has_sstub, bug_types = load_prs(args.input)
+    results = compare(sizes, has_sstub, bug_types, resamples=args.resamples, seed=args.seed)
+    print("Mann-Whitney U tests, PRs with SStuBs vs PRs without:")
+    print(results[results["group"] == ALL_SSTUBS].to_string(index=False))
+    print("\nPer SStuB type:")
+    print(results[results["group"] != ALL_SSTUBS].to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print("[INFO] Saved to:", os.path.abspath(args.output))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="sstub", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-C", "--directory", help="run the stage from this directory (default: the current one)")
+    stages = parser.add_subparsers(dest="stage", metavar="stage", required=True)
+
+    stages.add_parser("collect", help="mirror the projects of TopJavaMavenProjects.csv").set_defaults(script="collect")
+    stages.add_parser("szz", help="blame the buggy lines of bugs.json into introducing_commits.jsonl").set_defaults(script="szz")
+    enrich = stages.add_parser("enrich", help="fetch GitHub data for the RQ1 or RQ2 dataset")
+    enrich.add_argument("rq", choices=["rq1", "rq2"])
+    # every argument after `rescore` is handed to rescore.py, --help included
+    stages.add_parser("rescore", help="recompute the explicit-mention flags from the review corpus",
+                      add_help=False).set_defaults(script="rescore", passthrough=True)
+    stages.add_parser("merge", help="merge the enriched introducing commits with sstubs.json").set_defaults(script="merge")
+    stages.add_parser("clean", help="drop test files and invalid fixing times from the RQ2 dataset").set_defaults(script="clean")
+
+    analyze = stages.add_parser("analyze", help="run the analysis of a research question")
+    questions = analyze.add_subparsers(dest="rq", metavar="rq", required=True)
+    rq1 = questions.add_parser("rq1", help="reviewer count vs SStuB type: permutation chi-square and multinomial model")
+    rq1.add_argument("--model", choices=["chi", "log", "both"], default="both")
+    questions.add_parser("rq2", help="explicit mentions vs fixing time: survival analysis").set_defaults(script="analyze rq2")
+    rq3 = questions.add_parser("rq3", help="PR size vs SStuBs: Mann-Whitney U tests")
+    rq3.add_argument("--input", default="updated_dataset.parquet")
+    rq3.add_argument("--output", help="also write the results to this csv")
+    rq3.add_argument("--resamples", type=int, default=1000, help="bootstrap resamples of the effect sizes, 0 = off")
+    rq3.add_argument("--seed", type=int, default=0)
+    rq3.set_defaults(run=analyze_rq3)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and not getattr(args, "passthrough", False):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.directory:
+        os.chdir(args.directory)
+    if getattr(args, "run", None):
+        args.run(args)
+    elif args.stage == "enrich":
+        run_script(f"enrich {args.rq}")
+    elif args.stage == "analyze" and args.rq == "rq1":
+        for model in ("chi", "log") if args.model == "both" else (args.model,):
+            run_script(f"analyze rq1 {model}")
+    else:
+        run_script(args.script, extra)
+
+
+if __name__ == "__main__":
+    main()
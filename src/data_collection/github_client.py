@@ -0,0 +1,134 @@
+import asyncio
+import json
+import re
+import aiohttp
+
+from .token_pool import TokenPool
+
+API_URL = "https://api.github.com"
+LINK_LAST = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+
+class AsyncGitHubClient:
+    """
+    asyncio GitHub REST client sharing one pooled keep-alive connection.
+    At most `concurrency` requests are in flight, and every request is sent
+    with the token of `tokens` (a list or a shared TokenPool) that has the most
+    quota left. With a ResponseCache, GETs are revalidated with conditional
+    requests and GraphQL answers are replayed from disk. Point `base_url` at a
+    local server to run against a fake GitHub.
+
+        async with AsyncGitHubClient(tokens) as client:
+            status, headers, data = await client.get("/repos/owner/repo/pulls")
+    """
+
+    def __init__(self, tokens, base_url: str = API_URL, concurrency: int = 16, max_retries: int = 5, cache=None):
+        self.pool = tokens if isinstance(tokens, TokenPool) else TokenPool(tokens)
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.cache = cache
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"Accept": "application/vnd.github+json"},
+            timeout=aiohttp.ClientTimeout(total=60),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+
+    def url(self, path: str) -> str:
+        return path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
+
+    async def request(self, method: str, path: str, params=None, json_body=None, headers=None):
+        """
+        Sends one request, waiting on the rate limit and retrying rate-limited,
+        5xx and connection failures. Returns (status, headers, parsed JSON or None).
+        """
+        key = cached = None
+        if self.cache is not None:
+            key = self.cache.key(method, self.url(path), params, json_body)
+            cached = self.cache.get(key)
+            # only GETs can be revalidated, a stored GraphQL answer is replayed as is
+            if cached is not None and (self.cache.offline or method != "GET"):
+                self.cache.hit(key)
+                return cached
+            if cached is None and self.cache.offline:
+                self.cache.stats["misses"] += 1
+                return 0, {}, None
+            if cached is not None:
+                headers = {**self.cache.conditional_headers(cached), **(headers or {})}
+
+        for attempt in range(self.max_retries + 1):
+            token = await self.pool.acquire()
+            request_headers = {"Authorization": f"token {token}", **(headers or {})}
+            backoff = 2 ** attempt
+            try:
+                async with self._semaphore:
+                    async with self._session.request(method, self.url(path), params=params, json=json_body, headers=request_headers) as response:
+                        self.pool.update(token, response.status, response.headers)
+                        rate_limited = self.pool.is_rate_limited(response.status, response.headers)
+                        if response.status == 304 and cached is not None:
+                            self.cache.hit(key, revalidated=True)
+                            return cached
+                        if not (rate_limited or response.status >= 500) or attempt == self.max_retries:
+                            body = await response.read()
+                            try:
+                                data = json.loads(body) if body else None
+                            except ValueError:
+                                data = None
+                            if key and response.status == 200 and data is not None and not (isinstance(data, dict) and data.get("errors")):
+                                self.cache.put(key, self.url(path), response.status, response.headers, body)
+                            return response.status, response.headers, data
+                # the token is parked, the retry goes out with another one or waits for the reset
+                backoff = 0 if rate_limited else backoff
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"[WARN] {method} {path} failed ({e}), retrying")
+            await asyncio.sleep(backoff)
+
+    async def get(self, path: str, params=None, headers=None):
+        return await self.request("GET", path, params=params, headers=headers)
+
+    async def get_json(self, path: str, params=None):
+        """Returns the parsed body of a successful GET, or None."""
+        status, _, data = await self.get(path, params=params)
+        return data if status == 200 else None
+
+    async def get_all_pages(self, path: str, params=None) -> list:
+        """
+        Fetches every page of a list endpoint. The first page's Link header
+        tells how many pages there are, the rest are requested concurrently.
+        """
+        params = {"per_page": 100, **(params or {})}
+        status, headers, first = await self.get(path, params={**params, "page": 1})
+        if status != 200:
+            print(f"[ERROR] Failed to fetch {path}: {status}")
+            return []
+        match = LINK_LAST.search(headers.get("Link", ""))
+        last_page = int(match.group(1)) if match else 1
+        pages = await asyncio.gather(*(
+            self.get_json(path, params={**params, "page": page}) for page in range(2, last_page + 1)
+        ))
+        items = list(first)
+        for page in pages:
+            items.extend(page or [])
+        return items
+
+    async def graphql(self, query: str, variables=None):
+        """
+        Runs a GraphQL query. Returns (data, errors); fields that failed to
+        resolve are null in `data` and described in `errors`.
+        Note that GraphQL has its own rate limit, so give it its own TokenPool.
+        """
+        status, _, body = await self.request("POST", "/graphql", json_body={"query": query, "variables": variables or {}})
+        if status != 200 or body is None:
+            return None, [{"message": f"HTTP {status}"}]
+        return body.get("data"), body.get("errors") or []
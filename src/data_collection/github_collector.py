@@ -0,0 +1,130 @@
+import asyncio
+
+from tqdm import tqdm
+
+from .github_graphql import to_isoformat
+
+
+async def get_pr_info(client, owner: str, repo: str, commit_sha: str):
+    """Returns the first PR containing the commit and its reviewer count, or None."""
+    # check if apart of PR
+    status, _, pulls = await client.get(f"/repos/{owner}/{repo}/commits/{commit_sha}/pulls")
+    if status != 200 or not pulls:
+        return None
+
+    pr = pulls[0]
+    pr_number = pr["number"]
+
+    #collect reviewer meta data
+    reviews = await client.get_json(f"/repos/{owner}/{repo}/pulls/{pr_number}/reviews") or []
+    reviewer_count = len(set(r["user"]["login"] for r in reviews if "user" in r and r["user"]))
+
+    return {
+        "pr_number": pr_number,
+        "reviewer_count": reviewer_count,
+        "pr_created_at": pr["created_at"],
+        "pr_merged_at": pr["merged_at"]
+    }
+
+
+async def enrich_introducing_commit(client, entry: dict) -> dict:
+    """Adds introducingCommitHasPR / introducingPR to an introducing_commits.jsonl entry."""
+    try:
+        owner, repo = entry["projectName"].replace(".", "/").split("/")
+        pr_info = await get_pr_info(client, owner, repo, entry["introducingCommitSHA"])
+        entry["introducingCommitHasPR"] = bool(pr_info)
+        if pr_info:
+            entry["introducingPR"] = pr_info
+    except Exception as e:
+        entry["introducingCommitHasPR"] = False
+        print(f"[ERROR] {entry['projectName']} - {e}")
+    return entry
+
+
+async def get_commit(client, owner: str, repo: str, commit_sha: str):
+    """
+    REST counterpart of github_graphql.fetch_commits for a single commit:
+    {"date", "message", "pr"}, or None if the commit cannot be fetched.
+    """
+    commit = await client.get_json(f"/repos/{owner}/{repo}/commits/{commit_sha}")
+    if commit is None:
+        print(f"[ERROR] Failed to fetch commit {commit_sha}")
+        return None
+    git_commit = commit["commit"]
+    date = (git_commit.get("author") or {}).get("date") or (git_commit.get("committer") or {}).get("date")
+
+    pr = None
+    pulls = await client.get_json(f"/repos/{owner}/{repo}/commits/{commit_sha}/pulls")
+    if pulls:
+        # the pulls listing carries no size fields
+        pr = {
+            "number": pulls[0]["number"],
+            "createdAt": to_isoformat(pulls[0].get("created_at")),
+            "mergedAt": to_isoformat(pulls[0].get("merged_at")),
+        }
+    return {"date": to_isoformat(date), "message": git_commit.get("message"), "pr": pr}
+
+
+async def get_pull_request_reviews(client, owner: str, repo: str, pr_number: int, with_comments: bool = False) -> dict:
+    """REST counterpart of github_graphql.fetch_pull_requests for a single PR."""
+    reviews, comments = await asyncio.gather(
+        client.get_all_pages(f"/repos/{owner}/{repo}/pulls/{pr_number}/reviews"),
+        client.get_all_pages(f"/repos/{owner}/{repo}/pulls/{pr_number}/comments") if with_comments else asyncio.sleep(0, result=[]),
+    )
+    return {
+        "reviewerCount": len({r["user"]["login"] for r in reviews if r.get("user")}),
+        "reviewComments": [comment["body"] for comment in comments],
+        "reviewBodies": [r["body"] for r in reviews if r.get("body")] if with_comments else [],
+    }
+
+
+async def get_pr_size(client, pr: dict):
+    """Fills in size metrics and commit SHAs of one augmented PR, returns None if it could not be fetched."""
+    pull_request = await client.get_json(pr["url"])
+    if pull_request is None:
+        print(f"[ERROR] Failed to fetch PR {pr['url']}")
+        return None
+
+    pr["linesAdded"] = pull_request["additions"]
+    pr["linesRemoved"] = pull_request["deletions"]
+    pr["linesChanged"] = pull_request["additions"] + pull_request["deletions"]
+    pr["filesChanged"] = pull_request["changed_files"]
+
+    # If only one commit, get from head
+    if pull_request["commits"] == 1:
+        pr["commitSHAs"].append(pull_request["head"]["sha"])
+        return pr
+
+    # Else make request for commits
+    commits = await client.get_json(pull_request["commits_url"])
+    if commits is None:
+        print(f"[ERROR] Failed to fetch commits of {pr['url']}")
+        return None
+    pr["commitSHAs"].extend(commit["sha"] for commit in commits)
+    return pr
+
+
+async def augment_data(client, url: str) -> list:
+    """
+    Collects every merged PR of a repository (`url` is its /pulls endpoint)
+    with its size metrics and commit SHAs, in the augmented_dataset.json format.
+    """
+    pull_requests = await client.get_all_pages(url, params={"state": "closed"})
+    augmented_prs = [{
+        "url": pr["url"],
+        "commitSHAs": [],
+        "linesAdded": -1,
+        "linesRemoved": -1,
+        "linesChanged": -1,
+        "filesChanged": -1,
+        "sstubs": []
+    } for pr in pull_requests if pr["merged_at"]]
+
+    with tqdm(total=len(augmented_prs)) as pbar:
+        async def fetch(pr):
+            result = await get_pr_size(client, pr)
+            pbar.update(1)
+            return result
+
+        results = await asyncio.gather(*(fetch(pr) for pr in augmented_prs))
+    return [pr for pr in results if pr is not None]
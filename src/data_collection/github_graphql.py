@@ -0,0 +1,176 @@
+import asyncio
+
+BATCH_SIZE = 20  # commits or PRs resolved per GraphQL query
+
+COMMIT_FIELDS = """
+      ... on Commit {
+        oid
+        message
+        authoredDate
+        associatedPullRequests(first: 1) {
+          nodes { number createdAt mergedAt additions deletions changedFiles }
+        }
+      }
+"""
+
+PAGE_SIZE = 100  # GraphQL's maximum for `first`
+PAGE_INFO = "pageInfo { hasNextPage endCursor }"
+REVIEW_COMMENTS = f"body comments(first: {PAGE_SIZE}) {{ {PAGE_INFO} nodes {{ body }} }}"
+
+# follow-up page of one review's comments
+COMMENTS_PAGE = f"""query($id: ID!, $after: String!) {{
+  node(id: $id) {{
+    ... on PullRequestReview {{ comments(first: {PAGE_SIZE}, after: $after) {{ {PAGE_INFO} nodes {{ body }} }} }}
+  }}
+}}"""
+
+
+def review_fields(with_comments: bool) -> str:
+    return f"id author {{ login }} {REVIEW_COMMENTS if with_comments else ''}"
+
+
+def pr_fields(with_comments: bool) -> str:
+    return f"""
+      number
+      reviews(first: {PAGE_SIZE}) {{ {PAGE_INFO} nodes {{ {review_fields(with_comments)} }} }}
+"""
+
+
+def reviews_page(with_comments: bool) -> str:
+    """Query for the follow-up page of a PR's reviews."""
+    return f"""query($owner: String!, $name: String!, $number: Int!, $after: String!) {{
+  repository(owner: $owner, name: $name) {{
+    pullRequest(number: $number) {{
+      reviews(first: {PAGE_SIZE}, after: $after) {{ {PAGE_INFO} nodes {{ {review_fields(with_comments)} }} }}
+    }}
+  }}
+}}"""
+
+
+def to_isoformat(timestamp):
+    """GraphQL returns '...Z' timestamps, REST/PyGithub records used '+00:00'."""
+    if timestamp and timestamp.endswith("Z"):
+        return timestamp[:-1] + "+00:00"
+    return timestamp
+
+
+def build_query(field: str, argument: str, var_type: str, n: int, fields: str) -> str:
+    """Builds one query resolving `n` aliased `field(argument: $kI)` lookups in a repository."""
+    declarations = "".join(f", $k{i}: {var_type}" for i in range(n))
+    aliases = "".join(f"\n    k{i}: {field}({argument}: $k{i}) {{{fields}    }}" for i in range(n))
+    return (
+        f"query($owner: String!, $name: String!{declarations}) {{\n"
+        f"  repository(owner: $owner, name: $name) {{{aliases}\n  }}\n"
+        f"}}"
+    )
+
+
+def parse_commit(node: dict) -> dict:
+    """Converts a commit node into {"date", "message", "pr"}; "pr" is None for commits outside any PR."""
+    pulls = (node.get("associatedPullRequests") or {}).get("nodes") or []
+    pr = None
+    if pulls:
+        pr = {
+            "number": pulls[0]["number"],
+            "createdAt": to_isoformat(pulls[0].get("createdAt")),
+            "mergedAt": to_isoformat(pulls[0].get("mergedAt")),
+            "additions": pulls[0].get("additions"),
+            "deletions": pulls[0].get("deletions"),
+            "changedFiles": pulls[0].get("changedFiles"),
+        }
+    return {"date": to_isoformat(node.get("authoredDate")), "message": node.get("message"), "pr": pr}
+
+
+def parse_pull_request(node: dict) -> dict:
+    """Converts a PR node into {"reviewerCount", "reviewComments", "reviewBodies"}."""
+    reviews = (node.get("reviews") or {}).get("nodes") or []
+    comments = []
+    for review in reviews:
+        comments.extend(c["body"] for c in ((review.get("comments") or {}).get("nodes") or []))
+    return {
+        "reviewerCount": len({r["author"]["login"] for r in reviews if r.get("author")}),
+        "reviewComments": comments,
+        "reviewBodies": [r["body"] for r in reviews if r.get("body")],
+    }
+
+
+async def fetch_batched(client, owner: str, repo: str, keys, query_for, parse, batch_size: int) -> dict:
+    """Resolves `keys` `batch_size` at a time with concurrent queries, returns {key: parsed node}."""
+    keys = list(dict.fromkeys(keys))
+
+    async def fetch_batch(batch):
+        variables = {"owner": owner, "name": repo, **{f"k{i}": key for i, key in enumerate(batch)}}
+        data, errors = await client.graphql(query_for(len(batch)), variables)
+        if errors:
+            print(f"[WARN] GraphQL errors for {owner}/{repo}: {errors[0].get('message')}")
+        repository = (data or {}).get("repository") or {}
+        return {key: parse(repository[f"k{i}"]) for i, key in enumerate(batch) if repository.get(f"k{i}")}
+
+    results = {}
+    batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+    for resolved in await asyncio.gather(*(fetch_batch(batch) for batch in batches)):
+        results.update(resolved)
+    return results
+
+
+async def fetch_commits(client, owner: str, repo: str, shas, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Resolves the date, message and associated PR (number, dates, size) of many
+    commits of one repository. Commits that could not be resolved are left out.
+    """
+    def query_for(n):
+        return build_query("object", "expression", "String!", n, COMMIT_FIELDS)
+    return await fetch_batched(client, owner, repo, shas, query_for, parse_commit, batch_size)
+
+
+async def next_pages(client, query: str, variables: dict, connection, page: dict) -> list:
+    """
+    The nodes of `page`, a connection with pageInfo, followed by those of its
+    next pages: `query` is run with `after` set to the last cursor, and
+    `connection` picks the connection out of the response data.
+    """
+    nodes = list(page.get("nodes") or [])
+    while (page.get("pageInfo") or {}).get("hasNextPage"):
+        data, errors = await client.graphql(query, {**variables, "after": page["pageInfo"]["endCursor"]})
+        page = connection(data) if data else None
+        if errors or not page:
+            print(f"[WARN] GraphQL paging stopped after {len(nodes)} nodes: {errors[0].get('message') if errors else 'no data'}")
+            break
+        nodes.extend(page.get("nodes") or [])
+    return nodes
+
+
+async def complete_pull_request(client, owner: str, repo: str, node: dict, with_comments: bool) -> dict:
+    """Fetches the reviews, and review comments, a PR node holds beyond its first page, in place."""
+    reviews = node.get("reviews") or {}
+    variables = {"owner": owner, "name": repo, "number": node["number"]}
+    reviews["nodes"] = await next_pages(
+        client, reviews_page(with_comments), variables,
+        lambda data: ((data.get("repository") or {}).get("pullRequest") or {}).get("reviews"), reviews,
+    )
+    if with_comments:
+        for review in reviews["nodes"]:
+            comments = review.get("comments") or {}
+            comments["nodes"] = await next_pages(
+                client, COMMENTS_PAGE, {"id": review["id"]},
+                lambda data: (data.get("node") or {}).get("comments"), comments,
+            )
+            review["comments"] = comments
+    node["reviews"] = reviews
+    return node
+
+
+async def fetch_pull_requests(client, owner: str, repo: str, numbers, with_comments: bool = False, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Resolves reviewer counts (and optionally review bodies and comments) of
+    many PRs of one repository. PRs with more than PAGE_SIZE reviews, or
+    reviews with more than PAGE_SIZE comments, are paged to the end with
+    follow-up queries, as the REST helpers do.
+    """
+    fields = pr_fields(with_comments)
+
+    def query_for(n):
+        return build_query("pullRequest", "number", "Int!", n, fields)
+    nodes = await fetch_batched(client, owner, repo, numbers, query_for, lambda node: node, batch_size)
+    completed = await asyncio.gather(*(complete_pull_request(client, owner, repo, node, with_comments) for node in nodes.values()))
+    return {number: parse_pull_request(node) for number, node in zip(nodes, completed)}
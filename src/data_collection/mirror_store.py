@@ -0,0 +1,186 @@
+import errno
+import json
+import os
+import shutil
+import stat
+import subprocess
+import time
+
+INDEX_FILE = "mirrors.json"
+ROOT_ENV = "SSTUB_MIRRORS_DIR"  # environment variable overriding DEFAULT_ROOT
+DEFAULT_ROOT = "C:/r"
+
+
+def default_root() -> str:
+    """Root of the mirror store shared by projectCollection.py, dataEnrichmentSZZ.py and augment.py."""
+    return os.environ.get(ROOT_ENV, DEFAULT_ROOT)
+
+
+def mirror_name(full_name: str) -> str:
+    """'Owner/Repo' or 'Owner.Repo' -> 'Owner_Repo', the directory layout the SZZ scripts expect."""
+    return full_name.replace("/", "_").replace(".", "_")
+
+
+def handle_remove_readonly(func, path, exc_info):
+    """Callback for shutil.rmtree to handle read-only files (git objects) on Windows."""
+    exc_value = exc_info[1]
+    if func in (os.rmdir, os.remove, os.unlink) and exc_value.errno == errno.EACCES:
+        os.chmod(path, stat.S_IWRITE)
+        func(path)
+    else:
+        raise exc_value
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def write_commit_graph(path: str):
+    """
+    Writes (or extends, as a split commit-graph layer) the commit-graph of the
+    repository at `path` with changed-path Bloom filters. Needs git 2.27+.
+    """
+    subprocess.run(["git", "commit-graph", "write", "--reachable", "--changed-paths", "--split"], cwd=path, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+class MirrorStore:
+    """
+    One bare, blobless (`--filter=blob:none`) clone per project under `root`,
+    shared by every stage that needs git history. Commits and trees are fetched
+    up front; blobs are fetched on demand by blame/cat-file/log -S and then kept,
+    so a mirror grows with use instead of holding every version of every file.
+
+    `get()` clones a missing mirror, or refreshes an existing one with
+    `git fetch` when it was last fetched more than `refresh_after` seconds ago.
+    Sizes and last-use times are kept in `root/mirrors.json`; once the store
+    grows past `max_bytes` the least recently used mirrors are deleted.
+    Plain clones already under `root` (e.g. from older runs) are adopted as-is.
+
+    With `commit_graph=True` every mirror gets a commit-graph with
+    changed-path Bloom filters, extended after each fetch, so path-limited
+    history walks (`git log -- path`, -S) skip commits that did not touch the
+    path without opening their trees.
+    """
+
+    def __init__(self, root: str, max_bytes: int = None, clone_filter: str = "blob:none", refresh_after: float = 24 * 3600,
+                 commit_graph: bool = True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.clone_filter = clone_filter
+        self.refresh_after = refresh_after
+        self.commit_graph = commit_graph
+        self.stats = {"cloned": 0, "fetched": 0, "reused": 0, "evicted": 0}
+        os.makedirs(root, exist_ok=True)
+        self._index_path = os.path.join(root, INDEX_FILE)
+        self._index = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        self._adopt_existing()
+
+    def _adopt_existing(self):
+        """Registers repositories under root that the index does not know about yet."""
+        adopted = False
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name in self._index or not os.path.isdir(path):
+                continue
+            if os.path.exists(os.path.join(path, "HEAD")) or os.path.exists(os.path.join(path, ".git")):
+                self._index[name] = {"size": directory_size(path), "used": os.path.getmtime(path), "fetched": 0}
+                adopted = True
+        if adopted:
+            self._save()
+
+    def _save(self):
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self._index_path)
+
+    def path(self, full_name: str) -> str:
+        return os.path.join(self.root, mirror_name(full_name))
+
+    def get(self, full_name: str, url: str = None) -> str:
+        """
+        Returns the path of an up-to-date mirror of `full_name` ('Owner/Repo'),
+        cloning or fetching as needed. Raises subprocess.CalledProcessError if
+        git fails.
+        """
+        name = mirror_name(full_name)
+        path = os.path.join(self.root, name)
+        url = url or f"https://github.com/{full_name}.git"
+        now = time.time()
+        entry = self._index.get(name)
+
+        if entry is None or not os.path.exists(path):
+            if os.path.exists(path):
+                shutil.rmtree(path, onerror=handle_remove_readonly)
+            cmd = ["git", "clone", "--bare", "--config", "core.longpaths=true"]
+            if self.clone_filter:
+                cmd.append(f"--filter={self.clone_filter}")
+            subprocess.run(cmd + [url, path], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            # a plain --bare clone sets no fetch refspec, so `git fetch` would not move any branch
+            subprocess.run(["git", "config", "remote.origin.fetch", "+refs/heads/*:refs/heads/*"], cwd=path, check=True)
+            self.stats["cloned"] += 1
+            entry = {"fetched": now}
+        elif now - entry.get("fetched", 0) > self.refresh_after:
+            subprocess.run(["git", "fetch", "--prune", "--tags", "origin"], cwd=path, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            self.stats["fetched"] += 1
+            entry["fetched"] = now
+        else:
+            self.stats["reused"] += 1
+
+        if self.commit_graph and entry.get("commitGraph", -1) < entry.get("fetched", 0):
+            write_commit_graph(path)
+            entry["commitGraph"] = entry.get("fetched", 0)
+
+        entry["used"] = now
+        entry["size"] = directory_size(path)
+        self._index[name] = entry
+        self.evict(keep=(name,))
+        self._save()
+        return path
+
+    def touch(self, full_name: str):
+        """Marks a mirror as used, e.g. after a long blame run that fetched blobs into it."""
+        name = mirror_name(full_name)
+        if name in self._index:
+            self._index[name]["used"] = time.time()
+            self._index[name]["size"] = directory_size(os.path.join(self.root, name))
+            self._save()
+
+    def size(self) -> int:
+        return sum(entry.get("size", 0) for entry in self._index.values())
+
+    def evict(self, keep=()):
+        """Deletes least recently used mirrors (never those in `keep`) until the store fits in max_bytes."""
+        if self.max_bytes is None:
+            return
+        total = self.size()
+        for name in sorted(self._index, key=lambda n: self._index[n].get("used", 0)):
+            if total <= self.max_bytes:
+                break
+            if name in keep:
+                continue
+            path = os.path.join(self.root, name)
+            print(f"[INFO] Evicting mirror {name} ({self._index[name].get('size', 0) / 1024 ** 2:.0f} MiB)")
+            if os.path.exists(path):
+                shutil.rmtree(path, onerror=handle_remove_readonly)
+            total -= self._index.pop(name).get("size", 0)
+            self.stats["evicted"] += 1
+        self._save()
+
+    def summary(self) -> str:
+        return (
+            f"{self.stats['cloned']} cloned, {self.stats['fetched']} fetched, {self.stats['reused']} reused, "
+            f"{self.stats['evicted']} evicted, {len(self._index)} mirrors / {self.size() / 1024 ** 3:.2f} GiB on disk"
+        )
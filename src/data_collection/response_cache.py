@@ -0,0 +1,126 @@
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# response headers worth replaying: validators and pagination
+KEPT_HEADERS = ("ETag", "Last-Modified", "Link")
+
+
+class ResponseCache:
+    """
+    On-disk cache of GitHub API responses in a single SQLite file.
+
+    Entries are addressed by a SHA-256 digest of the normalized request (method,
+    URL with sorted query parameters, JSON body) and hold the raw JSON body
+    (zlib-compressed) together with its ETag/Last-Modified. A cached GET is
+    revalidated with If-None-Match/If-Modified-Since; GitHub answers an
+    unchanged resource with a 304 that is not counted against the rate limit.
+    With `offline=True` entries are replayed without touching the network.
+    The least recently used entries are evicted once the cache grows past
+    `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 2 * 1024 ** 3, offline: bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                fetched REAL,
+                accessed REAL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._db.commit()
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def normalize_url(url: str, params=None) -> str:
+        """Lowercases scheme and host and merges `params` into a sorted query string."""
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        query.extend((k, str(v)) for k, v in (params or {}).items())
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), urlencode(sorted(query)), ""))
+
+    def key(self, method: str, url: str, params=None, json_body=None) -> str:
+        request = f"{method.upper()} {self.normalize_url(url, params)}"
+        if json_body is not None:
+            request += "\n" + json.dumps(json_body, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Returns the cached (status, headers, data), or None."""
+        row = self._db.execute("SELECT status, headers, body FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        status, headers, body = row
+        return status, json.loads(headers), json.loads(zlib.decompress(body)) if body else None
+
+    def conditional_headers(self, cached) -> dict:
+        """Request headers that turn a refetch of `cached` into a conditional request."""
+        _, headers, _ = cached
+        conditional = {}
+        if headers.get("ETag"):
+            conditional["If-None-Match"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+    def hit(self, key: str, revalidated: bool = False):
+        """Records that `key` was served from the cache."""
+        self.stats["revalidated" if revalidated else "hits"] += 1
+        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+
+    def put(self, key: str, url: str, status: int, headers, body: bytes):
+        self.stats["misses"] += 1
+        kept = {name: headers[name] for name in KEPT_HEADERS if name in headers}
+        blob = zlib.compress(body) if body else b""
+        size = len(blob) + len(url)
+        now = time.time()
+        old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, url, status, json.dumps(kept), blob, size, now, now),
+        )
+        self._db.commit()
+        self.stats["stored"] += 1
+        self._size += size - (old[0] if old else 0)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Drops least recently used entries until the cache is 90% of its budget."""
+        target = self.max_bytes * 0.9
+        while self._size > target:
+            rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 500").fetchall()
+            if not rows:
+                break
+            self._db.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key, _ in rows])
+            self._size -= sum(size for _, size in rows)
+            self.stats["evicted"] += len(rows)
+        self._db.commit()
+
+    def summary(self) -> str:
+        served = self.stats["hits"] + self.stats["revalidated"]
+        total = served + self.stats["misses"]
+        ratio = served / total if total else 0
+        return (
+            f"{served}/{total} responses served from cache ({ratio:.1%}, {self.stats['revalidated']} revalidated), "
+            f"{self.stats['evicted']} evicted, {self._size / 1024 ** 2:.1f} MiB on disk"
+        )
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+
+class TokenPool:
+    """
+    Shared pool of GitHub tokens with per-token quota tracking.
+
+    Every token is a token bucket: it is refilled from the X-RateLimit-Remaining /
+    X-RateLimit-Reset headers of the responses it receives and drained locally
+    by every request sent with it, so concurrent requests never overshoot a
+    quota. `pick` always hands out the token with the most headroom; exhausted
+    tokens are parked until their reset time, and callers only wait when every
+    token is parked.
+    """
+
+    def __init__(self, tokens, limit: int = 5000):
+        tokens = [tokens] if isinstance(tokens, str) else list(tokens)
+        if not tokens:
+            raise ValueError("TokenPool needs at least one token")
+        self.tokens = tokens
+        self.remaining = {token: limit for token in tokens}
+        self.reset_at = {token: 0.0 for token in tokens}
+        self.parked_until = {token: 0.0 for token in tokens}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def _unpark(self, now: float):
+        for token in self.tokens:
+            if self.remaining[token] <= 0 and now >= self.reset_at[token]:
+                # the window has reset, let one request through to learn the new quota
+                self.remaining[token] = 1
+
+    def pick(self):
+        """
+        Reserves one request on the usable token with the most quota left.
+        Returns (token, 0) or, if every token is parked, (None, seconds until one resets).
+        """
+        with self._lock:
+            now = time.time()
+            self._unpark(now)
+            usable = [t for t in self.tokens if self.remaining[t] > 0 and self.parked_until[t] <= now]
+            if not usable:
+                wake_at = [max(self.parked_until[t], self.reset_at[t] if self.remaining[t] <= 0 else 0) for t in self.tokens]
+                # a reset time we have never been told about: check back in a minute
+                return None, max(min(w if w > now else now + 60 for w in wake_at) - now, 1)
+            token = max(usable, key=lambda t: self.remaining[t])
+            self.remaining[token] -= 1
+            return token, 0
+
+    async def acquire(self) -> str:
+        """Returns a token with quota left, sleeping while every token is parked."""
+        while True:
+            token, wait = self.pick()
+            if token:
+                return token
+            print(f"[INFO] All {len(self.tokens)} tokens exhausted, sleeping {wait:.0f}s")
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self) -> str:
+        """Blocking variant of `acquire` for synchronous clients."""
+        while True:
+            token, wait = self.pick()
+            if token:
+                return token
+            print(f"[INFO] All {len(self.tokens)} tokens exhausted, sleeping {wait:.0f}s")
+            time.sleep(wait)
+
+    def set_quota(self, token: str, remaining: int, reset_at: float):
+        """Records the quota a token has left and when its window resets (epoch seconds)."""
+        with self._lock:
+            self.remaining[token] = remaining
+            self.reset_at[token] = reset_at
+            if remaining <= 0:
+                self.parked_until[token] = max(self.parked_until[token], reset_at)
+
+    def update(self, token: str, status: int, headers):
+        """Syncs a token's bucket with the rate-limit headers of a response it received."""
+        if "X-RateLimit-Remaining" in headers:
+            reset_at = float(headers["X-RateLimit-Reset"]) + 1 if "X-RateLimit-Reset" in headers else self.reset_at[token]
+            self.set_quota(token, int(headers["X-RateLimit-Remaining"]), reset_at)
+        if "Retry-After" in headers:
+            self.park(token, time.time() + float(headers["Retry-After"]))
+
+    def park(self, token: str, until: float):
+        with self._lock:
+            self.parked_until[token] = max(self.parked_until[token], until)
+
+    @staticmethod
+    def is_rate_limited(status: int, headers) -> bool:
+        return status in (403, 429) and ("Retry-After" in headers or headers.get("X-RateLimit-Remaining") == "0")
+
+    def headroom(self) -> int:
+        """Requests left across every token in the current windows."""
+        return sum(max(r, 0) for r in self.remaining.values())
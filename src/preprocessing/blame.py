@@ -0,0 +1,179 @@
+import re
+import sqlite3
+import subprocess
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+# file name of the blame cache in the shared mirror root (mirror_store.default_root()), used by RQ1 and RQ2 alike
+CACHE_FILE = "blame_cache.sqlite"
+
+# header line of an entry in `git blame --incremental` output
+BLAME_HEADER = re.compile(r"^([0-9a-f]{40}) (\d+) (\d+) (\d+)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    project TEXT NOT NULL,
+    rev TEXT NOT NULL,
+    path TEXT NOT NULL,
+    lines INTEGER,  -- NULL when there is no such file at rev
+    PRIMARY KEY (project, rev, path)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS blame (
+    project TEXT NOT NULL,
+    rev TEXT NOT NULL,
+    path TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    commit_sha TEXT NOT NULL,
+    orig_line INTEGER NOT NULL,
+    author_date TEXT,
+    PRIMARY KEY (project, rev, path, line)
+) WITHOUT ROWID;
+"""
+
+
+def line_ranges(line_nums):
+    """Collapses sorted, unique line numbers into inclusive (start, end) ranges."""
+    ranges = []
+    for n in line_nums:
+        if ranges and n == ranges[-1][1] + 1:
+            ranges[-1][1] = n
+        else:
+            ranges.append([n, n])
+    return [tuple(r) for r in ranges]
+
+
+def author_date(author_time: str, author_tz: str) -> str:
+    """Formats porcelain author-time/author-tz the same way as `git log --format=%aI`."""
+    sign = -1 if author_tz.startswith("-") else 1
+    offset = timedelta(hours=int(author_tz[1:3]), minutes=int(author_tz[3:5])) * sign
+    return datetime.fromtimestamp(int(author_time), timezone(offset)).isoformat()
+
+
+def blame_lines(repo_path: str, rev: str, file_path: str, line_nums) -> dict:
+    """
+    Blames the given lines of `file_path` as of `rev` with a single
+    `git blame --incremental` call, without checking anything out.
+    Returns {line_num: {"commit", "origLineNum", "authorDate"}}.
+    """
+    cmd = ["git", "blame", "--incremental"]
+    for start, end in line_ranges(sorted(set(line_nums))):
+        cmd.extend(["-L", f"{start},{end}"])
+    cmd.extend([rev, "--", file_path])
+    output = subprocess.check_output(cmd, cwd=repo_path, stderr=subprocess.DEVNULL)
+
+    commits = defaultdict(dict)
+    blamed = {}
+    current = None
+    for raw in output.decode("utf-8", errors="replace").splitlines():
+        header = BLAME_HEADER.match(raw)
+        if header:
+            sha, orig, final, count = header.groups()
+            current = (sha, int(orig), int(final), int(count))
+            continue
+        if current is None:
+            continue
+        key, _, value = raw.partition(" ")
+        if key != "filename":
+            commits[current[0]][key] = value
+            continue
+
+        # "filename" closes the entry, by then the commit's metadata has been seen
+        sha, orig, final, count = current
+        meta = commits[sha]
+        date = author_date(meta["author-time"], meta["author-tz"]) if "author-time" in meta else None
+        for i in range(count):
+            blamed[final + i] = {"commit": sha, "origLineNum": orig + i, "authorDate": date}
+        current = None
+    return blamed
+
+
+def count_lines(contents: bytes) -> int:
+    """Number of lines git blame sees in a blob (a last line without newline counts)."""
+    return contents.count(b"\n") + (1 if contents and not contents.endswith(b"\n") else 0)
+
+
+def read_blob(repo_path: str, rev: str, file_path: str, cat=None):
+    """Contents of `rev:file_path` through `cat` (a CatFileBatch) if given, else one `git cat-file`; None if missing."""
+    if cat is not None:
+        return cat.read(rev, file_path)
+    result = subprocess.run(["git", "cat-file", "blob", f"{rev}:{file_path}"], cwd=repo_path,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    return result.stdout if result.returncode == 0 else None
+
+
+class BlameCache:
+    """
+    Blame results of (project, revision, path) in one SQLite file. A file at a
+    commit never changes, so the commit, original line number and author date
+    git blame reports for a line are stored once and reused by every later
+    run and by both SZZ paths (RQ1 dataEnrichmentSZZ.py, RQ2 augment.py).
+    Only the lines not in the cache are blamed, with one `git blame` call per
+    file; the file's line count is cached too, so lines past its end and files
+    missing at the revision are answered without git. With path=None the
+    cache only lives as long as the object.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.stats = {"hits": 0, "misses": 0}
+        # several SZZ worker processes may write at once
+        self._db = sqlite3.connect(path or ":memory:", timeout=60, check_same_thread=False)
+        if path:
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _line_count(self, repo_path: str, project: str, rev: str, file_path: str, cat=None):
+        row = self._db.execute("SELECT lines FROM files WHERE project = ? AND rev = ? AND path = ?", (project, rev, file_path)).fetchone()
+        if row:
+            return row[0]
+        contents = read_blob(repo_path, rev, file_path, cat)
+        lines = None if contents is None else count_lines(contents)
+        self._db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (project, rev, file_path, lines))
+        self._db.commit()
+        return lines
+
+    def blame(self, repo_path: str, project: str, rev: str, file_path: str, line_nums, cat=None) -> dict:
+        """
+        blame_lines() through the cache: {line_num: {"commit", "origLineNum",
+        "authorDate"}} for the lines of `line_nums` that exist in `file_path`
+        at `rev` (empty if the file does not exist there). Raises
+        subprocess.CalledProcessError if git blame fails.
+        """
+        total = self._line_count(repo_path, project, rev, file_path, cat)
+        wanted = {n for n in line_nums if total and 0 < n <= total}
+        if not wanted:
+            return {}
+
+        rows = self._db.execute(
+            "SELECT line, commit_sha, orig_line, author_date FROM blame WHERE project = ? AND rev = ? AND path = ?",
+            (project, rev, file_path),
+        )
+        blamed = {line: {"commit": sha, "origLineNum": orig, "authorDate": date}
+                  for line, sha, orig, date in rows if line in wanted}
+        missing = wanted - blamed.keys()
+        self.stats["hits"] += len(blamed)
+        self.stats["misses"] += len(missing)
+        if missing:
+            fresh = blame_lines(repo_path, rev, file_path, missing)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO blame VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(project, rev, file_path, line, info["commit"], info["origLineNum"], info["authorDate"])
+                 for line, info in fresh.items()],
+            )
+            self._db.commit()
+            blamed.update((line, info) for line, info in fresh.items() if line in wanted)
+        return blamed
+
+    def summary(self) -> str:
+        total = self.stats["hits"] + self.stats["misses"]
+        return f"{self.stats['hits']}/{total} blamed lines served from cache"
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,193 @@
+import os
+import shutil
+from itertools import islice
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+BATCH_SIZE = 50000  # records converted to one Arrow record batch at a time
+PARTITION_COLUMN = "projectName"
+ROW_COLUMN = "_row"  # position of each row in the written order; partitions are read back grouped by project
+
+# low-cardinality strings are stored once per file and referenced by index
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+PR_INFO = pa.struct([
+    ("pr_number", pa.int64()),
+    ("pr_created_at", pa.string()),
+    ("pr_merged_at", pa.string()),
+    ("reviewer_count", pa.int64()),
+])
+
+SCHEMAS = {
+    # RQ2 augmented SStuBs (merged_checkpoints.json / bugs_no_test_files.json)
+    "sstubs": pa.schema([
+        ("fixCommitSHA1", pa.string()),
+        ("fixCommitDate", pa.string()),
+        ("fixCommitHasPR", pa.bool_()),
+        ("fixPR", PR_INFO),
+        ("introducingCommitSHA", pa.string()),
+        ("introducingCommitDate", pa.string()),
+        ("introducingCommitHasPR", pa.bool_()),
+        ("introducingPR", PR_INFO),
+        ("TimeToFixHoursCommit", pa.float64()),
+        ("TimeToFixHoursPR", pa.float64()),
+        ("explicitMentionInIntroducingCommit", pa.bool_()),
+        ("explicitMentionInIntroducingPR", pa.bool_()),
+        ("bugType", CATEGORY),
+        ("projectName", CATEGORY),
+        ("sourceBeforeFix", pa.string()),
+        ("bugFilePath", CATEGORY),
+        ("bugLineNum", pa.int64()),
+    ]),
+    # RQ1 introducing commits joined with SStuBs (rq1_dataset.csv)
+    "introducing_commits": pa.schema([
+        ("fixCommitSHA1", pa.string()),
+        ("introducingCommitSHA", pa.string()),
+        ("projectName", CATEGORY),
+        ("bugFilePath", CATEGORY),
+        ("bugLineNum", pa.int64()),
+        ("bugType", CATEGORY),
+        ("reviewer_count", pa.int64()),
+        ("introducingCommitHasPR", pa.bool_()),
+        ("sstub_introduced", pa.int64()),
+    ]),
+    # RQ3 merged PRs with their size and linked SStuBs (augmented_dataset.json / updated_dataset.json);
+    # the PR-size metrics are columns of this table since every consumer reads them with the PR
+    "pull_requests": pa.schema([
+        ("url", pa.string()),
+        ("projectName", CATEGORY),
+        ("commitSHAs", pa.list_(pa.string())),
+        ("linesAdded", pa.int64()),
+        ("linesRemoved", pa.int64()),
+        ("linesChanged", pa.int64()),
+        ("filesChanged", pa.int64()),
+        ("sstubs", pa.list_(pa.struct([("sha", pa.string()), ("bugType", pa.string())]))),
+    ]),
+}
+
+
+def project_from_pr_url(url: str) -> str:
+    """'https://api.github.com/repos/Owner/Repo/pulls/1' -> 'Owner.Repo', the ManySStuBs4J project name."""
+    parts = url.split("/")
+    i = parts.index("repos")
+    return f"{parts[i + 1]}.{parts[i + 2]}"
+
+
+def _numbered(batches):
+    """Appends ROW_COLUMN to every batch, counting rows across batches."""
+    start = 0
+    for batch in batches:
+        rows = pa.array(range(start, start + batch.num_rows), type=pa.int64())
+        start += batch.num_rows
+        yield pa.RecordBatch.from_arrays(batch.columns + [rows], names=batch.schema.names + [ROW_COLUMN])
+
+
+def _write(data, path: str, schema: pa.Schema, batch_size: int = BATCH_SIZE):
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    ds.write_dataset(
+        _numbered(data),
+        path,
+        schema=schema.append(pa.field(ROW_COLUMN, pa.int64())),
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([schema.field(PARTITION_COLUMN)]), flavor="hive"),
+        basename_template="part-{i}.parquet",
+        max_rows_per_group=batch_size,
+    )
+
+
+def write_table(records, path: str, table: str, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Writes `records` (dicts, streamed `batch_size` at a time) as a Parquet
+    dataset under `path`, one hive partition (projectName=...) per project,
+    with the declared schema of `table` plus each row's position (ROW_COLUMN),
+    so read_table returns the rows in this order. Replaces any previous
+    dataset at `path`. Returns the number of rows written.
+    """
+    schema = SCHEMAS[table]
+    records = iter(records)
+    written = 0
+
+    def batches():
+        nonlocal written
+        while chunk := list(islice(records, batch_size)):
+            if table == "pull_requests":
+                chunk = [{**record, "projectName": project_from_pr_url(record["url"])} for record in chunk]
+            written += len(chunk)
+            yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+
+    _write(batches(), path, schema, batch_size)
+    return written
+
+
+def write_frame(frame, path: str, table: str) -> int:
+    """write_table for a pandas DataFrame holding the columns of `table`."""
+    return write_frames([frame], path, table)
+
+
+def write_frames(frames, path: str, table: str) -> int:
+    """write_table for an iterable of DataFrames (e.g. the chunks of an out-of-core stage)."""
+    schema = SCHEMAS[table]
+    written = 0
+
+    def batches():
+        nonlocal written
+        for frame in frames:
+            written += len(frame)
+            yield from pa.Table.from_pandas(frame[schema.names], schema=schema, preserve_index=False).to_batches()
+
+    _write(batches(), path, schema)
+    return written
+
+
+def dataset(path: str, table: str) -> ds.Dataset:
+    """Opens a dataset written by write_table; nothing is read until it is scanned."""
+    # the files carry the schema of `table`; the project comes from the directory names,
+    # dictionary-encoded like the other category columns
+    partitioning = ds.HivePartitioning.discover(infer_dictionary=True)
+    data = ds.dataset(path, format="parquet", partitioning=partitioning)
+    expected = SCHEMAS[table]
+    if set(data.schema.names) - {ROW_COLUMN} != set(expected.names):
+        raise ValueError(f"{path} does not hold a {table} table")
+    return data
+
+
+def read_table(path: str, table: str, columns=None, filter=None) -> pa.Table:
+    """
+    Reads only `columns` of the rows matching `filter`, a pyarrow expression
+    such as `(field("introducingCommitHasPR") == True) & (field("sstub_introduced") == 1)`.
+    Row groups and project partitions that cannot match are skipped. Rows
+    come back in the order they were written.
+    """
+    data = dataset(path, table)
+    if ROW_COLUMN not in data.schema.names:
+        return data.to_table(columns=columns, filter=filter)
+    names = list(columns) if columns is not None else SCHEMAS[table].names
+    result = data.to_table(columns=names + [ROW_COLUMN], filter=filter)
+    return result.take(pc.sort_indices(result[ROW_COLUMN])).drop_columns([ROW_COLUMN])
+
+
+def read_frame(path: str, table: str, columns=None, filter=None):
+    """
+    read_table as a pandas DataFrame. Dictionary columns become categoricals
+    holding only the values present, in sorted order, so crosstabs and
+    groupbys come out as they would from plain strings.
+    """
+    frame = read_table(path, table, columns, filter).to_pandas()
+    for name in frame.columns:
+        if hasattr(frame[name], "cat"):
+            frame[name] = frame[name].cat.remove_unused_categories()
+            frame[name] = frame[name].cat.reorder_categories(sorted(frame[name].cat.categories))
+    return frame
+
+
+def field(*name):
+    """Column reference for filters; nested struct fields are addressed as field("fixPR", "pr_merged_at")."""
+    return ds.field(*name)
+
+
+def contains(column, pattern: str, ignore_case: bool = False):
+    """Filter expression matching rows whose (string or dictionary) column contains `pattern`; nulls never match."""
+    return pc.coalesce(pc.match_substring(column.cast(pa.string()), pattern, ignore_case=ignore_case), pa.scalar(False))
@@ -0,0 +1,90 @@
+import subprocess
+from collections import OrderedDict
+
+
+class CatFileBatch:
+    """
+    A long-lived `git cat-file --batch` pipe for one repository.
+    Objects are requested as `<rev>:<path>`, so files can be read at any
+    commit without a checkout and without starting a process per lookup.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def read(self, rev: str, path: str):
+        """Returns the contents of the blob at `rev:path`, or None if there is no such file."""
+        if "\n" in path:
+            return None
+        self._proc.stdin.write(f"{rev}:{path}\n".encode("utf-8"))
+        self._proc.stdin.flush()
+        header = self._proc.stdout.readline()
+        if not header:
+            raise RuntimeError(f"git cat-file exited unexpectedly in {self.repo_path}")
+
+        # "<oid> <type> <size>" on success, "<request> missing" (or ambiguous) otherwise
+        parts = header.rstrip(b"\n").rsplit(b" ", 2)
+        if len(parts) != 3 or not parts[2].isdigit():
+            return None
+        data = self._proc.stdout.read(int(parts[2]) + 1)[:-1]
+        return data if parts[1] == b"blob" else None
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+
+
+def split_lines(text: str) -> list:
+    """
+    Lines of `text` with their endings, split at LF only, as git numbers
+    them; str.splitlines also breaks at CR, form feeds, NEL and the Unicode
+    line and paragraph separators.
+    """
+    lines = [line + "\n" for line in text.split("\n")]
+    last = lines.pop()[:-1]
+    if last:
+        lines.append(last)
+    return lines
+
+
+class BlobLines:
+    """
+    Decoded lines of files at given commits, read through a CatFileBatch and
+    kept in an LRU of at most `max_files` (commit, path) entries, so all
+    SStuBs in the same file at the same commit share a single read.
+    """
+
+    def __init__(self, cat: CatFileBatch, max_files: int = 256):
+        self.cat = cat
+        self.max_files = max_files
+        self.stats = {"hits": 0, "reads": 0}
+        self._lines = OrderedDict()
+
+    def get(self, rev: str, path: str):
+        """The lines (with line endings) of `path` at `rev`, or None if there is no such file."""
+        key = (rev, path)
+        if key in self._lines:
+            self._lines.move_to_end(key)
+            self.stats["hits"] += 1
+            return self._lines[key]
+        data = self.cat.read(rev, path)
+        lines = None if data is None else split_lines(data.decode("utf-8", errors="replace"))
+        self.stats["reads"] += 1
+        self._lines[key] = lines
+        if len(self._lines) > self.max_files:
+            self._lines.popitem(last=False)
+        return lines
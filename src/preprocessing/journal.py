@@ -0,0 +1,95 @@
+import glob
+import json
+import os
+
+from .streaming import JsonArrayWriter, iter_json_array
+
+# statuses that are not retried on restart
+FINAL_STATUSES = ("ok", "skipped")
+
+
+def record_key(entry: dict) -> tuple:
+    """Identifies an SStuB by (fixCommitSHA1, bugFilePath, bugLineNum)."""
+    return entry.get("fixCommitSHA1"), entry.get("bugFilePath"), entry.get("bugLineNum")
+
+
+class Journal:
+    """
+    Append-only JSONL journal of per-record augmentation results. Every line
+    is flushed and fsync'd as soon as the record is done, so a crash loses at
+    most the record being written. On restart the journal is replayed: records
+    that finished ("ok" or "skipped") are not processed again, "failed" ones are
+    retried. The last line for a key wins.
+
+    Only the status, position and file offset of each record are kept in
+    memory; the records themselves are read back from disk by compact().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                offset = 0
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        # a line torn by a crash mid-write, the record is simply redone
+                        item = None
+                    if item is not None:
+                        self.entries[tuple(item["key"])] = {"index": item["index"], "status": item["status"], "offset": offset}
+                    offset += len(line)
+        self._file = open(path, "ab")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def is_done(self, entry: dict) -> bool:
+        item = self.entries.get(record_key(entry))
+        return item is not None and item["status"] in FINAL_STATUSES
+
+    def counts(self) -> dict:
+        counts = {}
+        for item in self.entries.values():
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        return counts
+
+    def append(self, entry: dict, index: int, status: str, record=None, error: str = None):
+        """Durably records the outcome of one SStuB (`index` is its position in sstubs.json)."""
+        item = {"key": list(record_key(entry)), "index": index, "status": status}
+        if record is not None:
+            item["record"] = record
+        if error:
+            item["error"] = error
+        offset = self._file.tell()
+        self._file.write((json.dumps(item, default=str) + "\n").encode("utf-8"))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.entries[record_key(entry)] = {"index": index, "status": status, "offset": offset}
+
+    def import_checkpoints(self, checkpoint_dir: str, index_of: dict) -> int:
+        """Imports records from legacy checkpoint_*.json files; `index_of` maps record keys to positions."""
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(checkpoint_dir, "checkpoint_*.json"))):
+            for record in iter_json_array(path):
+                key = record_key(record)
+                if key in index_of and key not in self.entries:
+                    self.append(record, index_of[key], "ok", record=record)
+                    imported += 1
+        return imported
+
+    def compact(self, output_path: str) -> int:
+        """Writes every successful record, in sstubs.json order, as one JSON array (merged_checkpoints.json)."""
+        records = sorted((item for item in self.entries.values() if item["status"] == "ok"), key=lambda item: item["index"])
+        self._file.flush()
+        tmp_path = output_path + ".tmp"
+        with open(self.path, "rb") as f, JsonArrayWriter(tmp_path, indent=2, default=str) as writer:
+            for item in records:
+                f.seek(item["offset"])
+                writer.write(json.loads(f.readline())["record"])
+        os.replace(tmp_path, output_path)
+        return len(records)
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,216 @@
+import math
+import os
+import tempfile
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .streaming import iter_records
+
+CHUNK_SIZE = 200000               # records turned into one DataFrame at a time
+MEMORY_BUDGET = 2 * 1024 ** 3     # inputs larger than this (in bytes on disk) are joined partition by partition
+
+KEY = ["fixCommitSHA1", "bugFilePath", "bugLineNum"]
+OUTPUT_COLUMNS = [
+    "fixCommitSHA1", "introducingCommitSHA", "projectName", "bugFilePath", "bugLineNum",
+    "bugType", "reviewer_count", "introducingCommitHasPR", "sstub_introduced",
+]
+
+# spill file layouts of the partitioned join; _row is the position in introducing_commits_enriched.jsonl
+LEFT_SCHEMA = pa.schema([
+    ("_row", pa.int64()),
+    ("fixCommitSHA1", pa.string()),
+    ("introducingCommitSHA", pa.string()),
+    ("projectName", pa.string()),
+    ("bugFilePath", pa.string()),
+    ("bugLineNum", pa.int64()),
+    ("introducingCommitHasPR", pa.bool_()),
+    ("reviewer_count", pa.int64()),
+])
+RIGHT_SCHEMA = pa.schema([
+    ("fixCommitSHA1", pa.string()),
+    ("bugFilePath", pa.string()),
+    ("bugLineNum", pa.int64()),
+    ("bugType", pa.string()),
+])
+RESULT_SCHEMA = pa.schema([field for field in LEFT_SCHEMA] + [
+    ("bugType", pa.string()),
+    ("sstub_introduced", pa.int64()),
+])
+
+
+def enriched_rows(records):
+    """
+    Flattens introducing_commits_enriched.jsonl records into the merge's left
+    side, pulling reviewer_count out of the nested introducingPR (0 when the
+    commit has no PR) while the records stream by.
+    """
+    for record in records:
+        pr = record.get("introducingPR")
+        yield (
+            record.get("fixCommitSHA1"),
+            record.get("introducingCommitSHA"),
+            record.get("projectName"),
+            record.get("bugFilePath"),
+            record.get("bugLineNum"),
+            record.get("introducingCommitHasPR", np.nan),
+            pr.get("reviewer_count", 0) if isinstance(pr, dict) else 0,
+        )
+
+
+def sstub_rows(records):
+    for record in records:
+        yield record.get("fixCommitSHA1"), record.get("bugFilePath"), record.get("bugLineNum"), record.get("bugType")
+
+
+def frames(rows, columns, chunk_size: int = CHUNK_SIZE):
+    """Groups row tuples into DataFrames of `chunk_size` rows."""
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        yield pd.DataFrame.from_records(chunk, columns=columns)
+
+
+def read_enriched(path: str, chunk_size: int = CHUNK_SIZE):
+    return frames(enriched_rows(iter_records(path)), [f.name for f in LEFT_SCHEMA][1:], chunk_size)
+
+
+def read_sstubs(path: str, chunk_size: int = CHUNK_SIZE):
+    return frames(sstub_rows(iter_records(path)), RIGHT_SCHEMA.names, chunk_size)
+
+
+def join(enriched: pd.DataFrame, sstubs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Left-joins SStuBs onto introducing commits on (fixCommitSHA1, bugFilePath,
+    bugLineNum). The keys of both sides are factorized together into integer
+    codes, so the join compares small ints instead of Python strings. Rows
+    keep the order of `enriched`, with several matching SStuBs in their own
+    order, exactly like DataFrame.merge(how="left").
+    """
+    n = len(enriched)
+    left_keys = pd.DataFrame({"_pos": np.arange(n)})
+    right_keys = pd.DataFrame({"bugType": sstubs["bugType"].to_numpy()})
+    for i, column in enumerate(KEY):
+        codes, _ = pd.factorize(pd.concat([enriched[column], sstubs[column]], ignore_index=True))
+        left_keys[i] = codes[:n]
+        right_keys[i] = codes[n:]
+    matched = left_keys.merge(right_keys, on=list(range(len(KEY))), how="left")
+
+    result = enriched.take(matched["_pos"].to_numpy()).reset_index(drop=True)
+    result["bugType"] = matched["bugType"].to_numpy()
+    result["sstub_introduced"] = result["bugType"].notnull().astype(int)
+    return result
+
+
+def partition_of(frame: pd.DataFrame, partitions: int) -> np.ndarray:
+    # partitioned on the fix commit (part of the join key), so every match lands in one partition
+    return pd.util.hash_array(frame["fixCommitSHA1"].astype(object).to_numpy()) % partitions
+
+
+def spill(chunks, schema: pa.Schema, directory: str, prefix: str, partitions: int) -> list:
+    """Appends each chunk's rows to one Parquet file per partition; returns the paths."""
+    paths = [os.path.join(directory, f"{prefix}-{i}.parquet") for i in range(partitions)]
+    writers = {}
+    try:
+        for chunk in chunks:
+            assigned = partition_of(chunk, partitions)
+            for i in np.unique(assigned):
+                part = chunk[assigned == i]
+                if i not in writers:
+                    writers[i] = pq.ParquetWriter(paths[i], schema)
+                writers[i].write_table(pa.Table.from_pandas(part[schema.names], schema=schema, preserve_index=False))
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return paths
+
+
+def read_spill(path: str, schema: pa.Schema) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return schema.empty_table().to_pandas()
+    return pq.read_table(path).to_pandas()
+
+
+def iter_spill(path: str, chunk_size: int):
+    if os.path.exists(path):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+def in_row_order(paths: list, chunk_size: int):
+    """
+    Merges per-partition results (each already in _row order) back into the
+    order of the enriched input, one window of `chunk_size` input rows at a time.
+    """
+    sources = [iter_spill(path, chunk_size) for path in paths]
+    buffers = [RESULT_SCHEMA.empty_table().to_pandas() for _ in paths]
+    exhausted = [False] * len(paths)
+    start = 0
+    while not all(exhausted) or any(len(buffer) for buffer in buffers):
+        end = start + chunk_size
+        pieces = []
+        for i, source in enumerate(sources):
+            while not exhausted[i] and (not len(buffers[i]) or buffers[i]["_row"].iloc[-1] < end):
+                batch = next(source, None)
+                if batch is None:
+                    exhausted[i] = True
+                else:
+                    buffers[i] = pd.concat([buffers[i], batch], ignore_index=True)
+            in_window = buffers[i]["_row"] < end
+            pieces.append(buffers[i][in_window])
+            buffers[i] = buffers[i][~in_window].reset_index(drop=True)
+        window = pd.concat(pieces, ignore_index=True).sort_values("_row", kind="stable")
+        if len(window):
+            yield window.reset_index(drop=True)
+        start = end
+
+
+def partitioned_join(enriched_path: str, sstubs_path: str, partitions: int, chunk_size: int = CHUNK_SIZE, tmp_dir: str = None):
+    """
+    Grace hash join: both inputs are streamed into `partitions` Parquet spill
+    files by a hash of the fix commit, each partition pair is joined in memory,
+    and the results are streamed back in input order. Yields DataFrames.
+    """
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp:
+        def numbered(chunks):
+            row = 0
+            for chunk in chunks:
+                chunk.insert(0, "_row", np.arange(row, row + len(chunk)))
+                row += len(chunk)
+                yield chunk
+
+        left_paths = spill(numbered(read_enriched(enriched_path, chunk_size)), LEFT_SCHEMA, tmp, "left", partitions)
+        right_paths = spill(read_sstubs(sstubs_path, chunk_size), RIGHT_SCHEMA, tmp, "right", partitions)
+
+        result_paths = []
+        for i, (left_path, right_path) in enumerate(zip(left_paths, right_paths)):
+            if not os.path.exists(left_path):
+                continue
+            result = join(read_spill(left_path, LEFT_SCHEMA), read_spill(right_path, RIGHT_SCHEMA))
+            result_paths.append(os.path.join(tmp, f"result-{i}.parquet"))
+            pq.write_table(pa.Table.from_pandas(result[RESULT_SCHEMA.names], schema=RESULT_SCHEMA, preserve_index=False), result_paths[-1])
+
+        for window in in_row_order(result_paths, chunk_size):
+            yield window.drop(columns="_row")
+
+
+def merge_datasets(enriched_path: str, sstubs_path: str, memory_budget: int = MEMORY_BUDGET, chunk_size: int = CHUNK_SIZE, tmp_dir: str = None):
+    """
+    Joins introducing commits with the SStuBs they introduced into the RQ1
+    dataset columns. Inputs that fit `memory_budget` are joined in one go,
+    larger ones with a partitioned join sized so each partition fits the
+    budget. Yields DataFrames (a single one in memory) in input order.
+    """
+    input_bytes = os.path.getsize(enriched_path) + os.path.getsize(sstubs_path)
+    if input_bytes <= memory_budget:
+        enriched = pd.concat(read_enriched(enriched_path, chunk_size), ignore_index=True)
+        sstubs = pd.concat(read_sstubs(sstubs_path, chunk_size), ignore_index=True)
+        yield join(enriched, sstubs)[OUTPUT_COLUMNS]
+        return
+
+    partitions = max(2, math.ceil(2 * input_bytes / memory_budget))
+    print(f"[INFO] Inputs ({input_bytes / 1024 ** 3:.1f} GiB) exceed the memory budget, joining in {partitions} partitions")
+    for window in partitioned_join(enriched_path, sstubs_path, partitions, chunk_size, tmp_dir):
+        yield window[OUTPUT_COLUMNS]
@@ -0,0 +1,167 @@
+import subprocess
+from datetime import datetime
+
+# starts the header line of every commit in the walk (NUL cannot occur in a text diff)
+COMMIT_FORMAT = "%x00commit %H %aI %ct"
+COMMIT_MARKER = "\x00commit "
+NULL_OID = "0" * 40
+# what git runs itself to fetch missing objects of a partial clone, here for many objects at once
+PREFETCH_COMMAND = ["-c", "fetch.negotiationAlgorithm=noop", "fetch", "--no-tags", "--no-write-fetch-head",
+                    "--recurse-submodules=no", "--filter=blob:none", "--stdin"]
+
+
+def occurrences(text: str, snippet: str) -> int:
+    """Non-overlapping occurrences of `snippet` in `text`, as git's -S counts them."""
+    return text.count(snippet)
+
+
+def changes_count(hunks: list, snippet: str) -> bool:
+    """
+    Whether a commit's diff of one file changes the number of occurrences of
+    `snippet`, i.e. whether `git log -S` would report it. `hunks` holds the
+    (pre-image, post-image) text of every hunk; with at least as many context
+    lines as the snippet has, every occurrence touching a changed line lies
+    inside one hunk and unchanged ones cancel out.
+    """
+    before = sum(occurrences(old, snippet) for old, _ in hunks)
+    after = sum(occurrences(new, snippet) for _, new in hunks)
+    return before != after
+
+
+def _timestamp(before_time: str):
+    return datetime.fromisoformat(before_time).timestamp() if before_time else None
+
+
+def promisor_remote(repo_path: str):
+    """The remote missing objects are fetched from if `repo_path` is a partial (e.g. blobless) clone, else None."""
+    # `git clone --filter` marks the remote with remote.<name>.promisor, older clones set extensions.partialClone
+    result = subprocess.run(["git", "config", "--get-regexp", r"^(remote\..*\.promisor|extensions\.partialclone)$"],
+                            cwd=repo_path, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(" ")
+        if key == "extensions.partialclone":
+            return value
+        if value == "true":
+            return key[len("remote."):-len(".promisor")]
+    return None
+
+
+def prefetch_blobs(repo_path: str, file_path: str, before: float = None) -> int:
+    """
+    In a partial clone, fetches every version of `file_path` (committed
+    before `before`) in one request. `git log -p` would otherwise fetch the
+    blobs of each commit it shows with a request of its own. Object ids come
+    from `git log --raw`, which only reads trees. Returns the number of
+    blobs requested, 0 for a full clone.
+    """
+    remote = promisor_remote(repo_path)
+    if not remote:
+        return 0
+    cmd = ["git", "log", "--format=", "--raw", "--no-abbrev", "--no-renames"]
+    if before is not None:
+        cmd.append(f"--before=@{int(before)}")
+    cmd.extend(["--", file_path])
+    output = subprocess.run(cmd, cwd=repo_path, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+    blobs = set()
+    for line in output.splitlines():
+        if not line.startswith(":"):
+            continue
+        old_mode, new_mode, old, new = line[1:].split()[:4]
+        # gitlinks (submodules) point at commits of another repository
+        blobs.update(oid for mode, oid in ((old_mode, old), (new_mode, new)) if mode != "160000" and oid != NULL_OID)
+    if not blobs:
+        return 0
+    try:
+        subprocess.run(["git", *PREFETCH_COMMAND[:3], remote, *PREFETCH_COMMAND[3:]], cwd=repo_path,
+                       input="".join(oid + "\n" for oid in sorted(blobs)), text=True, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except subprocess.CalledProcessError as e:
+        # the walk still works, fetching blob by blob
+        print(f"[WARN] Prefetching {file_path} in {repo_path} failed: {e.stderr.strip()}")
+    return len(blobs)
+
+
+def _commits(repo_path: str, file_path: str, context: int, before: float = None):
+    """
+    Streams `git log -p` of one file, newest first, as (sha, author date,
+    commit time, hunks) per commit that changed it (merges are skipped, as
+    -S does by default). Closing the generator stops git.
+    """
+    cmd = ["git", "log", "-p", f"-U{context}", "--no-color", "--no-ext-diff", "--no-renames",
+           f"--format={COMMIT_FORMAT}"]
+    if before is not None:
+        cmd.append(f"--before=@{int(before)}")
+    cmd.extend(["--", file_path])
+    proc = subprocess.Popen(cmd, cwd=repo_path, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    header, hunks, old, new = None, [], None, None
+    try:
+        for raw in proc.stdout:
+            line = raw.decode("utf-8", errors="replace").rstrip("\n")
+            if line.startswith(COMMIT_MARKER):
+                if header:
+                    if old is not None:
+                        hunks.append(("".join(old), "".join(new)))
+                    yield (*header, hunks)
+                sha, date, commit_time = line[len(COMMIT_MARKER):].split(" ")
+                header, hunks, old, new = (sha, date, int(commit_time)), [], None, None
+            elif line.startswith("@@"):
+                if old is not None:
+                    hunks.append(("".join(old), "".join(new)))
+                old, new = [], []
+            elif old is None or line.startswith("\\"):
+                continue  # diff headers, "\ No newline at end of file"
+            elif line.startswith("-"):
+                old.append(line[1:] + "\n")
+            elif line.startswith("+"):
+                new.append(line[1:] + "\n")
+            else:
+                old.append(line[1:] + "\n")
+                new.append(line[1:] + "\n")
+        if header:
+            if old is not None:
+                hunks.append(("".join(old), "".join(new)))
+            yield (*header, hunks)
+    finally:
+        proc.stdout.close()
+        proc.kill()
+        proc.wait()
+
+
+def find_introducing_commits(repo_path: str, file_path: str, queries: dict) -> dict:
+    """
+    Pickaxe search for several snippets of one file in a single walk of its
+    history. `queries` maps a key to (snippet, before_time); the result maps
+    each key to the (sha, author date) of the newest commit before
+    `before_time` (committer date, like `git log --before`) that changed the
+    number of occurrences of its snippet, or (None, None).
+
+    The walk goes newest first and stops as soon as every snippet is
+    resolved, instead of listing the whole history and reversing it; with a
+    commit-graph with changed-path Bloom filters (see MirrorStore), git skips
+    commits that did not touch the file without reading their trees. In a
+    blobless mirror the file's versions are fetched in one request first
+    (prefetch_blobs).
+    """
+    results = {key: (None, None) for key in queries}
+    pending = {key: (snippet, _timestamp(before)) for key, (snippet, before) in queries.items() if snippet}
+    if not pending:
+        return results
+    limits = [before for _, before in pending.values()]
+    latest = None if None in limits else max(limits)
+    context = max(snippet.count("\n") + 1 for snippet, _ in pending.values())
+
+    prefetch_blobs(repo_path, file_path, latest)
+    walk = _commits(repo_path, file_path, context, latest)
+    try:
+        for sha, date, commit_time, hunks in walk:
+            for key, (snippet, before) in list(pending.items()):
+                if before is not None and commit_time > before:
+                    continue
+                if changes_count(hunks, snippet):
+                    results[key] = (sha, date)
+                    del pending[key]
+            if not pending:
+                break
+    finally:
+        walk.close()
+    return results
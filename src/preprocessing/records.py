@@ -0,0 +1,306 @@
+import re
+from array import array
+
+import numpy as np
+
+# column kinds of a RecordTable schema
+SHA = "sha"            # 40-hex commit SHA, stored as 20 bytes
+CATEGORY = "category"  # repeated value (project, path, bug type), stored as an int32 code into a pool
+INT = "int"
+FLOAT = "float"
+BOOL = "bool"
+
+# fields of a ManySStuBs4J record (sstubs.json / bugs.json) and of an introducing_commits.jsonl entry
+SSTUB_SCHEMA = {
+    "projectName": CATEGORY,
+    "fixCommitSHA1": SHA,
+    "fixCommitParentSHA1": SHA,
+    "bugFilePath": CATEGORY,
+    "bugLineNum": INT,
+    "bugType": CATEGORY,
+}
+INTRODUCING_SCHEMA = {
+    "projectName": CATEGORY,
+    "fixCommitSHA1": SHA,
+    "fixCommitParentSHA1": SHA,
+    "bugFilePath": CATEGORY,
+    "bugLineNum": INT,
+    "introducingCommitSHA": SHA,
+}
+
+HEX_SHA = re.compile(r"[0-9a-f]{40}\Z")
+TYPECODES = {CATEGORY: "i", INT: "q", FLOAT: "d", BOOL: "b"}
+NUMPY_TYPES = {CATEGORY: np.int32, INT: np.int64, FLOAT: np.float64, BOOL: np.bool_}
+
+
+class Pool:
+    """Interns values: every distinct value is stored once and referred to by its int code."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    @classmethod
+    def distinct(cls, values) -> "Pool":
+        """A pool of values already known to be distinct, without probing each one."""
+        pool = cls()
+        pool.__setstate__(list(values))
+        return pool
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getstate__(self):
+        return self.values
+
+    def __setstate__(self, values):
+        self.values = values
+        self.codes = {value: code for code, value in enumerate(values)}
+
+
+def _fits(kind: str, value) -> bool:
+    """Whether `value` can be stored in a column of `kind`; other values are kept as-is on the side."""
+    if kind == SHA:
+        return type(value) is str and HEX_SHA.match(value) is not None
+    if kind == CATEGORY:
+        try:
+            hash(value)
+        except TypeError:
+            return False
+        return True
+    if kind == INT:
+        return type(value) is int and -2 ** 63 <= value < 2 ** 63
+    if kind == FLOAT:
+        return type(value) is float
+    return type(value) is bool
+
+
+class RecordTable:
+    """
+    Compact column store for many records with the same JSON schema.
+
+    Fields in `schema` are held in typed arrays: SHAs as 20 raw bytes,
+    categorical fields as int32 codes into a Pool per field, ints / floats /
+    bools natively. Values that do not fit their column (None, an abbreviated
+    SHA, a string in an int field) and fields outside the schema are kept as
+    Python objects next to the arrays, and every record's key order is
+    interned, so records()/json round trips are lossless, key order included.
+    A table pickles as its arrays and pools, so slices can be sent to worker
+    processes cheaply.
+    """
+
+    __slots__ = ("schema", "_columns", "_pools", "_irregular", "_extras", "_layouts", "_layout_codes", "_size")
+
+    def __init__(self, schema: dict = SSTUB_SCHEMA):
+        self.schema = dict(schema)
+        self._columns = {field: bytearray() if kind == SHA else array(TYPECODES[kind]) for field, kind in self.schema.items()}
+        self._pools = {field: Pool() for field, kind in self.schema.items() if kind == CATEGORY}
+        self._irregular = {field: {} for field in self.schema}  # field -> {row: value that does not fit the column}
+        self._extras = {}                                       # row -> {field: value} for fields outside the schema
+        self._layouts = Pool()                                  # distinct key orders
+        self._layout_codes = array("i")
+        self._size = 0
+
+    @classmethod
+    def from_records(cls, records, schema: dict = SSTUB_SCHEMA) -> "RecordTable":
+        table = cls(schema)
+        table.extend(records)
+        return table
+
+    def __len__(self):
+        return self._size
+
+    def append(self, record: dict):
+        self.extend((record,))
+
+    def extend(self, records):
+        # per-field state hoisted out of the loop, this runs once per record of a full dataset
+        plan = [(field, kind, self._columns[field], self._pools[field] if kind == CATEGORY else None, self._irregular[field])
+                for field, kind in self.schema.items()]
+        layouts, layout_codes, extra_fields = self._layouts, self._layout_codes, {}
+        row = self._size
+        for record in records:
+            layout = layouts.code(tuple(record))
+            layout_codes.append(layout)
+            for field, kind, column, pool, irregular in plan:
+                value = record.get(field, irregular)  # the dict itself marks an absent field
+                if kind == CATEGORY:
+                    code = pool.codes.get(value) if value.__hash__ is not None else None
+                    if code is None:
+                        if value is irregular or value.__hash__ is None:
+                            # absent fields read back as None; the layout keeps them out of the record
+                            irregular[row] = None if value is irregular else value
+                            value = None
+                        code = pool.code(value)
+                    column.append(code)
+                elif value is not irregular and _fits(kind, value):
+                    if kind == SHA:
+                        column += bytes.fromhex(value)
+                    else:
+                        column.append(value)
+                else:
+                    irregular[row] = None if value is irregular else value
+                    if kind == SHA:
+                        column += bytes(20)
+                    else:
+                        column.append(0)
+            if layout not in extra_fields:
+                extra_fields[layout] = [field for field in layouts.values[layout] if field not in self.schema]
+            if extra_fields[layout]:
+                self._extras[row] = {field: record[field] for field in extra_fields[layout]}
+            row += 1
+            self._size = row
+
+    # --- reading back ---
+
+    def value(self, field: str, row: int):
+        """The value of `field` in `row` as it was in the record (None if the field was absent)."""
+        if row in self._irregular[field]:
+            return self._irregular[field][row]
+        kind = self.schema[field]
+        column = self._columns[field]
+        if kind == SHA:
+            return column[20 * row:20 * row + 20].hex()
+        if kind == CATEGORY:
+            return self._pools[field].values[column[row]]
+        if kind == BOOL:
+            return bool(column[row])
+        return column[row]
+
+    def record(self, row: int) -> dict:
+        """Row `row` as the dict it was built from."""
+        if not -self._size <= row < self._size:
+            raise IndexError(row)
+        row %= self._size
+        extras = self._extras.get(row, {})
+        return {
+            field: extras[field] if field in extras else self.value(field, row)
+            for field in self._layouts.values[self._layout_codes[row]]
+        }
+
+    __getitem__ = record
+
+    def __iter__(self):
+        for row in range(self._size):
+            yield self.record(row)
+
+    def records(self) -> list:
+        return list(self)
+
+    # --- columnar access ---
+
+    def column(self, field: str) -> np.ndarray:
+        """
+        A zero-copy NumPy view of a column: (n, 20) uint8 for SHAs, int32 codes
+        for categorical fields (see categories()), the native type otherwise.
+        Irregular values read as zeros / code of None.
+        """
+        kind = self.schema[field]
+        if kind == SHA:
+            return np.frombuffer(self._columns[field], dtype=np.uint8).reshape(-1, 20)
+        return np.frombuffer(self._columns[field], dtype=NUMPY_TYPES[kind])
+
+    def categories(self, field: str) -> list:
+        """Values of a categorical field, indexed by code."""
+        return self._pools[field].values
+
+    def codes(self, field: str) -> np.ndarray:
+        """
+        One int64 code per row for any field, equal for equal values: pool
+        codes for categories, a dense rank of the 20 bytes for SHAs (rows with
+        irregular values get their own codes after the regular ones).
+        """
+        kind = self.schema[field]
+        irregular = self._irregular[field]
+        if kind == CATEGORY:
+            codes = self.column(field).astype(np.int64)
+            # absent fields already carry the code of None, only unhashable values need their own
+            irregular = {row: value for row, value in irregular.items() if value is not None}
+        elif kind == SHA:
+            codes = np.unique(self.column(field).view(np.dtype((np.void, 20))).ravel(), return_inverse=True)[1].astype(np.int64)
+        else:
+            codes = np.unique(self.column(field), return_inverse=True)[1].astype(np.int64)
+        if irregular:
+            pool = Pool()
+            start = int(codes.max()) + 1 if len(codes) else 0
+            for row, value in irregular.items():
+                codes[row] = start + pool.code(repr(value))
+        return codes
+
+    def group_rows(self, *fields) -> list:
+        """
+        Row indices of each group of rows sharing the values of `fields`, in
+        order of first appearance. Grouping works on the integer codes with
+        one stable sort.
+        """
+        if not self._size:
+            return []
+        # combine the fields' codes into one key, re-densified after each field so it cannot overflow
+        inverse = np.zeros(self._size, dtype=np.int64)
+        for field in fields:
+            codes = self.codes(field)
+            _, first, inverse = np.unique(inverse * (int(codes.max()) + 1) + codes, return_index=True, return_inverse=True)
+        # renumber groups by first appearance, then one stable sort lays them out in that order
+        rank = np.empty(len(first), dtype=np.int64)
+        rank[np.argsort(first, kind="stable")] = np.arange(len(first))
+        group = rank[inverse]
+        order = np.argsort(group, kind="stable")
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(group)))).tolist()
+        return [order[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    def group_by(self, *fields) -> dict:
+        """{key: RecordTable} of group_rows(), keys being single values or tuples of them."""
+        groups = {}
+        for rows in self.group_rows(*fields):
+            values = tuple(self.value(field, int(rows[0])) for field in fields)
+            groups[values[0] if len(fields) == 1 else values] = self.take(rows)
+        return groups
+
+    def take(self, rows) -> "RecordTable":
+        """A new table with the given rows, in that order, sharing this table's pools."""
+        rows = np.asarray(rows, dtype=np.int64)
+        table = RecordTable.__new__(RecordTable)
+        table.schema = self.schema
+        table._layouts = self._layouts
+        table._size = len(rows)
+        table._layout_codes = array("i", np.frombuffer(self._layout_codes, dtype=np.int32)[rows].tobytes())
+        table._columns = {}
+        table._pools = self._pools
+        for field, kind in self.schema.items():
+            data = self.column(field)[rows]
+            table._columns[field] = bytearray(data.tobytes()) if kind == SHA else array(TYPECODES[kind], data.tobytes())
+        listed = rows.tolist()
+        table._irregular = {
+            field: {i: irregular[row] for i, row in enumerate(listed) if row in irregular} if irregular else {}
+            for field, irregular in self._irregular.items()
+        }
+        table._extras = {i: self._extras[row] for i, row in enumerate(listed) if row in self._extras} if self._extras else {}
+        return table
+
+    def __getstate__(self):
+        state = {name: getattr(self, name) for name in self.__slots__}
+        # a slice of a large table only ships the pool values its rows use
+        state["_columns"], state["_pools"] = dict(self._columns), {}
+        for field, pool in self._pools.items():
+            if len(pool) <= self._size:
+                state["_pools"][field] = pool
+                continue
+            used, codes = np.unique(self.column(field), return_inverse=True)
+            state["_pools"][field] = Pool.distinct(pool.values[code] for code in used.tolist())
+            state["_columns"][field] = array(TYPECODES[CATEGORY], codes.astype(np.int32).tobytes())
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
@@ -0,0 +1,160 @@
+import sqlite3
+
+from .review_analyzer import KeywordMatcher
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,  -- projectName as in sstubs.json, e.g. "Owner.Repo"
+    kind TEXT NOT NULL,     -- "commit" or "pr"
+    ref TEXT NOT NULL,      -- commit SHA or PR number
+    UNIQUE (project, kind, ref)
+);
+CREATE TABLE IF NOT EXISTS texts (
+    id INTEGER PRIMARY KEY,
+    document INTEGER NOT NULL REFERENCES documents (id),
+    kind TEXT NOT NULL,     -- "message", "review" (review body) or "comment" (review comment)
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS texts_document ON texts (document);
+CREATE VIRTUAL TABLE IF NOT EXISTS texts_index USING fts5(body, content='texts', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS texts_insert AFTER INSERT ON texts BEGIN
+    INSERT INTO texts_index (rowid, body) VALUES (new.id, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS texts_delete AFTER DELETE ON texts BEGIN
+    INSERT INTO texts_index (texts_index, rowid, body) VALUES ('delete', old.id, old.body);
+END;
+"""
+
+# texts whose keyword mentions set each flag; review bodies are stored but were never scored
+COMMIT_KINDS = ("message",)
+PR_KINDS = ("comment",)
+
+
+def match_query(keywords) -> str:
+    """FTS5 query matching any of `keywords`, multi-word ones as phrases."""
+    return " OR ".join('"' + keyword.replace('"', '""') + '"' for keyword in keywords)
+
+
+class ReviewCorpus:
+    """
+    Local store of the commit messages, review bodies and review comments
+    augment.py fetches, in one SQLite file with an FTS5 index over the texts.
+    Every commit and PR is a document keyed by (project, kind, ref) and is
+    replaced as a whole when it is stored again, so re-runs do not duplicate texts.
+
+    The index makes re-scoring the explicit-mention flags for another keyword
+    list an offline query: FTS5 narrows the texts down to those containing a
+    keyword token (its tokenizer splits at least as finely as a regex word
+    boundary and folds case, so no mention is lost) and KeywordMatcher
+    decides on those.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _store(self, project: str, kind: str, ref, texts):
+        """Replaces document (project, kind, ref) with `texts`, an iterable of (text kind, body)."""
+        ref = str(ref)
+        row = self._db.execute("SELECT id FROM documents WHERE project = ? AND kind = ? AND ref = ?", (project, kind, ref)).fetchone()
+        if row:
+            document = row[0]
+            self._db.execute("DELETE FROM texts WHERE document = ?", (document,))
+        else:
+            document = self._db.execute("INSERT INTO documents (project, kind, ref) VALUES (?, ?, ?)", (project, kind, ref)).lastrowid
+        self._db.executemany(
+            "INSERT INTO texts (document, kind, body) VALUES (?, ?, ?)",
+            [(document, text_kind, body) for text_kind, body in texts if body],
+        )
+
+    def add_commits(self, project: str, commits: dict):
+        """Stores the messages of fetched commits, {sha: {"message", ...}}."""
+        for sha, commit in commits.items():
+            self._store(project, "commit", sha, [("message", commit.get("message"))])
+        self._db.commit()
+
+    def add_pull_requests(self, project: str, pull_requests: dict):
+        """Stores review bodies and review comments of PRs fetched with comments, {number: {"reviewBodies", "reviewComments", ...}}."""
+        for number, reviews in pull_requests.items():
+            texts = [("review", body) for body in reviews.get("reviewBodies", [])]
+            texts += [("comment", body) for body in reviews.get("reviewComments", [])]
+            self._store(project, "pr", number, texts)
+        self._db.commit()
+
+    def documents(self) -> set:
+        """Every stored (project, kind, ref)."""
+        return set(self._db.execute("SELECT project, kind, ref FROM documents"))
+
+    def texts(self, project: str, kind: str, ref) -> list:
+        """[(text kind, body)] of one document, in the order they were fetched."""
+        return self._db.execute(
+            "SELECT t.kind, t.body FROM texts t JOIN documents d ON d.id = t.document "
+            "WHERE d.project = ? AND d.kind = ? AND d.ref = ? ORDER BY t.id",
+            (project, kind, str(ref)),
+        ).fetchall()
+
+    def search(self, query: str, limit: int = 100) -> list:
+        """[(project, kind, ref, text kind, body)] of the texts matching an FTS5 query, best matches first."""
+        return self._db.execute(
+            "SELECT d.project, d.kind, d.ref, t.kind, t.body FROM texts_index "
+            "JOIN texts t ON t.id = texts_index.rowid JOIN documents d ON d.id = t.document "
+            "WHERE texts_index MATCH ? ORDER BY rank LIMIT ?",
+            (query, limit),
+        ).fetchall()
+
+    def mentions(self, matcher: KeywordMatcher, kinds=COMMIT_KINDS + PR_KINDS) -> set:
+        """(project, kind, ref) of the documents with a text of one of `kinds` that mentions a keyword of `matcher`."""
+        rows = self._db.execute(
+            "SELECT d.project, d.kind, d.ref, t.body FROM texts_index "
+            "JOIN texts t ON t.id = texts_index.rowid JOIN documents d ON d.id = t.document "
+            f"WHERE texts_index MATCH ? AND t.kind IN ({', '.join('?' * len(kinds))})",
+            (match_query(matcher.keywords), *kinds),
+        ).fetchall()
+        found = matcher.any([body for *_, body in rows])
+        return {tuple(row[:3]) for row, mentioned in zip(rows, found) if mentioned}
+
+    def close(self):
+        self._db.close()
+
+
+def rescore(records, corpus: ReviewCorpus, matcher: KeywordMatcher, pr_kinds=PR_KINDS, stats: dict = None):
+    """
+    Yields augmented records with explicitMentionInIntroducingCommit and
+    explicitMentionInIntroducingPR recomputed from the corpus for `matcher`'s
+    keywords. A flag whose introducing commit or PR is not in the corpus is
+    left as it was; `stats` counts rescored, changed and missing flags.
+    """
+    stats = stats if stats is not None else {}
+    for name in ("rescored", "changed", "missing"):
+        stats.setdefault(name, 0)
+    known = corpus.documents()
+    mentioned = corpus.mentions(matcher, COMMIT_KINDS + tuple(pr_kinds))
+
+    for record in records:
+        project = record.get("projectName")
+        sha = record.get("introducingCommitSHA")
+        pr_number = (record.get("introducingPR") or {}).get("pr_number")
+        for flag, key in (
+            ("explicitMentionInIntroducingCommit", (project, "commit", sha) if sha else None),
+            ("explicitMentionInIntroducingPR", (project, "pr", str(pr_number)) if pr_number is not None else None),
+        ):
+            if key is None:
+                continue
+            if key not in known:
+                stats["missing"] += 1
+                continue
+            found = key in mentioned
+            stats["rescored"] += 1
+            stats["changed"] += found != record.get(flag)
+            record[flag] = found
+        yield record
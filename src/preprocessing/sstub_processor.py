@@ -0,0 +1,48 @@
+from collections import defaultdict
+
+
+class ShaPrefixIndex:
+    """
+    Hash index over commit SHAs that may be abbreviated. Prefixes are bucketed
+    by length, so a full SHA is matched against every indexed prefix with one
+    dict lookup per distinct prefix length (usually just one or two).
+    """
+
+    def __init__(self, prefixes):
+        self._by_length = defaultdict(lambda: defaultdict(list))
+        for position, prefix in enumerate(prefixes):
+            # missing or empty SHAs never match anything
+            if isinstance(prefix, str) and prefix:
+                self._by_length[len(prefix)][prefix].append(position)
+        self._lengths = sorted(self._by_length)
+
+    def lookup(self, sha: str) -> list:
+        """Returns the positions of every indexed prefix of `sha`, in insertion order."""
+        matches = []
+        for length in self._lengths:
+            if length > len(sha):
+                break
+            matches.extend(self._by_length[length].get(sha[:length], ()))
+        if len(self._lengths) > 1:
+            matches.sort()
+        return matches
+
+
+def link_sstubs_to_prs(dataset: list, sstubs: list) -> int:
+    """
+    Appends {"sha", "bugType"} to pr["sstubs"] for every SStuB whose
+    introducingCommitSHA is a prefix of one of the PR's commitSHAs, in one pass
+    over the PR commits. Produces the same lists as comparing every PR commit
+    against every SStuB. Returns the number of links made.
+    """
+    index = ShaPrefixIndex([sstub["introducingCommitSHA"] for sstub in sstubs])
+    linked = 0
+    for pr in dataset:
+        for sha in pr["commitSHAs"]:
+            for position in index.lookup(sha):
+                pr["sstubs"].append({
+                    "sha": sha,
+                    "bugType": sstubs[position]["bugType"]
+                })
+                linked += 1
+    return linked
@@ -0,0 +1,176 @@
+import gzip
+import json
+
+CHUNK_SIZE = 1 << 20  # characters read from disk at a time
+_WHITESPACE = " \t\n\r"
+
+
+def open_text(path: str, mode: str = "r"):
+    """Opens `path` as UTF-8 text, transparently (de)compressing files ending in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def iter_json_array(path: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Yields the elements of a file holding one top-level JSON array (sstubs.json,
+    bugs.json, merged_checkpoints.json) one at a time, keeping only the chunk
+    being parsed in memory instead of the whole list.
+    """
+    decoder = json.JSONDecoder()
+    with open_text(path) as f:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] != "[":
+            raise ValueError(f"{path} does not contain a JSON array")
+        pos += 1
+        skip_whitespace()
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            # a number cut off by the chunk boundary ("1." of "1.5") still decodes, so only
+            # accept an element once the delimiter after it has been read as well
+            after = end
+            while after < len(buffer) and buffer[after] in _WHITESPACE:
+                after += 1
+            if (after >= len(buffer) or buffer[after] not in ",]") and not eof:
+                fill()
+                continue
+            if after >= len(buffer):
+                raise ValueError(f"{path}: unterminated JSON array")
+            if buffer[after] not in ",]":
+                raise ValueError(f"{path}: expected ',' or ']' after element, got {buffer[after]!r}")
+            yield item
+
+            pos = after + 1
+            if buffer[after] == "]":
+                return
+            skip_whitespace()
+
+
+def iter_jsonl(path: str):
+    """Yields one object per non-empty line of a JSONL file (introducing_commits.jsonl, journals)."""
+    with open_text(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_records(path: str):
+    """Streams records from a JSON array or, for *.jsonl / *.jsonl.gz, a JSONL file."""
+    if path.endswith((".jsonl", ".jsonl.gz")):
+        return iter_jsonl(path)
+    return iter_json_array(path)
+
+
+def project(records, fields):
+    """Keeps only `fields` of every record, so large unused fields (patches, ASTs) are dropped while streaming."""
+    for record in records:
+        yield {field: record[field] for field in fields if field in record}
+
+
+class JsonArrayWriter:
+    """
+    Writes a JSON array one element at a time. The output is byte-for-byte what
+    `json.dump(records, f, indent=indent)` produces for the same records.
+    """
+
+    def __init__(self, path: str, indent: int = None, default=None):
+        self.path = path
+        self.indent = indent
+        self.default = default
+        self.count = 0
+        self._file = open_text(path, "w")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record):
+        text = json.dumps(record, indent=self.indent, default=self.default)
+        if self.indent is None:
+            self._file.write(("[" if self.count == 0 else ", ") + text)
+        else:
+            pad = " " * self.indent
+            self._file.write(("[\n" if self.count == 0 else ",\n") + pad + text.replace("\n", "\n" + pad))
+        self.count += 1
+
+    def write_all(self, records) -> int:
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.count == 0:
+            self._file.write("[]")
+        else:
+            self._file.write("]" if self.indent is None else "\n]")
+        self._file.close()
+
+
+class JsonlWriter:
+    """Writes one JSON object per line."""
+
+    def __init__(self, path: str, mode: str = "w", default=None):
+        self.path = path
+        self.default = default
+        self.count = 0
+        self._file = open_text(path, mode)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record):
+        self._file.write(json.dumps(record, default=self.default) + "\n")
+        self.count += 1
+
+    def write_all(self, records) -> int:
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self):
+        self._file.close()
+
+
+def write_records(path: str, records, indent: int = None) -> int:
+    """Streams `records` to a JSON array or, for *.jsonl / *.jsonl.gz, a JSONL file. Returns the count."""
+    writer = JsonlWriter(path) if path.endswith((".jsonl", ".jsonl.gz")) else JsonArrayWriter(path, indent=indent)
+    with writer:
+        return writer.write_all(records)
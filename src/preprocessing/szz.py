@@ -0,0 +1,135 @@
+import os
+import json
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .blame import BlameCache
+from .git_objects import CatFileBatch
+from .records import RecordTable
+
+SHARD_SIZE = 2000  # Max bugs per pool task, large projects are split into several shards
+
+
+def szz_project(project: str, bugs: list, repo_path: str, blame_cache: BlameCache = None) -> list:
+    """
+    Runs SZZ over one project's bugs. Every (fix parent, file) pair is read
+    once through a shared `git cat-file --batch` pipe and blamed once for all
+    of its bug lines, skipping the lines `blame_cache` already holds.
+    Returns introducing_commits entries in input order.
+    """
+    groups = defaultdict(set)
+    for bug in bugs:
+        if bug.get("fixCommitParentSHA1") and isinstance(bug.get("bugLineNum"), int):
+            groups[(bug["fixCommitParentSHA1"], bug["bugFilePath"])].add(bug["bugLineNum"])
+
+    blame_cache = blame_cache or BlameCache()
+    introducing = {}
+    with CatFileBatch(repo_path) as cat:
+        for (fix_parent, file_path), line_nums in groups.items():
+            #lines past the end of the file, or files removed before the fix parent, are ignored
+            try:
+                blamed = blame_cache.blame(repo_path, project, fix_parent, file_path, line_nums, cat)
+            except subprocess.CalledProcessError as e:
+                print(f"[ERROR] {project} - blame {fix_parent} @ {file_path} → {e}")
+                continue
+            for line_num, info in blamed.items():
+                introducing[(fix_parent, file_path, line_num)] = info["commit"]
+
+    entries = []
+    for bug in bugs:
+        key = (bug.get("fixCommitParentSHA1"), bug.get("bugFilePath"), bug.get("bugLineNum"))
+        if key not in introducing:
+            continue
+        entries.append({
+            "projectName": project,
+            "fixCommitSHA1": bug["fixCommitSHA1"],
+            "fixCommitParentSHA1": key[0],
+            "bugFilePath": key[1],
+            "bugLineNum": key[2],
+            "introducingCommitSHA": introducing[key],
+        })
+    return entries
+
+
+def shard_project(bugs, shard_size: int = SHARD_SIZE) -> list:
+    """
+    Splits a project's bugs (a list of dicts or a RecordTable) into shards
+    without separating bugs that share a (fix parent, file) pair. A
+    RecordTable is grouped on its integer codes and split into smaller tables.
+    """
+    if isinstance(bugs, RecordTable):
+        shards = [[]]
+        size = 0
+        for rows in bugs.group_rows("fixCommitParentSHA1", "bugFilePath"):
+            if shards[-1] and size + len(rows) > shard_size:
+                shards.append([])
+                size = 0
+            shards[-1].append(rows)
+            size += len(rows)
+        return [bugs.take(np.concatenate(shard)) for shard in shards if shard]
+
+    groups = defaultdict(list)
+    for bug in bugs:
+        groups[(bug.get("fixCommitParentSHA1"), bug.get("bugFilePath"))].append(bug)
+
+    shards = [[]]
+    for group in groups.values():
+        if shards[-1] and len(shards[-1]) + len(group) > shard_size:
+            shards.append([])
+        shards[-1].extend(group)
+    return [shard for shard in shards if shard]
+
+
+def _szz_task(task):
+    project, bugs, repo_path, blame_cache_path = task
+    try:
+        with BlameCache(blame_cache_path) as blame_cache:
+            return project, len(bugs), szz_project(project, bugs, repo_path, blame_cache), None
+    except Exception as e:
+        return project, len(bugs), [], str(e)
+
+
+def run_szz(grouped: dict, repo_dir: str, output_file: str, workers: int = None, progress=None, blame_cache_path: str = None) -> int:
+    """
+    Runs SZZ for every project in `grouped` ({projectName: [bug, ...]}) whose
+    clone exists under `repo_dir`. Projects are sharded into a work queue that
+    a process pool drains largest-first; every worker passes its repository as
+    `cwd=`, and this process is the only writer of `output_file`. With
+    `blame_cache_path`, blame results are kept in that BlameCache file and
+    reused by later runs. Returns the number of entries written.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    for project, bugs in grouped.items():
+        local_repo = os.path.join(repo_dir, project.replace(".", "_"))
+        if not os.path.exists(local_repo):
+            continue
+        tasks.extend((project, shard, local_repo, blame_cache_path) for shard in shard_project(bugs))
+    tasks.sort(key=lambda task: len(task[1]), reverse=True)
+
+    written = 0
+    with open(output_file, "w", encoding="utf-8") as out_f:
+        def write(result):
+            nonlocal written
+            project, n_bugs, entries, error = result
+            if error is not None:
+                print(f"[ERROR] {project} → {error}")
+            for entry in entries:
+                out_f.write(json.dumps(entry) + "\n")
+            written += len(entries)
+            if progress is not None:
+                progress.update(n_bugs)
+
+        if workers == 1:
+            for task in tasks:
+                write(_szz_task(task))
+            return written
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_szz_task, task) for task in tasks]
+            for future in as_completed(futures):
+                write(future.result())
+    return written